@@ -1,26 +1,66 @@
-
-import pandas as pd
+import argparse
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from workbook_index import workbook_profile
 
 files = [
     "Liste de prix Vaonix 27022025.xlsm",
     "boms-selling-prices-20260115-163935.xlsx"
 ]
 
-for file in files:
-    if os.path.exists(file):
-        print(f"--- Inspecting {file} ---")
-        try:
-            xl = pd.ExcelFile(file)
-            print(f"Sheets: {xl.sheet_names}")
-            
-            # Read first sheet briefly to see columns
-            for sheet in xl.sheet_names:
-                print(f"\nSheet: {sheet}")
-                df = pd.read_excel(file, sheet_name=sheet, nrows=3)
-                print(df.columns.tolist())
-                print(df.head(2))
-        except Exception as e:
-            print(f"Error reading {file}: {e}")
-    else:
-        print(f"File {file} not found")
+def preview_frame(rows):
+    # Same header handling as pd.read_excel: trailing empty columns are dropped,
+    # blank names become "Unnamed: n"
+    # (pandas is only imported for the preview, listing sheets does not need it)
+    import pandas as pd
+
+    header = list(rows[0]) if rows else []
+    width = max((len(row) for row in rows), default=0)
+    while width and all(len(row) < width or row[width - 1] is None for row in rows):
+        width -= 1
+    header = (header + [None] * width)[:width]
+    columns = []
+    for idx, name in enumerate(header):
+        name = f"Unnamed: {idx}" if name is None else name
+        while name in columns:
+            name = f"{name}.1"
+        columns.append(name)
+    data = [[float('nan') if value is None else value for value in (tuple(row) + (None,) * width)[:width]]
+            for row in rows[1:]]
+    return pd.DataFrame(data, columns=columns)
+
+def main(paths=files, preview=True):
+    for file in paths:
+        if os.path.exists(file):
+            print(f"--- Inspecting {file} ---")
+            try:
+                # Sheet names and sample rows come from the workbook index
+                profile = workbook_profile(file)
+                print(f"Sheets: {[sheet['name'] for sheet in profile['sheets']]}")
+                if not preview:
+                    continue
+
+                # Read first sheet briefly to see columns
+                for sheet in profile['sheets']:
+                    print(f"\nSheet: {sheet['name']}")
+                    df = preview_frame(sheet['sample'][:4])
+                    print(df.columns.tolist())
+                    print(df.head(2))
+            except Exception as e:
+                print(f"Error reading {file}: {e}")
+        else:
+            print(f"File {file} not found")
+
+def cli(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="List the sheets of the workbooks and preview their "
+                                                            "first rows")
+    parser.add_argument('files', nargs='*', default=files)
+    parser.add_argument('--sheets-only', dest='preview', action='store_false',
+                        help="Only list the sheet names (no pandas preview)")
+    args = parser.parse_args(argv)
+    main(args.files, args.preview)
+
+if __name__ == "__main__":
+    cli()
@@ -1,46 +1,73 @@
-import openpyxl
-import pandas as pd
-
-# Load the Excel file
-wb = openpyxl.load_workbook('Liste de prix Vaonix 27022025.xlsm', data_only=True)
-
-# Analyze the main sheet
-ws = wb['Liste de prix']
-
-print("=" * 80)
-print("ANALYSIS OF 'Liste de prix' SHEET")
-print("=" * 80)
-print(f"\nDimensions: {ws.dimensions}")
-print(f"Max row: {ws.max_row}, Max column: {ws.max_column}")
-
-# Print first 20 rows to understand structure
-print("\n" + "=" * 80)
-print("FIRST 20 ROWS:")
-print("=" * 80)
-
-for row_idx in range(1, min(21, ws.max_row + 1)):
-    row_data = []
-    for col_idx in range(1, min(15, ws.max_column + 1)):  # Limit to first 15 columns
-        cell = ws.cell(row=row_idx, column=col_idx)
-        value = cell.value
-        if value is not None:
-            row_data.append(f"Col{col_idx}: {str(value)[:50]}")
-    
-    if row_data:
-        print(f"\nRow {row_idx}:")
-        for item in row_data:
-            print(f"  {item}")
-
-# Try to find header row
-print("\n" + "=" * 80)
-print("LOOKING FOR HEADERS (rows containing 'BOM', 'Prix', 'Description'):")
-print("=" * 80)
-
-for row_idx in range(1, min(50, ws.max_row + 1)):
-    row_values = [ws.cell(row=row_idx, column=col_idx).value for col_idx in range(1, ws.max_column + 1)]
-    row_str = ' | '.join([str(v) if v else '' for v in row_values[:15]])
-    
-    if any(keyword in str(row_str).upper() for keyword in ['BOM', 'PRIX', 'DESCRIPTION', 'REFERENCE', 'DÉSIGNATION']):
-        print(f"\nRow {row_idx}: {row_str}")
-
-wb.close()
+import argparse
+
+from workbook_index import SAMPLE_ROWS, format_column, sheet_profile, workbook_profile
+
+INPUT_FILE = 'Liste de prix Vaonix 27022025.xlsm'
+SHEET_NAME = 'Liste de prix'
+
+def main(path=INPUT_FILE, sheet_name=SHEET_NAME):
+    # Profile of the 'Liste de prix' sheet (from the workbook index when the file is unchanged)
+    sheet = sheet_profile(workbook_profile(path), sheet_name)
+    rows = sheet['sample']
+    max_row = sheet['max_row']
+    max_column = sheet['max_column']
+
+    def cell_value(row_idx, col_idx):
+        row = rows[row_idx - 1]
+        return row[col_idx - 1] if col_idx <= len(row) else None
+
+    print("=" * 80)
+    print(f"ANALYSIS OF '{sheet_name}' SHEET")
+    print("=" * 80)
+    print(f"\nDimensions: {sheet['dimensions']}")
+    print(f"Max row: {max_row}, Max column: {max_column}")
+
+    # Print first 20 rows to understand structure
+    print("\n" + "=" * 80)
+    print("FIRST 20 ROWS:")
+    print("=" * 80)
+
+    for row_idx in range(1, min(21, max_row + 1)):
+        row_data = []
+        for col_idx in range(1, min(15, max_column + 1)):  # Limit to first 15 columns
+            value = cell_value(row_idx, col_idx)
+            if value is not None:
+                row_data.append(f"Col{col_idx}: {str(value)[:50]}")
+        
+        if row_data:
+            print(f"\nRow {row_idx}:")
+            for item in row_data:
+                print(f"  {item}")
+
+    # Try to find header row
+    print("\n" + "=" * 80)
+    print("LOOKING FOR HEADERS (rows containing 'BOM', 'Prix', 'Description'):")
+    print("=" * 80)
+
+    for row_idx in range(1, min(SAMPLE_ROWS, max_row + 1)):
+        row_values = [cell_value(row_idx, col_idx) for col_idx in range(1, max_column + 1)]
+        row_str = ' | '.join([str(v) if v else '' for v in row_values[:15]])
+        
+        if any(keyword in str(row_str).upper()
+               for keyword in ['BOM', 'PRIX', 'DESCRIPTION', 'REFERENCE', 'DÉSIGNATION']):
+            print(f"\nRow {row_idx}: {row_str}")
+
+    print(f"\nDetected header row: {sheet['header_row']}")
+
+    print("\n" + "=" * 80)
+    print("COLUMN TYPES (below the header row):")
+    print("=" * 80)
+
+    for column in sheet['columns']:
+        print(f"  {format_column(column)}")
+
+def cli(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Print the layout of the price-list sheet: first rows, "
+                                                            "header row and column types")
+    parser.add_argument('file', nargs='?', default=INPUT_FILE, help="Workbook (default: %(default)s)")
+    parser.add_argument('--sheet', default=SHEET_NAME, help="Sheet to analyze (default: %(default)s)")
+    args = parser.parse_args(argv)
+    main(args.file, args.sheet)
+
+if __name__ == "__main__":
+    cli()
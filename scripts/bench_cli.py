@@ -0,0 +1,125 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from bench_pipeline import BENCH_DIR, _git_commit
+
+# Startup time of every vaonix command, measured in fresh interpreters.
+# Each case runs RUNS times and the fastest wall time is kept; a worker run also
+# records which heavy dependencies the case imported, so a top-level import creeping
+# back in shows up even when the time is noise. Results are appended to RESULTS_FILE
+# and compared with the previous run.
+# Usage: python scripts/bench_cli.py [--runs 5]
+
+RESULTS_FILE = os.path.join(BENCH_DIR, 'cli_startup.jsonl')
+VAONIX = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vaonix.py')
+RUNS = 5
+HEAVY_MODULES = ('pandas', 'numpy', 'pyarrow', 'openpyxl', 'PIL')
+
+# Case -> vaonix arguments. Light commands read the workbook index, not Excel.
+CASES = {
+    'help': ['--help'],
+    'import --help': ['import', '--help'],
+    'analyze --help': ['analyze', '--help'],
+    'inspect --help': ['inspect', '--help'],
+    'images --help': ['images', '--help'],
+    'fix-logo --help': ['fix-logo', '--help'],
+    'assets --help': ['assets', '--help'],
+    'inspect --sheets-only': ['inspect', '--sheets-only'],
+    'analyze': ['analyze'],
+}
+
+# A case is flagged when it is this much slower than the previous run (and not just noise)
+REGRESSION_RATIO = 1.20
+REGRESSION_MIN_MS = 10
+
+
+def _wall_ms(cmd):
+    start = time.perf_counter()
+    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def _heavy_imports(args):
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', *args],
+                          capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run_worker(args):
+    """Run one vaonix case in this process and print the heavy modules it imported"""
+    import contextlib
+    import io
+
+    import vaonix
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.suppress(SystemExit):
+        vaonix.main(args)
+    print(json.dumps(sorted(name for name in HEAVY_MODULES if name in sys.modules)))
+
+
+def measure(runs=RUNS):
+    results = {'python': {'ms': round(min(_wall_ms([sys.executable, '-c', 'pass']) for _ in range(runs)), 1)}}
+    for case, args in CASES.items():
+        ms = min(_wall_ms([sys.executable, VAONIX, *args]) for _ in range(runs))
+        results[case] = {'ms': round(ms, 1), 'imports': _heavy_imports(args)}
+    return results
+
+
+def _previous_run():
+    if not os.path.exists(RESULTS_FILE):
+        return None
+    with open(RESULTS_FILE, encoding='utf-8') as fh:
+        lines = fh.read().splitlines()
+    return json.loads(lines[-1]) if lines else None
+
+
+def _print_report(run, previous):
+    regressions = []
+    before = (previous or {}).get('cases', {})
+    print(f"\n{'case':<24}{'ms':>8}{'prev':>8}  heavy imports")
+    for case, now in run['cases'].items():
+        prev = before.get(case, {}).get('ms')
+        flag = ''
+        if prev is not None and now['ms'] > prev * REGRESSION_RATIO and now['ms'] - prev > REGRESSION_MIN_MS:
+            flag = '  REGRESSION'
+            regressions.append(case)
+        prev_txt = f"{prev:>8.1f}" if prev is not None else f"{'-':>8}"
+        imports = ', '.join(now.get('imports', [])) or '-'
+        print(f"{case:<24}{now['ms']:>8.1f}{prev_txt}  {imports}{flag}")
+    return regressions
+
+
+def main(runs=RUNS):
+    run = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'cases': measure(runs),
+    }
+    previous = _previous_run()
+    regressions = _print_report(run, previous)
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    with open(RESULTS_FILE, 'a', encoding='utf-8') as fh:
+        fh.write(json.dumps(run) + '\n')
+    print(f"\nResults appended to {RESULTS_FILE}")
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than the previous run (commit {previous.get('commit')})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the startup time of the vaonix commands")
+    parser.add_argument('--runs', type=int, default=RUNS,
+                        help="Runs per case, the fastest counts (default: %(default)s)")
+    parser.add_argument('--worker', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker is not None:
+        run_worker(args.worker)
+    else:
+        sys.exit(1 if main(args.runs) else 0)
@@ -0,0 +1,65 @@
+import argparse
+import random
+import time
+
+from PIL import Image, ImageDraw
+
+from fix_logo import transparent_white
+
+# Compare the per-pixel loop fix_logo.py used to run with the band-op version.
+# Usage: python scripts/bench_fix_logo.py [--sizes 500 1000 2000]
+
+
+def legacy_transparent_white(img):
+    """The original getdata() / putdata() loop"""
+    img = img.convert("RGBA")
+    datas = img.getdata()
+    new_data = []
+    for item in datas:
+        if item[0] > 240 and item[1] > 240 and item[2] > 240:
+            new_data.append((255, 255, 255, 0))
+        else:
+            new_data.append(item)
+    img.putdata(new_data)
+    return img
+
+
+def synthetic_logo(size, seed=0):
+    """White canvas with coloured shapes, near-white noise and anti-aliased edges"""
+    rng = random.Random(seed)
+    img = Image.new("RGB", (size, size), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):
+        x, y = rng.randrange(size), rng.randrange(size)
+        r = rng.randrange(size // 40 + 1, size // 6 + 2)
+        colour = tuple(rng.randrange(256) for _ in range(3))
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=colour)
+    for _ in range(size * 4):
+        x, y = rng.randrange(size), rng.randrange(size)
+        shade = rng.randrange(230, 256)
+        draw.point((x, y), fill=(shade, shade, rng.randrange(230, 256)))
+    return img.resize((size, size), Image.Resampling.BICUBIC)
+
+
+def main(sizes):
+    print(f"{'size':>11}{'loop s':>10}{'bands s':>10}{'speedup':>10}  identical")
+    for size in sizes:
+        img = synthetic_logo(size)
+
+        start = time.perf_counter()
+        expected = legacy_transparent_white(img)
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = transparent_white(img)
+        bands = time.perf_counter() - start
+
+        same = expected.tobytes() == result.tobytes()
+        print(f"{f'{size}x{size}':>11}{loop:>10.3f}{bands:>10.3f}{loop / bands:>9.0f}x  {same}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark white background removal")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 1000, 2000])
+    args = parser.parse_args()
+    main(args.sizes)
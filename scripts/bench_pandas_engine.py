@@ -0,0 +1,61 @@
+import argparse
+import filecmp
+import os
+import tempfile
+import time
+
+import generate_shopify_import as gen
+import pandas_engine
+from bom_classifier import BomClassifier
+from csv_stream import write_frame
+
+# Compare the per-row Python engine with the vectorized pandas engine.
+# Usage: python scripts/bench_pandas_engine.py [--rows 100000]
+
+
+def synthetic_entries(rows):
+    """Repeat the real price-list rows under distinct BOM prefixes until `rows` entries"""
+    base = list(gen.read_price_list(reader='xml'))
+    entries = []
+    copy = 0
+    while len(entries) < rows:
+        for bom, description, price in base:
+            entries.append((f"K{copy}-{bom}", description, price))
+            if len(entries) == rows:
+                break
+        copy += 1
+    return entries
+
+
+def run_python(entries, path):
+    shopify_rows = gen.group_rows(entries, BomClassifier())
+    shopify_rows += [gen.missing_product_row(m) for m in gen.MISSING_PRODUCTS]
+    gen.write_csv(shopify_rows, path)
+
+
+def run_pandas(entries, path):
+    write_frame(pandas_engine.build_frame(entries), path, gen.COLUMNS)
+
+
+def main(rows):
+    entries = synthetic_entries(rows)
+    out_dir = tempfile.mkdtemp()
+    timings = {}
+    for name, fn in (('python', run_python), ('pandas', run_pandas)):
+        path = os.path.join(out_dir, f'{name}.csv')
+        start = time.perf_counter()
+        fn(entries, path)
+        timings[name] = time.perf_counter() - start
+
+    identical = filecmp.cmp(os.path.join(out_dir, 'python.csv'), os.path.join(out_dir, 'pandas.csv'), shallow=False)
+    print(f"\n{len(entries)} input rows")
+    for name, seconds in timings.items():
+        print(f"  {name:<8}{seconds:>8.3f}s")
+    print(f"  speedup {timings['python'] / timings['pandas']:.1f}x, identical output: {identical}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Python and pandas row engines")
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+    main(args.rows)
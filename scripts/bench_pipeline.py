@@ -0,0 +1,167 @@
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import generate_shopify_import as gen
+from bom_classifier import DEFAULT_CACHE_SIZE, BomClassifier
+from catalog_dedup import CatalogCheck
+from csv_stream import write_products
+from run_report import peak_rss_mb
+from synthetic_price_list import write_price_list
+from workbook_readers import DEFAULT_READER, READERS
+
+# Stage-by-stage benchmark of the import pipeline on synthetic price lists.
+# Each size runs in its own process so peak RSS is per size. Results are appended
+# to BENCH_DIR/results.jsonl and compared with the previous run to spot regressions.
+# Usage: python scripts/bench_pipeline.py [--sizes 1000 10000] [--reader xml]
+
+BENCH_DIR = '.bench'
+RESULTS_FILE = os.path.join(BENCH_DIR, 'results.jsonl')
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+STAGES = ['load', 'classify', 'dedup', 'group', 'merge', 'write']
+
+# A stage is flagged when it is this much slower than the previous run (and not just noise)
+REGRESSION_RATIO = 1.20
+REGRESSION_MIN_SECONDS = 0.05
+
+
+def run_stages(path, reader=DEFAULT_READER):
+    """Run every pipeline stage once on `path` and return per-stage measurements"""
+    results = {}
+
+    def record(stage, start, rows_in, rows_out):
+        results[stage] = {
+            'seconds': round(time.perf_counter() - start, 4),
+            'rows_in': rows_in,
+            'rows_out': rows_out,
+            'peak_rss_mb': peak_rss_mb(),
+        }
+
+    start = time.perf_counter()
+    entries = list(gen.read_price_list(reader, path, use_cache=False))
+    record('load', start, None, len(entries))
+
+    # Big enough that the group stage only hits the cache
+    classifier = BomClassifier(cache_size=max(DEFAULT_CACHE_SIZE, len(entries)))
+    start = time.perf_counter()
+    kept = sum(1 for bom, description, _ in entries if not classifier.classify(bom, description).skip)
+    record('classify', start, len(entries), kept)
+
+    start = time.perf_counter()
+    rows_in = len(entries)
+    entries, _ = CatalogCheck().run(entries, classifier, gen.MISSING_PRODUCTS)
+    record('dedup', start, rows_in, len(entries))
+
+    start = time.perf_counter()
+    product_groups, standalone = gen.group_entries(entries, classifier)
+    record('group', start, len(entries), len(product_groups) + len(standalone))
+
+    start = time.perf_counter()
+    final_standalone = gen.merge_standalone(product_groups, standalone)
+    record('merge', start, len(standalone), len(product_groups) + len(final_standalone))
+
+    fd, out_path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            writer = write_products(gen.emit_products(product_groups, final_standalone), out_path, gen.COLUMNS)
+        record('write', start, len(product_groups) + len(final_standalone), writer.rows_written)
+    finally:
+        os.remove(out_path)
+    return results
+
+
+def synthetic_file(rows):
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    path = os.path.join(BENCH_DIR, f'synthetic-{rows}.xlsx')
+    if not os.path.exists(path):
+        print(f"Generating {path}...")
+        write_price_list(path, rows)
+    return path
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _previous_run(reader):
+    if not os.path.exists(RESULTS_FILE):
+        return None
+    previous = None
+    with open(RESULTS_FILE, encoding='utf-8') as fh:
+        for line in fh:
+            run = json.loads(line)
+            if run.get('reader') == reader:
+                previous = run
+    return previous
+
+
+def _print_report(run, previous):
+    regressions = []
+    print(f"\n{'rows':>9} {'stage':<9}{'seconds':>9}{'prev':>9}{'rows out':>10}{'peak MB':>9}")
+    for size, stages in run['sizes'].items():
+        before = (previous or {}).get('sizes', {}).get(size, {})
+        for stage in STAGES:
+            now = stages[stage]
+            prev = before.get(stage, {}).get('seconds')
+            flag = ''
+            if (prev is not None and now['seconds'] > prev * REGRESSION_RATIO
+                    and now['seconds'] - prev > REGRESSION_MIN_SECONDS):
+                flag = '  REGRESSION'
+                regressions.append((size, stage))
+            prev_txt = f"{prev:>9.3f}" if prev is not None else f"{'-':>9}"
+            print(f"{size:>9} {stage:<9}{now['seconds']:>9.3f}{prev_txt}{now['rows_out']:>10}"
+                  f"{now['peak_rss_mb']:>9.1f}{flag}")
+    return regressions
+
+
+def main(sizes, reader=DEFAULT_READER):
+    run = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'reader': reader,
+        'sizes': {},
+    }
+    for rows in sizes:
+        path = synthetic_file(rows)
+        print(f"Running pipeline on {rows} rows...")
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', path, '--reader', reader],
+                              capture_output=True, text=True, check=True)
+        run['sizes'][str(rows)] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    previous = _previous_run(reader)
+    regressions = _print_report(run, previous)
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    with open(RESULTS_FILE, 'a', encoding='utf-8') as fh:
+        fh.write(json.dumps(run) + '\n')
+    print(f"\nResults appended to {RESULTS_FILE}")
+    if regressions:
+        print(f"{len(regressions)} stage(s) slower than the previous run (commit {previous.get('commit')})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the import pipeline stages on synthetic price lists")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--reader', choices=sorted(READERS), default=DEFAULT_READER)
+    parser.add_argument('--worker', metavar='XLSX', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        print(json.dumps(run_stages(args.worker, args.reader)))
+    else:
+        sys.exit(1 if main(args.sizes, args.reader) else 0)
@@ -0,0 +1,78 @@
+import argparse
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import urllib.request
+from urllib.parse import urlencode
+
+from create_product_images import load_config
+from render_service import RenderService, make_server
+
+# Latency of render_service.py per cache tier: cold renders, disk hits (fresh
+# service, same disk cache), memory hits and 304 revalidations.
+# Usage: python scripts/bench_render_service.py [--requests 50]
+
+
+def _fetch(url, etag=None):
+    request = urllib.request.Request(url, headers={'If-None-Match': etag} if etag else {})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            headers = response.headers
+    except urllib.error.HTTPError as e:
+        if e.code != 304:
+            raise
+        headers = e.headers
+    return (time.perf_counter() - start) * 1000, headers
+
+
+def _serve(disk_dir):
+    server = make_server(RenderService(load_config(), disk_dir=disk_dir), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{label:<16}{len(timings):>6}{statistics.median(timings):>10.2f}{p95:>10.2f}")
+
+
+def main(requests):
+    disk_dir = tempfile.mkdtemp(prefix='render-bench-')
+    try:
+        urls = [f"/render/{'qsfp' if i % 2 else 'sfp'}.png?{urlencode({'bom': f'SFP-10G-LR-{i:04d}'})}"
+                for i in range(requests)]
+        print(f"{'tier':<16}{'reqs':>6}{'p50 ms':>10}{'p95 ms':>10}")
+
+        server = _serve(disk_dir)
+        base = f"http://127.0.0.1:{server.server_port}"
+        cold, etags = [], []
+        for url in urls:
+            elapsed, headers = _fetch(base + url)
+            cold.append(elapsed)
+            etags.append(headers['ETag'])
+        _report('cold render', cold)
+        _report('memory hit', [_fetch(base + url)[0] for url in urls])
+        _report('304', [_fetch(base + url, etag)[0] for url, etag in zip(urls, etags)])
+        server.shutdown()
+        server.server_close()
+
+        # New process state, same disk tier
+        server = _serve(disk_dir)
+        base = f"http://127.0.0.1:{server.server_port}"
+        _report('disk hit', [_fetch(base + url)[0] for url in urls])
+        server.shutdown()
+        server.server_close()
+    finally:
+        shutil.rmtree(disk_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark render_service.py cold renders and cache hits")
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+    main(args.requests)
@@ -0,0 +1,145 @@
+import argparse
+import filecmp
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+import generate_shopify_import as gen
+import pricing
+from bom_classifier import BomClassifier
+from csv_stream import write_products
+from synthetic_price_list import iter_synthetic_rows
+
+# Compare the per-row dicts generate_shopify_import used to build with VariantRow
+# records: memory held once every row is grouped (tracemalloc) and the time from
+# entries to the written CSV. Both CSVs must be byte-identical.
+# Usage: python scripts/bench_variant_records.py [--sizes 100000 1000000]
+
+
+def legacy_build_item(bom, description, price_raw, info):
+    """The original 15-key row dict"""
+    return {
+        'Handle': info.handle,
+        'Title': str(bom),
+        'Body (HTML)': description,
+        'Vendor': gen.VENDOR_NAME,
+        'Type': info.product_type,
+        'Tags': info.tags,
+        'Published': 'TRUE',
+        'Option1 Name': info.option_name,
+        'Option1 Value': info.option_value,
+        'Variant Grams': 100,
+        'Variant Inventory Policy': 'deny',
+        'Variant Inventory Qty': 100,
+        'Variant Price': round(gen.clean_price(price_raw) * pricing.DEFAULT_MULTIPLIER, 2),
+        'Variant Compare At Price': '',
+        'Image Src': ''
+    }
+
+
+def legacy_group(entries, classifier):
+    """group_entries() + merge_standalone() on dicts with '_sort' / '_is_base' keys"""
+    product_groups = {}
+    standalone = []
+    for bom, description, price_raw in entries:
+        info = classifier.classify(bom, description)
+        if info.skip:
+            continue
+        item = legacy_build_item(bom, description, price_raw, info)
+        if info.group_type:
+            group = product_groups.setdefault(gen.family_key(info),
+                                              {'type': info.group_type, 'base_title': info.base, 'variants': []})
+            item['_sort'] = info.sort
+            group['variants'].append(item)
+        else:
+            if info.is_base:
+                item['_is_base'] = True
+                item['_sort'] = info.sort
+            standalone.append(item)
+
+    final_standalone = []
+    for item in standalone:
+        if item['Handle'] in product_groups:
+            group = product_groups[item['Handle']]
+            item['Option1 Name'], item['Option1 Value'] = gen.MERGED_BASE_OPTIONS[group['type']]
+            group['variants'].append(item)
+        else:
+            item['Option1 Name'] = 'Title'
+            item['Option1 Value'] = 'Default Title'
+            final_standalone.append(item)
+    return product_groups, final_standalone
+
+
+def legacy_emit(product_groups, final_standalone):
+    while product_groups:
+        key = next(iter(product_groups))
+        group = product_groups.pop(key)
+        variants = group['variants']
+        variants.sort(key=lambda x: x['_sort'])
+        for row in variants:
+            del row['_sort']
+            row.pop('_is_base', None)
+            row['Handle'] = key
+            row['Title'] = group['base_title']
+        yield variants
+    for row in final_standalone:
+        row.pop('_sort', None)
+        row.pop('_is_base', None)
+        yield [row]
+
+
+def records_group(entries, classifier):
+    product_groups, standalone = gen.group_entries(entries, classifier)
+    return product_groups, gen.merge_standalone(product_groups, standalone)
+
+
+def grouped_mb(group, entries, classifier):
+    """Memory held by the grouped rows, on top of the entries and the classifier cache"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    grouped = group(entries, classifier)
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del grouped
+    return held / 2 ** 20
+
+
+def run(group, emit, entries, classifier, path):
+    start = time.perf_counter()
+    product_groups, final_standalone = group(entries, classifier)
+    write_products(emit(product_groups, final_standalone), path, gen.COLUMNS)
+    return time.perf_counter() - start
+
+
+def main(sizes):
+    out_dir = tempfile.mkdtemp()
+    print(f"{'rows':>9}{'dicts MB':>10}{'records MB':>12}{'dicts s':>9}{'records s':>11}{'speedup':>9}  identical")
+    for size in sizes:
+        entries = [(row[0], row[1], row[8]) for row in iter_synthetic_rows(size)]
+        classifier = BomClassifier(cache_size=len(entries))
+        for bom, description, _ in entries:
+            classifier.classify(bom, description)
+
+        dicts_mb = grouped_mb(legacy_group, entries, classifier)
+        records_mb = grouped_mb(records_group, entries, classifier)
+
+        dicts_path = os.path.join(out_dir, 'dicts.csv')
+        records_path = os.path.join(out_dir, 'records.csv')
+        dicts_s = run(legacy_group, legacy_emit, entries, classifier, dicts_path)
+        records_s = run(records_group, gen.emit_products, entries, classifier, records_path)
+        same = filecmp.cmp(dicts_path, records_path, shallow=False)
+        print(f"{size:>9}{dicts_mb:>10.1f}{records_mb:>12.1f}{dicts_s:>9.2f}{records_s:>11.2f}"
+              f"{dicts_s / records_s:>8.2f}x  {same}")
+        for path in (dicts_path, records_path):
+            os.remove(path)
+    os.rmdir(out_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark VariantRow records against the legacy row dicts")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    args = parser.parse_args()
+    main(args.sizes)
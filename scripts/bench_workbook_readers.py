@@ -0,0 +1,88 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import openpyxl
+
+from workbook_readers import READERS, cell, iter_sheet_rows
+
+# Compare the legacy full-load / random-access path with the streaming readers.
+# Usage: python scripts/bench_workbook_readers.py [--scale 20]
+
+INPUT_FILE = 'Liste de prix Vaonix 27022025.xlsm'
+SHEET_NAME = 'Liste de prix'
+
+
+def legacy_rows(path, sheet_name):
+    # What generate_shopify_import.main() used to do
+    wb = openpyxl.load_workbook(path, data_only=True)
+    ws = wb[sheet_name]
+    for row_idx in range(2, ws.max_row + 1):
+        yield (ws.cell(row=row_idx, column=1).value,
+               ws.cell(row=row_idx, column=2).value,
+               ws.cell(row=row_idx, column=9).value)
+
+
+def streaming_rows(reader):
+    def run(path, sheet_name):
+        for values in iter_sheet_rows(path, sheet_name, min_row=2, reader=reader):
+            yield cell(values, 1), cell(values, 2), cell(values, 9)
+    return run
+
+
+def build_scaled_copy(path, sheet_name, scale):
+    """Write a copy of the sheet with every data row repeated `scale` times"""
+    rows = list(iter_sheet_rows(path, sheet_name, reader='xml'))
+    out_wb = openpyxl.Workbook(write_only=True)
+    out_ws = out_wb.create_sheet(sheet_name)
+    out_ws.append(rows[0] if rows else ())
+    for _ in range(scale):
+        for values in rows[1:]:
+            out_ws.append(values)
+    fd, out_path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    out_wb.save(out_path)
+    return out_path
+
+
+def measure(fn, path, sheet_name):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = sum(1 for _ in fn(path, sheet_name))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main(scale=1):
+    path = INPUT_FILE
+    if scale > 1:
+        print(f"Building synthetic copy x{scale}...")
+        path = build_scaled_copy(INPUT_FILE, SHEET_NAME, scale)
+
+    candidates = [('legacy (full load)', legacy_rows)]
+    candidates += [(name, streaming_rows(name)) for name in READERS]
+
+    try:
+        results = []
+        for name, fn in candidates:
+            count, elapsed, peak = measure(fn, path, SHEET_NAME)
+            results.append((name, count, elapsed, peak))
+
+        baseline = results[0][2]
+        print(f"{'reader':<22}{'rows':>10}{'seconds':>10}{'peak MB':>10}{'speedup':>10}")
+        for name, count, elapsed, peak in results:
+            print(f"{name:<22}{count:>10}{elapsed:>10.3f}{peak / 1e6:>10.1f}{baseline / elapsed:>9.1f}x")
+    finally:
+        if path != INPUT_FILE:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the price-list workbook readers")
+    parser.add_argument('--scale', type=int, default=1, help="Repeat the sheet rows N times")
+    args = parser.parse_args()
+    main(scale=args.scale)
@@ -0,0 +1,206 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Single-pass classification of price-list rows.
+# Replaces the chain check_temp_variant / check_dwdm_variant / check_cwdm_variant /
+# parse_dac_length / categorize_product with precompiled patterns, one upper-casing
+# per BOM and a bounded LRU keyed on (bom, description).
+# Also holds the grouping rules every path shares (family_key, merged base options):
+# generate_shopify_import.py, catalog_dedup.py and pandas_engine.py import them from here.
+
+DEFAULT_CACHE_SIZE = 65536
+
+# Same patterns as the legacy helpers, compiled once
+DAC_LENGTH_RE = re.compile(r'^(.*?)-(\d+(?:-\d+)?)M(.*)$', re.IGNORECASE)
+TEMP_RE = re.compile(r'^(.*?)(-(?:I|E))$', re.IGNORECASE)
+DWDM_RE = re.compile(r'^(.*?)(-C(\d{2}))(.*)$', re.IGNORECASE)
+DWDM_END_RE = re.compile(r'-C\d{2}$', re.IGNORECASE)
+CWDM_RE = re.compile(r'^(.*?)-(\d{4})(?:NM)?(-[IE])?$', re.IGNORECASE)
+
+# First match wins, in this order
+FORM_FACTORS = (
+    ('QSFP-DD', 'QSFP-DD'),
+    ('QSFP28', 'QSFP28'),
+    ('QSFP+', 'QSFP+'),
+    ('QSFP', 'QSFP+'),
+    ('SFP28', 'SFP28'),
+    ('SFP+', 'SFP+'),
+    ('SFP', 'SFP'),
+    ('XFP', 'XFP'),
+)
+SPEEDS = ('400G', '100G', '40G', '25G', '10G', '1G')
+
+TEMP_GRADES = {
+    'I': ("Industrial (-40/+85°C)", 3),
+    'E': ("Extended (-10/+80°C)", 2),
+}
+CWDM_SUFFIXES = {'I': " (Ind.)", 'E': " (Ext.)"}
+
+# Option set on a standalone base merged into a group of that type
+MERGED_BASE_OPTIONS = {
+    'temp': ('Temperature', 'Commercial (0/70°C)'),
+    'channel': ('Channel (ITU)', 'Tunable / Unspecified'),
+    'wavelength': ('Wavelength', 'Unspecified'),
+    'length': ('Length', 'Standard'),
+}
+# Option of a truly standalone product
+STANDALONE_OPTION = ('Title', 'Default Title')
+
+Classification = namedtuple('Classification', [
+    'skip',          # -HP / HW rows that are filtered out
+    'handle',
+    'product_type',
+    'tags',
+    'form_factor',   # tag value or None
+    'speed',         # tag value or None
+    'group_type',    # 'length', 'wavelength', 'channel', 'temp' or None
+    'base',          # base BOM of the variant group
+    'option_name',
+    'option_value',
+    'sort',
+    'is_base',       # candidate Commercial base of a group
+])
+
+
+class BomClassifier:
+    def __init__(self, cache_size=DEFAULT_CACHE_SIZE):
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def cache_info(self):
+        return self.classify.cache_info()
+
+    # Variant detectors (same return values as the legacy helpers)
+
+    def dac_length(self, bom):
+        match = DAC_LENGTH_RE.search(bom)
+        if match:
+            base, len_str, suffix = match.groups()
+            length_val = len_str.replace('-', '.')
+            clean_suffix = suffix.strip('- ')
+            variant_name = f"{length_val}m"
+            if clean_suffix:
+                variant_name += f" ({clean_suffix})"
+            return base, variant_name, float(length_val)
+        return None, None, None
+
+    def temp_variant(self, bom):
+        match = TEMP_RE.search(bom)
+        if match:
+            variant_name, weight = TEMP_GRADES[match.group(2)[1].upper()]
+            return match.group(1), variant_name, weight
+        return None, None, None
+
+    def dwdm_variant(self, bom):
+        if not DWDM_END_RE.search(bom):
+            return None, None, None
+        match = DWDM_RE.search(bom)
+        if not match:
+            return None, None, None
+        # Channel number comes from the first -Cxx, the base strips the trailing one
+        channel = int(match.group(3))
+        base = DWDM_END_RE.sub('', bom)
+        return base, f"Channel {channel} (C{channel})", channel
+
+    def cwdm_variant(self, bom):
+        match = CWDM_RE.search(bom)
+        if match:
+            base, wave, suffix = match.groups()
+            if 1270 <= int(wave) <= 1610:
+                variant_name = f"{wave}nm"
+                if suffix:
+                    variant_name += CWDM_SUFFIXES.get(suffix.replace('-', '').upper(), '')
+                return base, variant_name, int(wave)
+        return None, None, None
+
+    def categorize(self, bom, description):
+        result = self._categorize(str(bom).upper(), str(description).upper())
+        return result[0], result[1]
+
+    def _categorize(self, bom_u, desc_u):
+        tags = []
+        if 'DAC' in bom_u or 'CABLE' in desc_u:
+            product_type = "Network Cable"
+            tags += ("DAC", "Cable")
+        elif 'AOC' in bom_u:
+            product_type = "Active Optical Cable"
+            tags += ("AOC", "Cable")
+        else:
+            product_type = "Optical Transceiver"
+            tags.append("Transceiver")
+
+        form_factor = next((tag for needle, tag in FORM_FACTORS if needle in bom_u), None)
+        if form_factor:
+            tags.append(form_factor)
+
+        if 'DWDM' in bom_u or 'DWDM' in desc_u: tags.append('DWDM')
+        if 'CWDM' in bom_u or 'CWDM' in desc_u: tags.append('CWDM')
+        if 'BIDI' in bom_u or 'BIDI' in desc_u: tags.append('BiDi')
+        if 'TUNABLE' in desc_u: tags.append('Tunable')
+
+        speed = next((s for s in SPEEDS if s in bom_u), None)
+        if speed:
+            tags.append(speed)
+
+        return product_type, ", ".join(tags), form_factor, speed
+
+    # Full row classification
+
+    def _classify(self, bom, description):
+        bom_s = str(bom)
+        bom_u = bom_s.upper()
+        desc_u = str(description).upper()
+        handle = bom_handle(bom_s)
+
+        if '-HP' in bom_u or ' HW' in bom_u or ' HW' in desc_u:
+            return Classification(True, handle, None, None, None, None,
+                                  None, None, None, None, None, False)
+
+        product_type, tags, form_factor, speed = self._categorize(bom_u, desc_u)
+        row = (handle, product_type, tags, form_factor, speed)
+
+        is_cable = 'DAC' in bom_u or ('AOC' in bom_u and 'CABLE' in desc_u)
+        if is_cable:
+            base, name, sort = self.dac_length(bom_s)
+            if base:
+                return Classification(False, *row, 'length', base, 'Length', name, sort, False)
+            return Classification(False, *row, None, None, 'Title', 'Default Title', None, False)
+
+        base, name, sort = self.cwdm_variant(bom_s)
+        if base:
+            return Classification(False, *row, 'wavelength', base, 'Wavelength', name, sort, False)
+
+        base, name, sort = self.dwdm_variant(bom_s)
+        if base:
+            return Classification(False, *row, 'channel', base, 'Channel (ITU)', name, sort, False)
+
+        base, name, sort = self.temp_variant(bom_s)
+        if base:
+            return Classification(False, *row, 'temp', base, 'Temperature', name, sort, False)
+
+        return Classification(False, *row, None, None, 'Temperature', 'Commercial (0/70°C)', 1, True)
+
+
+# Product grouping
+
+def bom_handle(bom):
+    """Shopify handle of a BOM"""
+    return str(bom).lower().replace(' ', '-').replace('--', '-')
+
+
+def family_key(info):
+    """Handle of the Shopify product a classified row ends up in"""
+    if info.group_type:
+        return info.base.lower().replace(' ', '-')
+    return info.handle
+
+
+def product_option(info, group_types):
+    """Option1 Value a kept row ends up with, like merge_standalone() sets it.
+
+    group_types maps the handle of every variant group to its group type.
+    """
+    if info.group_type:
+        return info.option_value
+    group_type = group_types.get(info.handle)
+    return MERGED_BASE_OPTIONS[group_type][1] if group_type else STANDALONE_OPTION[1]
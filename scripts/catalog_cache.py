@@ -0,0 +1,322 @@
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import time
+from functools import lru_cache
+
+from workbook_readers import DEFAULT_READER, iter_sheet_rows, sheet_names as workbook_sheet_names
+
+# Columnar cache of the price-list workbooks, shared by generate_shopify_import.py,
+# analyze_price_list.py and inspect_excel.py.
+# Each sheet is stored once as Parquet under CACHE_DIR. A cache entry is valid while
+# the workbook keeps the same size and mtime, or, if only the mtime moved, the same
+# sha256. Stale or missing entries are rebuilt from Excel on first use.
+# Entries are written BATCH_SIZE rows at a time, so a build never holds the whole sheet.
+
+CACHE_DIR = '.catalog_cache'
+# Bump when a reader changes the values it returns, or the encoding changes
+CACHE_VERSION = 3
+BATCH_SIZE = 4096
+
+# Columns whose cells mix Python types are stored as JSON text; values JSON has no
+# type for are tagged, e.g. ["datetime", "2025-02-27T00:00:00"], and decoded back
+JSON_ENCODING = 'json'
+TAGGED_TYPES = {
+    datetime.datetime: ('datetime', datetime.datetime.isoformat, datetime.datetime.fromisoformat),
+    datetime.date: ('date', datetime.date.isoformat, datetime.date.fromisoformat),
+    datetime.time: ('time', datetime.time.isoformat, datetime.time.fromisoformat),
+    datetime.timedelta: ('timedelta', lambda v: v // datetime.timedelta(microseconds=1),
+                         lambda us: datetime.timedelta(microseconds=us)),
+}
+DECODERS = {tag: decode for tag, _, decode in TAGGED_TYPES.values()}
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _arrow():
+    # Imported on first use: pyarrow alone costs more than the rest of the pipeline's imports
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:  # no cache without pyarrow, every read goes to Excel
+        return None, None
+    return pa, pq
+
+
+def cache_enabled():
+    return _arrow()[1] is not None
+
+
+def _key(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _entry_paths(path, name):
+    entry_dir = os.path.join(CACHE_DIR, _key(os.path.abspath(path)))
+    base = os.path.join(entry_dir, _key(name))
+    return entry_dir, base + '.parquet', base + '.json'
+
+
+def _sheet_entry(sheet_name, reader):
+    # The readers differ on some cell values, their entries are kept apart
+    return f'sheet:{reader}:{sheet_name}'
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return {'version': CACHE_VERSION, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _write_json(data, path):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump(data, fh, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _load_valid_meta(path, meta_path):
+    """Return the entry metadata if it still matches the workbook, else None"""
+    try:
+        with open(meta_path, encoding='utf-8') as fh:
+            meta = json.load(fh)
+    except (FileNotFoundError, ValueError):
+        # Missing, or truncated by an interrupted write: rebuilt like a stale entry
+        return None
+    stamp = _stamp(path)
+    if meta.get('version') != CACHE_VERSION or meta.get('size') != stamp['size']:
+        return None
+    if meta.get('mtime_ns') == stamp['mtime_ns']:
+        return meta
+    # Touched but maybe not modified (e.g. re-saved without changes)
+    if meta.get('sha256') == file_sha256(path):
+        meta['mtime_ns'] = stamp['mtime_ns']
+        _write_json(meta, meta_path)
+        return meta
+    return None
+
+
+ARROW_TYPES = {'str': 'string', 'int': 'int64', 'float': 'float64', 'bool': 'bool_', JSON_ENCODING: 'string'}
+INT64_RANGE = range(-2 ** 63, 2 ** 63)
+
+
+def _column(rows, idx):
+    return [row[idx] if idx < len(row) else None for row in rows]
+
+
+def _batch_encoding(values):
+    """Encoding a batch of column values needs: their one Python type, JSON if mixed, None if all empty"""
+    kinds = {type(v) for v in values if v is not None}
+    if not kinds:
+        return None
+    if len(kinds) == 1:
+        kind = next(iter(kinds))
+        if kind is int and not all(v in INT64_RANGE for v in values if v is not None):
+            return JSON_ENCODING
+        if kind in (str, int, float, bool, datetime.datetime):
+            return kind.__name__
+    return JSON_ENCODING
+
+
+def _arrow_type(encoding):
+    pa, _ = _arrow()
+    if encoding == 'datetime':
+        return pa.timestamp('us')
+    return getattr(pa, ARROW_TYPES[encoding])()
+
+
+def _encode_json(value):
+    tagged = TAGGED_TYPES.get(type(value))
+    if tagged is not None:
+        value = [tagged[0], tagged[1](value)]
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _decode_json(text):
+    value = json.loads(text)
+    # Cells are scalars: a list is always a tagged value
+    if isinstance(value, list):
+        return DECODERS[value[0]](value[1])
+    return value
+
+
+def _column_array(values, encoding):
+    pa, _ = _arrow()
+    if encoding == JSON_ENCODING:
+        values = [None if v is None else _encode_json(v) for v in values]
+    return pa.array(values, type=_arrow_type(encoding))
+
+
+def _fit_batch(rows, encodings):
+    """Encodings that also fit this batch: conflicting and new columns fall back to JSON text"""
+    width = max(len(encodings), max(len(row) for row in rows))
+    fitted = list(encodings) + [JSON_ENCODING] * (width - len(encodings))
+    for idx, encoding in enumerate(encodings):
+        if _batch_encoding(_column(rows, idx)) not in (None, encoding):
+            fitted[idx] = JSON_ENCODING
+    return fitted
+
+
+def _batches(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _write_batches(path, sheet_name, reader, tmp_path, encodings=None):
+    """Stream the sheet into tmp_path, one BATCH_SIZE row group at a time.
+
+    The schema is fixed by encodings or, if None, by the first batch (columns empty in it are
+    stored as JSON text). Returns (row count, encodings), or (None, widened encodings) when a
+    later batch does not fit: the rest of the sheet is then only scanned to widen them.
+    """
+    pa, pq = _arrow()
+    writer, rows, fits = None, 0, True
+    try:
+        for batch in _batches(iter_sheet_rows(path, sheet_name, reader=reader)):
+            if encodings is None:
+                encodings = [_batch_encoding(_column(batch, idx)) or JSON_ENCODING
+                             for idx in range(max(len(row) for row in batch))]
+            fitted = _fit_batch(batch, encodings)
+            if fitted != encodings:
+                encodings, fits = fitted, False
+            if not fits:
+                continue
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, pa.schema(
+                    [(f'c{idx + 1}', _arrow_type(enc)) for idx, enc in enumerate(encodings)]))
+            columns = [_column_array(_column(batch, idx), enc) for idx, enc in enumerate(encodings)]
+            writer.write_table(pa.table(columns, schema=writer.schema))
+            rows += len(batch)
+        if writer is None and fits:
+            # Empty sheet
+            encodings = []
+            writer = pq.ParquetWriter(tmp_path, pa.schema([]))
+    finally:
+        if writer is not None:
+            writer.close()
+    return (rows if fits else None), encodings
+
+
+def _build_sheet(path, sheet_name, reader, parquet_path, meta_path):
+    os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+    tmp_path = parquet_path + '.tmp'
+    rows, encodings = _write_batches(path, sheet_name, reader, tmp_path)
+    if rows is None:
+        # Second and last pass: the widened encodings fit every batch
+        rows, encodings = _write_batches(path, sheet_name, reader, tmp_path, encodings)
+    os.replace(tmp_path, parquet_path)
+
+    meta = dict(_stamp(path), sha256=file_sha256(path), sheet=sheet_name, reader=reader,
+                rows=rows, columns=len(encodings), encodings=encodings)
+    _write_json(meta, meta_path)
+    return meta
+
+
+def _iter_cached(parquet_path, meta, min_row):
+    json_columns = [idx for idx, enc in enumerate(meta['encodings']) if enc == JSON_ENCODING]
+    row_num = 0
+    _, pq = _arrow()
+    for batch in pq.ParquetFile(parquet_path).iter_batches(batch_size=BATCH_SIZE):
+        columns = [batch.column(idx).to_pylist() for idx in range(batch.num_columns)]
+        for idx in json_columns:
+            columns[idx] = [None if v is None else _decode_json(v) for v in columns[idx]]
+        for row in zip(*columns):
+            row_num += 1
+            if row_num >= min_row:
+                yield row
+    if not meta['columns']:
+        # Zero-width sheet: keep the row count
+        for row_num in range(max(min_row, 1), meta['rows'] + 1):
+            yield ()
+
+
+def iter_rows(path, sheet_name, min_row=1, reader=DEFAULT_READER, use_cache=True):
+    """Yield value tuples for a sheet, from the cache when it is fresh"""
+    if not use_cache or not cache_enabled():
+        yield from iter_sheet_rows(path, sheet_name, min_row=min_row, reader=reader)
+        return
+
+    entry_dir, parquet_path, meta_path = _entry_paths(path, _sheet_entry(sheet_name, reader))
+    meta = _load_valid_meta(path, meta_path)
+    if meta is None or not os.path.exists(parquet_path):
+        meta = _build_sheet(path, sheet_name, reader, parquet_path, meta_path)
+    yield from _iter_cached(parquet_path, meta, min_row)
+
+
+def read_rows(path, sheet_name, min_row=1, reader=DEFAULT_READER, use_cache=True):
+    return list(iter_rows(path, sheet_name, min_row=min_row, reader=reader, use_cache=use_cache))
+
+
+def sheet_names(path, use_cache=True):
+    if not use_cache or not cache_enabled():
+        return workbook_sheet_names(path)
+
+    entry_dir, _, meta_path = _entry_paths(path, 'sheets')
+    meta = _load_valid_meta(path, meta_path)
+    if meta is None:
+        meta = dict(_stamp(path), sha256=file_sha256(path), sheets=workbook_sheet_names(path))
+        os.makedirs(entry_dir, exist_ok=True)
+        _write_json(meta, meta_path)
+    return meta['sheets']
+
+
+def clear():
+    import shutil
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+def main(paths, reader=DEFAULT_READER):
+    """Report cold (Excel) and warm (cache) read times side by side"""
+    if not cache_enabled():
+        print("pyarrow is not installed, the catalog cache is disabled.")
+        return
+
+    print(f"{'sheet':<45}{'rows':>8}{'cold s':>10}{'warm s':>10}{'speedup':>10}")
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"File {path} not found")
+            continue
+        for sheet in workbook_sheet_names(path):
+            _, parquet_path, meta_path = _entry_paths(path, _sheet_entry(sheet, reader))
+            for stale in (parquet_path, meta_path):
+                if os.path.exists(stale):
+                    os.remove(stale)
+
+            start = time.perf_counter()
+            count = len(read_rows(path, sheet, reader=reader))
+            cold = time.perf_counter() - start
+
+            start = time.perf_counter()
+            read_rows(path, sheet, reader=reader)
+            warm = time.perf_counter() - start
+
+            label = f"{os.path.basename(path)[:22]} / {sheet}"
+            print(f"{label:<45}{count:>8}{cold:>10.3f}{warm:>10.3f}{cold / warm:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the columnar catalog cache and compare cold and warm reads")
+    parser.add_argument('files', nargs='*', default=[
+        'Liste de prix Vaonix 27022025.xlsm',
+        'boms-selling-prices-20260115-163935.xlsx',
+    ])
+    parser.add_argument('--clear', action='store_true', help="Delete the cache and exit")
+    args = parser.parse_args()
+    if args.clear:
+        clear()
+    else:
+        main(args.files)
@@ -0,0 +1,158 @@
+import re
+from collections import namedtuple
+
+from bom_classifier import bom_handle, family_key, product_option
+from multi_source import canonical_bom
+
+# Duplicate and handle-collision checks, run by generate_shopify_import.py between
+# loading and grouping. Every check is a hash lookup in one pass over the rows (two
+# for option keys, which need the set of variant groups first), never a pairwise
+# comparison:
+#   duplicate_row       same canonical BOM, same description and price as an earlier row
+#   conflicting_bom     same canonical BOM, different description or price
+#   handle_collision    distinct canonical BOMs that normalize to the same handle
+#   duplicate_option    a second row for the same (product handle, option value), which
+#                       Shopify merges or rejects
+#   injected_duplicate  a MISSING_PRODUCTS entry that the sheet already has
+#   near_duplicate      distinct BOMs with the same normalized-token fingerprint
+# Policy 'report' only lists findings, 'resolve' drops the later row of every
+# duplicate (first occurrence wins, near-duplicates are only reported) and 'fail'
+# raises before anything is written.
+
+POLICIES = ('report', 'resolve', 'fail')
+DEFAULT_POLICY = 'report'
+
+# Findings 'resolve' can fix by dropping the later row
+DROPPABLE = ('duplicate_row', 'duplicate_option', 'injected_duplicate')
+# Findings 'fail' tolerates
+WARNINGS = ('near_duplicate',)
+
+Finding = namedtuple('Finding', ['kind', 'key', 'entries', 'action'])
+
+FINGERPRINT_TOKEN_RE = re.compile(r'[A-Z]+|\d+(?:[.,]\d+)?[A-Z]*')
+# Wavelengths are written with or without the unit
+WAVELENGTH_UNIT_RE = re.compile(r'(?<=\d)NM(?![A-Z])')
+
+
+class CatalogCollisionError(Exception):
+    pass
+
+
+def bom_fingerprint(bom):
+    """Order- and punctuation-insensitive BOM key: 'SFP10G LR' and 'SFP-10G-LR' match"""
+    key = canonical_bom(bom)
+    if 'NM' in key:
+        key = WAVELENGTH_UNIT_RE.sub('', key)
+    return ' '.join(sorted(FINGERPRINT_TOKEN_RE.findall(key)))
+
+
+class CatalogCheck:
+    def __init__(self, policy=DEFAULT_POLICY):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown collision policy '{policy}', expected one of {POLICIES}")
+        self.policy = policy
+        self.findings = []
+
+    def _add(self, kind, key, entries):
+        action = 'dropped' if self.policy == 'resolve' and kind in DROPPABLE else 'kept'
+        self.findings.append(Finding(kind, key, entries, action))
+        return action == 'dropped'
+
+    def run(self, entries, classifier, missing_products=()):
+        """Check (bom, description, raw price) entries and the injected products.
+
+        Returns the entries and injected products to build the catalog from.
+        """
+        infos = [classifier.classify(entry[0], entry[1]) for entry in entries]
+        kept, injected = self.check(entries, infos, missing_products)
+        return [entries[idx] for idx in kept], injected
+
+    def check(self, entries, infos, missing_products=()):
+        """Same as run() on classifications computed elsewhere (one per entry, e.g. the pandas
+        engine's classification columns): only skip, handle, group_type, base and option_value
+        are read. Returns the indexes of the entries to keep and the injected products.
+        """
+        first_by_key = {}
+        key_by_handle = {}
+        first_by_fingerprint = {}
+        shared_fingerprints = {}
+        duplicates = set()
+        group_families = {}
+
+        for idx, (entry, info) in enumerate(zip(entries, infos)):
+            bom = entry[0]
+            if info.group_type and not info.skip:
+                group_families.setdefault(info.base.lower().replace(' ', '-'), info.group_type)
+
+            key = canonical_bom(bom)
+            first = first_by_key.setdefault(key, idx)
+            if first != idx:
+                if entries[first][1:] == entry[1:]:
+                    duplicates.add(idx)
+                    self._add('duplicate_row', key, [entries[first], entry])
+                else:
+                    self._add('conflicting_bom', key, [entries[first], entry])
+                continue
+
+            handle = bom_handle(bom)
+            other = key_by_handle.setdefault(handle, key)
+            if other != key:
+                self._add('handle_collision', handle, [entries[first_by_key[other]], entry])
+            fingerprint = bom_fingerprint(key)
+            other = first_by_fingerprint.setdefault(fingerprint, idx)
+            if other != idx:
+                shared_fingerprints.setdefault(fingerprint, [other]).append(idx)
+
+        for fingerprint, indexes in shared_fingerprints.items():
+            if len({bom_handle(entries[idx][0]) for idx in indexes}) > 1:
+                self._add('near_duplicate', fingerprint, [entries[idx] for idx in indexes])
+
+        # Option each row ends up with, mirroring merge_standalone()
+        first_by_option = {}
+        kept = []
+        for idx, entry in enumerate(entries):
+            if idx in duplicates:
+                if self.policy != 'resolve':
+                    kept.append(idx)
+                continue
+            info = infos[idx]
+            if info.skip:
+                kept.append(idx)
+                continue
+            handle = family_key(info)
+            option = product_option(info, group_families)
+            first = first_by_option.setdefault((handle, option), idx)
+            if first != idx and self._add('duplicate_option', f"{handle} / {option}", [entries[first], entry]):
+                continue
+            kept.append(idx)
+
+        injected = []
+        for missing in missing_products:
+            handle = bom_handle(missing['Bom'])
+            if canonical_bom(missing['Bom']) in first_by_key or handle in key_by_handle or handle in group_families:
+                if self._add('injected_duplicate', missing['Bom'], [(missing['Bom'], missing['Description'],
+                                                                     missing['Price'])]):
+                    continue
+            injected.append(missing)
+
+        if self.policy == 'fail' and any(f.kind not in WARNINGS for f in self.findings):
+            raise CatalogCollisionError(self.summary())
+        return kept, injected
+
+    def counts(self):
+        counts = {}
+        for finding in self.findings:
+            counts[finding.kind] = counts.get(finding.kind, 0) + 1
+        return counts
+
+    def summary(self, limit=10):
+        if not self.findings:
+            return "No duplicates or handle collisions."
+        lines = [f"{len(self.findings)} duplicate / collision findings ("
+                 + ', '.join(f"{kind} {n}" for kind, n in sorted(self.counts().items())) + "):"]
+        for finding in self.findings[:limit]:
+            boms = ' | '.join(f"{bom} ({description})" for bom, description, _ in finding.entries[:3])
+            lines.append(f"  {finding.kind:<19}{finding.action:<8}{finding.key}: {boms}")
+        if len(self.findings) > limit:
+            lines.append(f"  ... {len(self.findings) - limit} more")
+        return '\n'.join(lines)
@@ -1,124 +1,239 @@
-from PIL import Image, ImageDraw
+from PIL import Image, ImageDraw, ImageFont
+import argparse
+import io
+import json
+import math
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-# Paths
-base_dir = r"c:\VAONIXSHOP\public\images"
-products_dir = os.path.join(base_dir, "products")
-logo_path = os.path.join(base_dir, "vaonix-logo.png")
-
-# Load logo
-logo = Image.open(logo_path).convert("RGBA")
-
-# Product configurations (image path, label position and transform)
-products = [
-    {
-        "name": "vaonix-sfp.png",
-        "base": "sfp-base.png",
-        "label": {
-            "top": 0.282,
-            "left": 0.479,
-            "width": 0.359,
-            "height": 0.115,
-            "rotation": -31.1,
-            "skew_x": 28.1
-        }
-    },
-    {
-        "name": "vaonix-sfp28.png",
-        "base": "sfp-base.png",  # Using same base as SFP
-        "label": {
-            "top": 0.282,
-            "left": 0.479,
-            "width": 0.359,
-            "height": 0.115,
-            "rotation": -31.1,
-            "skew_x": 28.1
-        }
-    },
-    {
-        "name": "vaonix-qsfp28.png",
-        "base": "qsfp-base-purple.png",
-        "label": {
-            "top": 0.38,
-            "left": 0.48,
-            "width": 0.28,
-            "height": 0.12,
-            "rotation": -37,
-            "skew_x": 20
-        }
-    },
-    {
-        "name": "vaonix-qsfp-dd.png",
-        "base": "qsfp-base-purple.png",  # Using same base as QSFP28
-        "label": {
-            "top": 0.38,
-            "left": 0.48,
-            "width": 0.28,
-            "height": 0.12,
-            "rotation": -37,
-            "skew_x": 20
-        }
-    },
-    {
-        "name": "vaonix-osfp.png",
-        "base": "qsfp-base-purple.png",  # Using same base as QSFP
-        "label": {
-            "top": 0.38,
-            "left": 0.48,
-            "width": 0.28,
-            "height": 0.12,
-            "rotation": -37,
-            "skew_x": 20
-        }
-    }
-]
-
-def create_label_with_logo(base_img, logo_img, label_config):
-    """Create a white label with logo and overlay it on the base image"""
+from render_cache import MANIFEST_FILE, RenderManifest, file_digest, render_key, write_atomic
+
+# Render the Vaonix label onto the product base images.
+# Product configs (output name, base image, label position and transform) are read
+# from a JSON file. Every worker decodes each base image and each logo size once,
+# and the products are rendered across a process pool. Outputs whose base image,
+# logo and label config are unchanged since the last run are skipped (render_cache.py).
+# Usage: python scripts/create_product_images.py [--config CONFIG.json] [--workers N]
+
+IMAGES_DIR = os.path.join("public", "images")
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "product_images.json")
+# zlib level of the saved PNGs; encoding takes most of the render time (6 is Pillow's default)
+COMPRESS_LEVEL = 6
+
+def load_config(path=CONFIG_FILE):
+    """{'logo': logo file in the images dir, 'products': [{'name', 'base', 'label'}, ...]}"""
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+class LogoSizes:
+    """The decoded logo and its thumbnails, resized once per label box size"""
+    def __init__(self, logo_img):
+        self.logo = logo_img
+        self._fitted = {}
+
+    def fit(self, box):
+        fitted = self._fitted.get(box)
+        if fitted is None:
+            fitted = self.logo.copy()
+            fitted.thumbnail(box, Image.Resampling.LANCZOS)
+            self._fitted[box] = fitted
+        return fitted
+
+def label_transform(label_w, label_h, label_x, label_y, rotation, skew_x=0):
+    """Affine placement of a label_w x label_h label on the base image.
+
+    The label is sheared by skew_x, then rotated by rotation (degrees, counter-clockwise
+    like Image.rotate) around its centre, which stays where the rotated label used to be
+    centred. Returns the (x, y, width, height) region it covers and the Image.transform
+    AFFINE coefficients mapping region pixels back to label pixels.
+    """
+    theta = math.radians(rotation)
+    cos, sin = math.cos(theta), math.sin(theta)
+    shear = math.tan(math.radians(skew_x))
+    # Forward matrix (rotation @ shear), label centre -> base image
+    a, b = cos, cos * shear + sin
+    c, d = -sin, -sin * shear + cos
+
+    # Centre of the bounding box Image.rotate(expand=True) used to paste at (label_x, label_y)
+    cx = label_x + (abs(label_w * cos) + abs(label_h * sin)) / 2
+    cy = label_y + (abs(label_w * sin) + abs(label_h * cos)) / 2
+    half_w, half_h = label_w / 2, label_h / 2
+    corners = [(a * u + b * v + cx, c * u + d * v + cy) for u in (-half_w, half_w) for v in (-half_h, half_h)]
+    x0 = math.floor(min(x for x, _ in corners))
+    y0 = math.floor(min(y for _, y in corners))
+    x1 = math.ceil(max(x for x, _ in corners))
+    y1 = math.ceil(max(y for _, y in corners))
+
+    # Inverse matrix, region pixel -> label pixel
+    det = a * d - b * c
+    ia, ib, ic, id_ = d / det, -b / det, -c / det, a / det
+    coeffs = (
+        ia, ib, ia * (x0 - cx) + ib * (y0 - cy) + half_w,
+        ic, id_, ic * (x0 - cx) + id_ * (y0 - cy) + half_h,
+    )
+    return (x0, y0, x1 - x0, y1 - y0), coeffs
+
+def draw_label_text(label, text, top):
+    """Centre one line of text (e.g. the BOM) on the label below y=top"""
+    draw = ImageDraw.Draw(label)
+    area_w, area_h = int(label.width * 0.9), label.height - top
+    size = max(6, int(area_h * 0.6))
+    font = ImageFont.load_default(size=size)
+    text_w = draw.textlength(text, font=font)
+    if text_w > area_w:
+        font = ImageFont.load_default(size=max(6, int(size * area_w / text_w)))
+    left, upper, right, lower = draw.textbbox((0, 0), text, font=font)
+    x = (label.width - (right - left)) // 2 - left
+    y = top + (area_h - (lower - upper)) // 2 - upper
+    draw.text((x, y), text, font=font, fill=(40, 40, 40, 255))
+
+def create_label_with_logo(base_img, logo_img, label_config, logo_sizes=None, text=None):
+    """Create a white label with logo (and optional text below it) and overlay it on the base image"""
     base = base_img.copy()
     w, h = base.size
-    
+
     # Calculate label dimensions
     label_w = int(w * label_config["width"])
     label_h = int(h * label_config["height"])
     label_x = int(w * label_config["left"])
     label_y = int(h * label_config["top"])
-    
+
     # Create white background for label
     label = Image.new("RGBA", (label_w, label_h), (255, 255, 255, 255))
-    
-    # Resize logo to fit label (with padding)
-    logo_resized = logo_img.copy()
-    logo_resized.thumbnail((int(label_w * 0.8), int(label_h * 0.8)), Image.Resampling.LANCZOS)
-    
+
+    # Resize logo to fit label (with padding), above the text line if there is one
+    logo_area_h = int(label_h * 0.65) if text else label_h
+    box = (int(label_w * 0.8), int(logo_area_h * 0.8))
+    if logo_sizes is not None:
+        logo_resized = logo_sizes.fit(box)
+    else:
+        logo_resized = logo_img.copy()
+        logo_resized.thumbnail(box, Image.Resampling.LANCZOS)
+
     # Center logo on label
     logo_x = (label_w - logo_resized.width) // 2
-    logo_y = (label_h - logo_resized.height) // 2
+    logo_y = (logo_area_h - logo_resized.height) // 2
     label.paste(logo_resized, (logo_x, logo_y), logo_resized)
-    
-    # Rotate label
-    label = label.rotate(label_config["rotation"], expand=True, resample=Image.Resampling.BICUBIC)
-    
-    # Paste label onto base image
-    # Note: Skew transform is complex in PIL, we'll approximate with rotation
-    base.paste(label, (label_x, label_y), label)
-    
+    if text:
+        draw_label_text(label, text, logo_area_h)
+
+    # Skew, rotate and place the label in one resample, onto a region just big enough for it
+    (x0, y0, region_w, region_h), coeffs = label_transform(
+        label_w, label_h, label_x, label_y, label_config["rotation"], label_config.get("skew_x", 0))
+    warped = label.transform((region_w, region_h), Image.Transform.AFFINE, coeffs,
+                             resample=Image.Resampling.BICUBIC)
+    base.paste(warped, (x0, y0), warped)
+
     return base
 
-# Process each product
-for product in products:
-    print(f"Processing {product['name']}...")
-    
-    # Load base image
-    base_path = os.path.join(products_dir, product["base"])
-    base_img = Image.open(base_path).convert("RGBA")
-    
-    # Create image with logo
-    result = create_label_with_logo(base_img, logo, product["label"])
-    
-    # Save result
-    output_path = os.path.join(products_dir, product["name"])
-    result.save(output_path, "PNG")
-    print(f"  Saved to {output_path}")
-
-print("\nAll images created successfully!")
+class Renderer:
+    """Renders products with a decoded logo and the base images decoded so far"""
+    def __init__(self, logo_path, products_dir, compress_level=COMPRESS_LEVEL):
+        self.logo_sizes = LogoSizes(Image.open(logo_path).convert("RGBA"))
+        self.products_dir = products_dir
+        self.compress_level = compress_level
+        self._bases = {}
+
+    def base(self, name):
+        img = self._bases.get(name)
+        if img is None:
+            img = Image.open(os.path.join(self.products_dir, name)).convert("RGBA")
+            self._bases[name] = img
+        return img
+
+    def encode(self, base_name, label_config, text=None):
+        """Render base_name with the label and return the PNG bytes"""
+        result = create_label_with_logo(self.base(base_name), self.logo_sizes.logo, label_config, self.logo_sizes,
+                                        text)
+        buffer = io.BytesIO()
+        result.save(buffer, "PNG", compress_level=self.compress_level)
+        return buffer.getvalue()
+
+    def render(self, product, output_paths):
+        """Render one product config and write it (atomically) to every output path"""
+        print(f"Processing {product['name']}...")
+        data = self.encode(product["base"], product["label"])
+        for output_path in output_paths:
+            write_atomic(output_path, data)
+            print(f"  Saved to {output_path}")
+        return output_paths
+
+# One Renderer per worker process, built by the pool initializer
+_renderer = None
+
+def _init_worker(logo_path, products_dir, compress_level):
+    global _renderer
+    _renderer = Renderer(logo_path, products_dir, compress_level)
+
+def _render_job(job):
+    return _renderer.render(*job)
+
+def render_products(config, images_dir=IMAGES_DIR, output_dir=None, workers=None,
+                    compress_level=COMPRESS_LEVEL, force=False, manifest_path=MANIFEST_FILE):
+    """Render the products whose inputs changed since the last run; returns the output paths in config order"""
+    products_dir = os.path.join(images_dir, "products")
+    output_dir = output_dir or products_dir
+    os.makedirs(output_dir, exist_ok=True)
+    logo_path = os.path.join(images_dir, config["logo"])
+    products = config["products"]
+
+    manifest = RenderManifest(manifest_path)
+    logo_digest = file_digest(logo_path)
+    base_digests = {}
+    # Render key -> (product config, outputs); identical renders are done once
+    jobs = {}
+    paths = []
+    for product in products:
+        output_path = os.path.join(output_dir, product["name"])
+        paths.append(output_path)
+        base = product["base"]
+        if base not in base_digests:
+            base_digests[base] = file_digest(os.path.join(products_dir, base))
+        key = render_key(base_digests[base], logo_digest, product["label"], compress_level)
+        if not force and manifest.is_fresh(output_path, key):
+            continue
+        jobs.setdefault(key, (product, []))[1].append(output_path)
+
+    # Products sharing a base go to the same chunk so it is decoded by fewer workers
+    pending = sorted(jobs.values(), key=lambda job: job[0]["base"])
+    if workers == 1 or len(pending) <= 1:
+        if pending:
+            renderer = Renderer(logo_path, products_dir, compress_level)
+            for job in pending:
+                renderer.render(*job)
+    else:
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(pending) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(logo_path, products_dir, compress_level)) as pool:
+            list(pool.map(_render_job, pending, chunksize=chunksize))
+
+    for key, (product, output_paths) in jobs.items():
+        for output_path in output_paths:
+            manifest.record(output_path, key)
+    manifest.save()
+
+    written = sum(len(output_paths) for _, output_paths in jobs.values())
+    print(f"{len(jobs)} rendered, {written} written, {len(products) - written} unchanged")
+    return paths
+
+def cli(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Render the Vaonix label onto the product base images")
+    parser.add_argument('--config', default=CONFIG_FILE, help="Product image configs (default: %(default)s)")
+    parser.add_argument('--images-dir', default=IMAGES_DIR,
+                        help="Directory with the logo and the products/ base images (default: %(default)s)")
+    parser.add_argument('--out', help="Output directory (default: IMAGES_DIR/products)")
+    parser.add_argument('--workers', type=int, help="Render processes (default: one per CPU)")
+    parser.add_argument('--compress-level', type=int, choices=range(10), default=COMPRESS_LEVEL, metavar='0-9',
+                        help="PNG compression level, lower is faster and bigger (default: %(default)s)")
+    parser.add_argument('--force', action='store_true', help="Render every product even if it is up to date")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    paths = render_products(load_config(args.config), args.images_dir, args.out, args.workers,
+                            args.compress_level, args.force)
+    print(f"\nAll {len(paths)} images up to date in {time.perf_counter() - start:.3f}s!")
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,179 @@
+import csv
+import glob
+import gzip
+import io
+import math
+import os
+
+# Streaming writer for the Shopify import CSV.
+# Products (all the variant rows of one handle) are written as soon as they are
+# finalized, in the fixed Shopify column order, optionally gzip-compressed and
+# split into several files by row count. A product is never split across files.
+# Every file is written as <name>.tmp and renamed over <name> when the writer closes
+# cleanly, so a failed run leaves the previous outputs in place. A clean close also
+# removes the unsplit file or numbered parts of an earlier run that this one did not write.
+# The bytes match DataFrame.to_csv(index=False) for the same rows.
+# Rows are dicts, or records with a cells(columns) method returning the values in
+# column order (generate_shopify_import.VariantRow), written without a dict copy.
+# A pandas DataFrame of whole products can be written in one go with write_frame().
+
+
+def _cell(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    return value
+
+
+class ShopifyCsvWriter:
+    def __init__(self, path, columns, max_rows=None, compress=False):
+        self.path = path
+        self.columns = tuple(columns)
+        self.max_rows = max_rows
+        self.compress = compress
+        self.paths = []
+        self._tmp_paths = []
+        self.rows_written = 0
+        self._raw = None
+        self._fh = None
+        self._writer = None
+        self._rows_in_file = 0
+
+    def _unsplit_path(self):
+        if self.compress and not self.path.endswith('.gz'):
+            return self.path + '.gz'
+        return self.path
+
+    def _split_name(self):
+        path = self._unsplit_path()
+        stem, gz = (path[:-3], '.gz') if path.endswith('.gz') else (path, '')
+        stem, ext = os.path.splitext(stem)
+        return stem, ext + gz
+
+    def _part_path(self):
+        if not self.max_rows:
+            return self._unsplit_path()
+        stem, ext = self._split_name()
+        return f"{stem}-{len(self.paths) + 1:03d}{ext}"
+
+    def _stale_paths(self):
+        """Outputs of an earlier run under this name that this run did not write"""
+        stem, ext = self._split_name()
+        candidates = [self._unsplit_path()] + glob.glob(f"{glob.escape(stem)}-[0-9][0-9][0-9]{glob.escape(ext)}")
+        return [path for path in candidates if path not in self.paths and os.path.exists(path)]
+
+    def _open(self):
+        path = self._part_path()
+        tmp_path = path + '.tmp'
+        if self.compress:
+            # mtime=0 and no embedded name keep the archive reproducible
+            raw = open(tmp_path, 'wb')
+            binary = gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0)
+            self._raw = raw
+            self._fh = io.TextIOWrapper(binary, encoding='utf-8', newline='')
+        else:
+            self._fh = open(tmp_path, 'w', encoding='utf-8', newline='')
+        self._writer = csv.writer(self._fh, lineterminator=os.linesep)
+        self._writer.writerow(self.columns)
+        self._rows_in_file = 0
+        self.paths.append(path)
+        self._tmp_paths.append(tmp_path)
+
+    def _close_file(self):
+        if self._fh is not None:
+            self._fh.close()
+            if self._raw is not None:
+                self._raw.close()
+            self._raw = self._fh = self._writer = None
+
+    def write_product(self, rows):
+        """Write every row of one product (one handle) to the current file"""
+        if self._fh is None:
+            self._open()
+        elif self.max_rows and self._rows_in_file and self._rows_in_file + len(rows) > self.max_rows:
+            self._close_file()
+            self._open()
+        columns = self.columns
+        self._writer.writerows([_cell(row.get(column)) for column in columns] if type(row) is dict
+                               else row.cells(columns) for row in rows)
+        self._rows_in_file += len(rows)
+        self.rows_written += len(rows)
+
+    def write_frame(self, frame):
+        """Write a DataFrame of whole products (runs of rows sharing a Handle) with DataFrame.to_csv.
+
+        Files are split on the same handle boundaries as write_product, without a dict per row.
+        """
+        if not len(frame):
+            return
+        if self.max_rows:
+            handles = frame['Handle']
+            starts = handles.ne(handles.shift()).to_numpy().nonzero()[0].tolist() + [len(frame)]
+        else:
+            starts = [0, len(frame)]
+        chunk_start = 0
+        for start, end in zip(starts, starts[1:]):
+            if self._fh is None:
+                self._open()
+            elif self.max_rows and self._rows_in_file and self._rows_in_file + end - start > self.max_rows:
+                self._write_chunk(frame, chunk_start, start)
+                self._close_file()
+                self._open()
+                chunk_start = start
+            self._rows_in_file += end - start
+        self._write_chunk(frame, chunk_start, len(frame))
+        self.rows_written += len(frame)
+
+    def _write_chunk(self, frame, start, end):
+        frame.iloc[start:end].to_csv(self._fh, header=False, index=False, columns=list(self.columns),
+                                     lineterminator=os.linesep)
+
+    def close(self):
+        """Finish the current file and move every written file into place"""
+        if not self.paths:
+            # Always leave a file with the header behind
+            self._open()
+        self._close_file()
+        for tmp_path, path in zip(self._tmp_paths, self.paths):
+            os.replace(tmp_path, path)
+        self._tmp_paths = []
+        # e.g. parts 4-5 of a 5-part run, which shopify_upload.csv_parts would pick up
+        for stale in self._stale_paths():
+            os.remove(stale)
+
+    def abort(self):
+        """Drop the files written so far, leaving the previous outputs untouched"""
+        self._close_file()
+        for tmp_path in self._tmp_paths:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._tmp_paths = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_products(products, path, columns, max_rows=None, compress=False):
+    """Stream an iterable of products (lists of row dicts) and return the writer"""
+    with ShopifyCsvWriter(path, columns, max_rows=max_rows, compress=compress) as writer:
+        for rows in products:
+            writer.write_product(rows)
+    print(f"Generated {writer.rows_written} rows.")
+    for written in writer.paths:
+        print(f"Saved to {written}")
+    return writer
+
+
+def write_frame(frame, path, columns, max_rows=None, compress=False):
+    """write_products() for a DataFrame whose rows are grouped by handle"""
+    with ShopifyCsvWriter(path, columns, max_rows=max_rows, compress=compress) as writer:
+        writer.write_frame(frame)
+    print(f"Generated {writer.rows_written} rows.")
+    for written in writer.paths:
+        print(f"Saved to {written}")
+    return writer
@@ -1,30 +1,81 @@
-from PIL import Image
+from PIL import Image, ImageChops
+import argparse
 import os
+from concurrent.futures import ProcessPoolExecutor
 
-def remove_white_background(input_path, output_path):
+# Make the white background of a logo transparent.
+# Usage: python scripts/fix_logo.py INPUT.png [OUTPUT.png]
+#        python scripts/fix_logo.py --batch IN_DIR OUT_DIR [--workers N]
+
+DEFAULT_OUTPUT = os.path.join("public", "images", "vaonix-logo-transparent.png")
+WHITE_THRESHOLD = 240
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.bmp')
+
+def transparent_white(img, threshold=WHITE_THRESHOLD):
+    """Return an RGBA copy where every pixel with R, G and B above threshold is (255, 255, 255, 0)"""
+    img = img.convert("RGBA")
+    # Per-band 0/255 masks; their product is 255 only where all three bands are near white
+    r, g, b, _ = (band.point(lambda v: 255 if v > threshold else 0) for band in img.split())
+    mask = ImageChops.multiply(ImageChops.multiply(r, g), b)
+    img.paste((255, 255, 255, 0), mask=mask)
+    return img
+
+def remove_white_background(input_path, output_path, threshold=WHITE_THRESHOLD):
     print(f"Processing {input_path}...")
     try:
-        img = Image.open(input_path)
-        img = img.convert("RGBA")
-        
-        datas = img.getdata()
-        
-        new_data = []
-        for item in datas:
-            # Change all white (also shades of whites)
-            # to transparent
-            if item[0] > 240 and item[1] > 240 and item[2] > 240:
-                new_data.append((255, 255, 255, 0))
-            else:
-                new_data.append(item)
-        
-        img.putdata(new_data)
+        img = transparent_white(Image.open(input_path), threshold)
         img.save(output_path, "PNG")
         print(f"Saved transparent image to {output_path}")
+        return True
     except Exception as e:
         print(f"Error: {e}")
+        return False
+
+def _batch_job(job):
+    return remove_white_background(*job)
+
+def remove_white_background_batch(input_dir, output_dir, threshold=WHITE_THRESHOLD, workers=None):
+    """Process every image in input_dir into output_dir (as PNG) across a process pool.
+
+    Raises ValueError, before writing anything, if two images would share an output name (logo.jpg and logo.png).
+    """
+    names = [name for name in sorted(os.listdir(input_dir)) if name.lower().endswith(IMAGE_EXTENSIONS)]
+    by_output = {}
+    for name in names:
+        by_output.setdefault(os.path.splitext(name)[0] + ".png", []).append(name)
+    clashes = ['/'.join(sources) for sources in by_output.values() if len(sources) > 1]
+    if clashes:
+        raise ValueError(f"Images of {input_dir} sharing an output name: {', '.join(clashes)}")
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [(os.path.join(input_dir, sources[0]), os.path.join(output_dir, output), threshold)
+            for output, sources in by_output.items()]
+    if not jobs:
+        print(f"No images found in {input_dir}")
+        return 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        done = sum(pool.map(_batch_job, jobs))
+    print(f"\n{done}/{len(jobs)} images processed.")
+    return done
 
-input_file = r"C:\Users\GUER_JUL\.gemini\antigravity\brain\d1e1bc3d-2bfb-4cf4-9306-e0255e2aa7c3\uploaded_media_1770131039388.png"
-output_file = r"c:\VAONIXSHOP\public\images\vaonix-logo-transparent.png"
+def cli(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Make the white background of logos transparent")
+    parser.add_argument('input', help="Input image, or input directory with --batch")
+    parser.add_argument('output', nargs='?', help=f"Output PNG, or output directory with --batch "
+                                                  f"(default: {DEFAULT_OUTPUT})")
+    parser.add_argument('--batch', action='store_true', help="Process every image of the input directory")
+    parser.add_argument('--workers', type=int, help="Processes used in batch mode (default: one per CPU)")
+    parser.add_argument('--threshold', type=int, default=WHITE_THRESHOLD,
+                        help="R, G and B must all be above this to count as white (default: %(default)s)")
+    args = parser.parse_args(argv)
+    if args.batch:
+        if not args.output:
+            parser.error("--batch needs an output directory")
+        try:
+            remove_white_background_batch(args.input, args.output, args.threshold, args.workers)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        remove_white_background(args.input, args.output or DEFAULT_OUTPUT, args.threshold)
 
-remove_white_background(input_file, output_file)
+if __name__ == "__main__":
+    cli()
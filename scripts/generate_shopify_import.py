@@ -1,12 +1,25 @@
-import openpyxl
-import pandas as pd
+import argparse
+import itertools
 import re
 import math
+from operator import attrgetter
+from urllib.parse import urlencode
+
+from bom_classifier import MERGED_BASE_OPTIONS, SPEEDS, STANDALONE_OPTION, BomClassifier, family_key
+from catalog_dedup import DEFAULT_POLICY as DEFAULT_COLLISION_POLICY, POLICIES as COLLISION_POLICIES, \
+    CatalogCheck, CatalogCollisionError
+from multi_source import SELLING_PRICES_SOURCE, SheetSource, build_index, hash_join, ingest
+from pricing import PriceTable, load_rules
+from catalog_cache import iter_rows
+from csv_stream import write_frame, write_products
+from run_report import RunReport
+from search_index import INDEX_FILE as SEARCH_INDEX_FILE, SearchIndexBuilder
+from workbook_readers import DEFAULT_READER, READERS, cell
 
 # Configuration
 INPUT_FILE = 'Liste de prix Vaonix 27022025.xlsm'
+SHEET_NAME = 'Liste de prix'
 OUTPUT_FILE = 'vaonix_shopify_import_v2.csv'
-PRICE_MULTIPLIER = 1.15
 VENDOR_NAME = 'Vaonix'
 
 # Missing "Classic" Products to inject
@@ -41,17 +54,24 @@ MISSING_PRODUCTS = [
     }
 ]
 
+# Margin rules, see pricing.py (1.15 on everything by default)
+DEFAULT_PRICING = PriceTable()
+
 def clean_price(value):
     if value is None:
         return 0.0
     try:
         # Remove currency symbols or non-numeric chars if any
-        if isinstance(value, str):
+        # (plain "123.45" strings skip the regex)
+        if isinstance(value, str) and not (value.isascii() and value.replace('.', '', 1).isdigit()):
             value = re.sub(r'[^\d.,]', '', value).replace(',', '.')
         return float(value)
     except (ValueError, TypeError):
         return 0.0
 
+# Reference implementations of the classification rules.
+# main() uses BomClassifier, which must stay in parity with these (test_bom_classifier.py).
+
 def parse_dac_length(bom):
     match = re.search(r'^(.*?)-(\d+(?:-\d+)?)M(.*)$', bom, re.IGNORECASE)
     if match:
@@ -158,13 +178,154 @@ def categorize_product(bom, description):
 
     return product_type, ", ".join(tags)
 
-def main():
-    print("Loading Excel file...")
-    wb = openpyxl.load_workbook(INPUT_FILE, data_only=True)
-    ws = wb['Liste de prix']
-    
-    shopify_rows = []
-    
+# Define Column Order matching detailed Shopify Import
+COLUMNS = [
+    'Handle', 'Title', 'Body (HTML)', 'Vendor', 'Type', 'Tags', 'Published',
+    'Option1 Name', 'Option1 Value', 'Variant Grams', 'Variant Inventory Qty',
+    'Variant Inventory Policy', 'Variant Price', 'Variant Compare At Price', 'Image Src'
+]
+
+def read_price_list(reader=DEFAULT_READER, path=None, use_cache=True):
+    """Yield (bom, description, raw price) for every sheet row with a BOM and a description.
+
+    path defaults to INPUT_FILE as it is when called.
+    """
+    for values in iter_rows(path or INPUT_FILE, SHEET_NAME, min_row=2, reader=reader, use_cache=use_cache):
+        bom = cell(values, 1)
+        description = cell(values, 2)
+        if not bom or not description:
+            continue
+        yield bom, description, cell(values, 9)
+
+# Bom, Description, Prix fournisseur le moins chère
+PRICE_LIST_SOURCE = SheetSource('price_list', INPUT_FILE, SHEET_NAME, columns=(1, 2, 9), required=2, min_row=2)
+
+def load_sources(reader=DEFAULT_READER, input_file=None, selling_prices_file=None, workers=None,
+                 use_cache=True):
+    """Read the price list and the selling-prices export in parallel.
+
+    Returns the price-list entries and a {BOM: selling price} index.
+    """
+    sources = [PRICE_LIST_SOURCE._replace(path=input_file or INPUT_FILE)]
+    if selling_prices_file:
+        sources.append(SELLING_PRICES_SOURCE._replace(path=selling_prices_file))
+    loaded = ingest(sources, reader=reader, max_workers=workers, use_cache=use_cache)
+    return loaded['price_list'], build_index(loaded.get('selling_prices', []))
+
+class VariantRow:
+    """One Shopify row of a sheet row, read and written like the row dict it replaces (row['Handle']).
+
+    Only the fields that vary per row are stored; the columns every sheet row shares
+    are class attributes, and the grouping keys travel in the same slots instead of
+    extra '_sort' / '_is_base' keys. Setting a shared column stores the value in the
+    row's own overrides, the other rows keep the class value.
+    """
+    __slots__ = ('handle', 'title', 'body', 'product_type', 'tags', 'option_name', 'option_value', 'price',
+                 'image_src', 'sort', 'is_base', 'overrides')
+
+    vendor = VENDOR_NAME
+    published = 'TRUE'
+    grams = 100  # Default weight
+    inventory_policy = 'deny'
+    inventory_qty = 100
+    compare_at_price = ''
+
+    # Column -> attribute
+    ATTRS = {
+        'Handle': 'handle', 'Title': 'title', 'Body (HTML)': 'body', 'Vendor': 'vendor', 'Type': 'product_type',
+        'Tags': 'tags', 'Published': 'published', 'Option1 Name': 'option_name', 'Option1 Value': 'option_value',
+        'Variant Grams': 'grams', 'Variant Inventory Qty': 'inventory_qty',
+        'Variant Inventory Policy': 'inventory_policy', 'Variant Price': 'price',
+        'Variant Compare At Price': 'compare_at_price', 'Image Src': 'image_src',
+    }
+    _getters = {}
+    SHARED = frozenset(ATTRS.values()) - frozenset(__slots__)
+
+    def __init__(self, handle, title, body, product_type, tags, option_name, option_value, price, sort=None,
+                 is_base=False):
+        self.handle = handle
+        self.title = title
+        self.body = body
+        self.product_type = product_type
+        self.tags = tags
+        self.option_name = option_name
+        self.option_value = option_value
+        self.price = price
+        self.image_src = ''
+        self.sort = sort
+        self.is_base = is_base
+        self.overrides = None
+
+    def __getitem__(self, column):
+        attr = self.ATTRS[column]
+        if self.overrides and attr in self.overrides:
+            return self.overrides[attr]
+        return getattr(self, attr)
+
+    def __setitem__(self, column, value):
+        attr = self.ATTRS[column]
+        if attr in self.SHARED:
+            if self.overrides is None:
+                self.overrides = {}
+            self.overrides[attr] = value
+        else:
+            setattr(self, attr, value)
+
+    def get(self, column, default=None):
+        return self[column] if column in self.ATTRS else default
+
+    def cells(self, columns):
+        """Values of `columns` as a tuple, for the CSV writer"""
+        if self.overrides:
+            return tuple(self[column] for column in columns)
+        getter = self._getters.get(columns)
+        if getter is None:
+            getter = self._getters[columns] = attrgetter(*(self.ATTRS[column] for column in columns))
+        return getter(self)
+
+    def __repr__(self):
+        return f"VariantRow({self.handle!r}, {self.title!r}, {self.option_value!r}, {self.price!r})"
+
+
+class ProductGroup:
+    """Variants sharing a base handle"""
+    __slots__ = ('group_type', 'base_title', 'variants')
+
+    def __init__(self, group_type, base_title):
+        self.group_type = group_type
+        self.base_title = base_title
+        self.variants = []
+
+
+def build_item(bom, description, final_price, info):
+    # Base Item Data
+    return VariantRow(info.handle, str(bom), description, info.product_type, info.tags, info.option_name,
+                      info.option_value, final_price)
+
+def catalog_costs(entries, classifier, pricing=DEFAULT_PRICING, selling_prices=None):
+    """Kept (bom, description, classification) rows with their cost and PriceTable code"""
+    if selling_prices:
+        joined = hash_join(entries, selling_prices)
+    else:
+        joined = ((entry, None) for entry in entries)
+
+    rows, costs, codes = [], [], []
+    for (bom, description, price_raw), selling_price in joined:
+        info = classifier.classify(bom, description)
+        if info.skip:
+             continue
+        rows.append((bom, description, info))
+        if selling_price is not None:
+            # Selling price from the BOM export wins over the margin rules
+            costs.append(clean_price(selling_price))
+            codes.append(pricing.as_is)
+        else:
+            costs.append(clean_price(price_raw))
+            codes.append(pricing.code(info.product_type, info.form_factor, info.speed))
+    return rows, costs, codes
+
+def group_entries(entries, classifier, selling_prices=None, pricing=DEFAULT_PRICING):
+    """Sort (bom, description, raw price) entries into variant groups and standalone items"""
     # Grouping dictionary
     # Key: Base Handle, Value: List of variants
     product_groups = {}
@@ -172,208 +333,330 @@ def main():
     # Standalone products
     standalone_products = []
 
-    print("Processing rows...")
-    start_row = 2 
-    
-    for row_idx in range(start_row, ws.max_row + 1):
-        bom = ws.cell(row=row_idx, column=1).value
-        description = ws.cell(row=row_idx, column=2).value
-        if not bom or not description:
-            continue
+    # The whole catalog is priced in one batch
+    rows, costs, codes = catalog_costs(entries, classifier, pricing, selling_prices)
+    prices = pricing.price_batch(costs, codes)
 
-        if '-HP' in str(bom).upper() or ' HW' in str(bom).upper() or ' HW' in str(description).upper():
-             continue
-             
-        price_raw = ws.cell(row=row_idx, column=9).value
-        price_cost = clean_price(price_raw)
-        final_price = round(price_cost * PRICE_MULTIPLIER, 2)
-        
-        product_type, tags = categorize_product(bom, description)
-        
-        # Base Item Data
-        item = {
-            'Handle': str(bom).lower().replace(' ', '-').replace('--', '-'),
-            'Title': str(bom), 
-            'Body (HTML)': description,
-            'Vendor': VENDOR_NAME,
-            'Type': product_type,
-            'Tags': tags,
-            'Published': 'TRUE',
-            'Option1 Name': 'Title', 
-            'Option1 Value': 'Default Title',
-            'Variant Grams': 100, # Default weight
-            'Variant Inventory Policy': 'deny', 
-            'Variant Inventory Qty': 100, 
-            'Variant Price': final_price,
-            'Variant Compare At Price': '',
-            'Image Src': '' 
-        }
-        
-        # LOGIC 1: CABLES (DAC/AOC)
-        is_cable = 'DAC' in str(bom).upper() or ('AOC' in str(bom).upper() and 'CABLE' in str(description).upper())
+    for (bom, description, info), price in zip(rows, prices):
+        item = build_item(bom, description, price, info)
         
-        # LOGIC 2: TEMPERATURE VARIANTS
-        base_temp, var_name_temp, weight_temp = check_temp_variant(bom)
-        
-        # LOGIC 3: DWDM CHANNELS
-        base_dwdm, var_name_dwdm, weight_dwdm = check_dwdm_variant(bom)
-        
-        # LOGIC 4: CWDM WAVELENGTHS
-        base_cwdm, var_name_cwdm, weight_cwdm = check_cwdm_variant(bom)
-        
-        if is_cable:
-            base_bom, variant_name, length_val = parse_dac_length(bom)
-            if base_bom:
-                group_key = base_bom.lower().replace(' ', '-')
-                if group_key not in product_groups:
-                    product_groups[group_key] = {'type': 'length', 'base_title': base_bom, 'variants': []}
-                
-                item['Option1 Name'] = 'Length'
-                item['Option1 Value'] = variant_name
-                item['_sort'] = length_val
-                product_groups[group_key]['variants'].append(item)
-            else:
-                standalone_products.append(item)
-                
-        elif base_cwdm:
-            group_key = base_cwdm.lower().replace(' ', '-')
+        # Cable lengths, CWDM wavelengths, DWDM channels and -I/-E temperature grades
+        # all become variants of their base BOM
+        if info.group_type:
+            group_key = family_key(info)
             if group_key not in product_groups:
-                product_groups[group_key] = {'type': 'wavelength', 'base_title': base_cwdm, 'variants': []}
+                product_groups[group_key] = ProductGroup(info.group_type, info.base)
             
-            item['Option1 Name'] = 'Wavelength'
-            item['Option1 Value'] = var_name_cwdm
-            item['_sort'] = weight_cwdm
-            product_groups[group_key]['variants'].append(item)
-
-        elif base_dwdm:
-            group_key = base_dwdm.lower().replace(' ', '-')
-            if group_key not in product_groups:
-                product_groups[group_key] = {'type': 'channel', 'base_title': base_dwdm, 'variants': []}
-                
-            item['Option1 Name'] = 'Channel (ITU)'
-            item['Option1 Value'] = var_name_dwdm
-            item['_sort'] = weight_dwdm
-            product_groups[group_key]['variants'].append(item)
-            
-        elif base_temp:
-            group_key = base_temp.lower().replace(' ', '-')
-            # If we already have a commercial version (check below), we merge.
-            # If checking order matters: usually Commercial comes first as base.
-            if group_key not in product_groups:
-                 product_groups[group_key] = {'type': 'temp', 'base_title': base_temp, 'variants': []}
-            
-            item['Option1 Name'] = 'Temperature'
-            item['Option1 Value'] = var_name_temp
-            item['_sort'] = weight_temp
-            product_groups[group_key]['variants'].append(item)
+            item.sort = info.sort
+            product_groups[group_key].variants.append(item)
             
         else:
             # Could be a Base for Temp or Channel, or purely standalone
-            # We treat it as standalone first, but index it by Handle so we can merge later?
-            # Simpler: All non-variants are added to 'standalone_products'
-            # EXCEPT if they are the "Commercial" base of a Temperature group.
-            
-            # Check if this BOM is referenced as a base by others? 
-            # It's hard in one pass. 
             # Strategy: Add to standalone. Post-process to merge standalone with groups if keys match.
-            item['_is_base'] = True
-            item['Option1 Name'] = 'Temperature' 
-            item['Option1 Value'] = 'Commercial (0/70°C)'
-            item['_sort'] = 1
+            # (Cables without a parsable length stay plain standalone items)
+            if info.is_base:
+                item.is_base = True
+                item.sort = info.sort
             standalone_products.append(item)
 
+    return product_groups, standalone_products
+
+def merge_standalone(product_groups, standalone_products):
+    """Attach standalone bases to the group sharing their handle, return the truly standalone items"""
     # MERGE STANDALONE INTO GROUPS
     final_standalone = []
     
     for item in standalone_products:
-        handle = item['Handle']
+        handle = item.handle
         
         # Check if this handle exists as a group key
         if handle in product_groups:
             # It's the base product of a group! Add it as a variant.
-            group_type = product_groups[handle]['type']
-            
-            if group_type == 'temp':
-                 item['Option1 Name'] = 'Temperature'
-                 item['Option1 Value'] = 'Commercial (0/70°C)'
-            elif group_type == 'channel':
-                 # Rare for DWDM base to exist as a sellable unit without channel, but if so:
-                 item['Option1 Name'] = 'Channel (ITU)'
-                 item['Option1 Value'] = 'Tunable / Unspecified' # Setup as needed
-            elif group_type == 'wavelength':
-                 item['Option1 Name'] = 'Wavelength'
-                 item['Option1 Value'] = 'Unspecified'
-            elif group_type == 'length':
-                 # Base DAC usually not sellable without length, but just in case
-                 item['Option1 Name'] = 'Length'
-                 item['Option1 Value'] = 'Standard'
+            # (rare: a DWDM base or a cable without length is seldom sellable on its own)
+            item.option_name, item.option_value = MERGED_BASE_OPTIONS[product_groups[handle].group_type]
             
-            product_groups[handle]['variants'].append(item)
+            product_groups[handle].variants.append(item)
         else:
             # Truly standalone (reset options to Default)
-            item['Option1 Name'] = 'Title'
-            item['Option1 Value'] = 'Default Title'
+            item.option_name, item.option_value = STANDALONE_OPTION
             final_standalone.append(item)
 
+    return final_standalone
+
+def _variant_order(row):
+    # Rows without a sort value (e.g. a merged cable base without a length) go last, in
+    # the order they were added, like the pandas engine's na_position='last'
+    return (True, 0) if row.sort is None else (False, row.sort)
+
+def emit_products(product_groups, final_standalone):
+    """Yield one list of Shopify rows per product (handle), releasing each group once yielded"""
     # GENERATE ROWS FROM GROUPS
-    for key, group in product_groups.items():
-        variants = group['variants']
-        variants.sort(key=lambda x: x['_sort'])
+    # (iterating over the keys: next(iter()) rescans the popped slots, quadratic on big catalogs)
+    for key in list(product_groups):
+        group = product_groups.pop(key)
+        variants = group.variants
+        variants.sort(key=_variant_order)
         
-        for variant in variants:
-            row = variant.copy()
-            del row['_sort']
-            if '_is_base' in row: del row['_is_base']
-            
-            row['Handle'] = key
-            row['Title'] = group['base_title']
-            shopify_rows.append(row)
+        for row in variants:
+            row.handle = key
+            row.title = group.base_title
+        yield variants
 
     # GENERATE ROWS FROM STANDALONE
-    for prod in final_standalone:
-        row = prod.copy()
-        if '_sort' in row: del row['_sort']
-        if '_is_base' in row: del row['_is_base']
-        shopify_rows.append(row)
-        
-    # Add Missing "Classic" Products
-    for missing in MISSING_PRODUCTS:
-        price = round(missing['Price'] * 1.15, 2)
-        row = {
-            'Handle': missing['Bom'].lower().replace(' ', '-'),
-            'Title': missing['Bom'],
-            'Body (HTML)': missing['Description'],
-            'Vendor': VENDOR_NAME,
-            'Type': 'Optical Transceiver',
-            'Tags': missing['Tags'],
-            'Published': 'TRUE',
-            'Option1 Name': 'Title',
-            'Option1 Value': 'Default Title',
-            'Variant Grams': 100,
-            'Variant Inventory Policy': 'deny',
-            'Variant Inventory Qty': 50,
-            'Variant Price': price,
-            'Variant Compare At Price': '',
-            'Image Src': ''
-        }
-        shopify_rows.append(row)
-
-    # Convert to DataFrame
-    df = pd.DataFrame(shopify_rows)
-    
-    # Define Column Order matching detailed Shopify Import
-    columns = [
-        'Handle', 'Title', 'Body (HTML)', 'Vendor', 'Type', 'Tags', 'Published',
-        'Option1 Name', 'Option1 Value', 'Variant Grams', 'Variant Inventory Qty',
-        'Variant Inventory Policy', 'Variant Price', 'Variant Compare At Price', 'Image Src'
-    ]
-    
-    # Reindex checks if columns exist, fills missing with Nan
-    df = df.reindex(columns=columns)
-    
-    print(f"Generated {len(df)} rows.")
-    df.to_csv(OUTPUT_FILE, index=False)
-    print(f"Saved to {OUTPUT_FILE}")
+    for row in final_standalone:
+        yield [row]
+
+def iter_products(entries, classifier, selling_prices=None, pricing=DEFAULT_PRICING):
+    """Group (bom, description, raw price) entries into variant families, one product at a time"""
+    product_groups, standalone_products = group_entries(entries, classifier, selling_prices, pricing)
+    final_standalone = merge_standalone(product_groups, standalone_products)
+    return emit_products(product_groups, final_standalone)
+
+def group_rows(entries, classifier, selling_prices=None, pricing=DEFAULT_PRICING):
+    """Group (bom, description, raw price) entries into variant families and return Shopify rows"""
+    return [row for rows in iter_products(entries, classifier, selling_prices, pricing) for row in rows]
+
+def missing_product_row(missing, pricing=DEFAULT_PRICING):
+    # Priced like a sheet transceiver of the same form factor and speed
+    speed = next((tag.strip() for tag in missing['Tags'].split(',') if tag.strip() in SPEEDS), None)
+    price = pricing.price(missing['Price'], pricing.code('Optical Transceiver', missing['Category'], speed))
+    return {
+        'Handle': missing['Bom'].lower().replace(' ', '-'),
+        'Title': missing['Bom'],
+        'Body (HTML)': missing['Description'],
+        'Vendor': VENDOR_NAME,
+        'Type': 'Optical Transceiver',
+        'Tags': missing['Tags'],
+        'Published': 'TRUE',
+        'Option1 Name': 'Title',
+        'Option1 Value': 'Default Title',
+        'Variant Grams': 100,
+        'Variant Inventory Policy': 'deny',
+        'Variant Inventory Qty': 50,
+        'Variant Price': price,
+        'Variant Compare At Price': '',
+        'Image Src': ''
+    }
+
+def write_csv(shopify_rows, path):
+    write_products([[row] for row in shopify_rows], path, COLUMNS)
+
+ENGINES = ('python', 'pandas')
+# RunReport stages of main(), in run order (build: pandas engine; group, merge: Python engine)
+STAGES = ('load', 'classify', 'dedup', 'group', 'merge', 'build', 'write', 'index')
+
+# Option1 Name of a written product -> the group type it came from
+OPTION_GROUP_TYPES = {
+    'Length': 'length',
+    'Wavelength': 'wavelength',
+    'Channel (ITU)': 'channel',
+    'Temperature': 'temp',
+    'Title': 'standalone',
+}
+
+def count_products(products, products_by_type, rows_by_type):
+    """Pass products through, counting products and rows per group type"""
+    for rows in products:
+        group_type = OPTION_GROUP_TYPES.get(rows[0]['Option1 Name'], 'other')
+        products_by_type[group_type] = products_by_type.get(group_type, 0) + 1
+        rows_by_type[group_type] = rows_by_type.get(group_type, 0) + len(rows)
+        yield rows
+
+def image_template(row):
+    """render_service.py template for a product's first row, None for cables"""
+    if row['Type'] != 'Optical Transceiver':
+        return None
+    return 'qsfp' if 'QSFP' in row['Tags'] else 'sfp'
+
+def with_image_urls(products, base_url):
+    """Point the 'Image Src' of each transceiver at the render service"""
+    base_url = base_url.rstrip('/')
+    previous_handle = None
+    for rows in products:
+        first = rows[0]
+        template = image_template(first)
+        # Only the first row of a handle carries the product image
+        if template and first['Handle'] != previous_handle:
+            first['Image Src'] = f"{base_url}/render/{template}.png?{urlencode({'bom': first['Title']})}"
+        previous_handle = rows[-1]['Handle']
+        yield rows
+
+def main(reader=DEFAULT_READER, selling_prices_file=None, workers=None, use_cache=True, engine='python',
+         max_rows=None, compress=False, report_path=None, profile_stage=None, image_base_url=None,
+         search_index_path=None, collisions=DEFAULT_COLLISION_POLICY, pricing_rules=None):
+    pricing = PriceTable(load_rules(pricing_rules)) if pricing_rules else DEFAULT_PRICING
+    report = RunReport(profile_stage, f"vaonix_import_{profile_stage}.prof")
+    report.info.update(reader=reader, engine=engine, input_file=INPUT_FILE,
+                       selling_prices_file=selling_prices_file, output_file=OUTPUT_FILE,
+                       pricing_rules=pricing_rules)
+
+    selling_prices = None
+    products_in = None
+    with report.stage('load') as stage:
+        if selling_prices_file:
+            print(f"Loading {INPUT_FILE} and {selling_prices_file} in parallel ({reader} reader)...")
+            entries, selling_prices = load_sources(reader, INPUT_FILE, selling_prices_file, workers, use_cache)
+        else:
+            print(f"Loading Excel file ({reader} reader)...")
+            entries = list(read_price_list(reader, INPUT_FILE, use_cache=use_cache))
+        stage['rows_out'] = len(entries)
+
+    print(f"Processing rows ({engine} engine)...")
+    rows_read = len(entries)
+    check = CatalogCheck(collisions)
+    if engine == 'pandas':
+        import pandas_engine
+        # Vectorized classification, shared by the dedup and the build
+        with report.stage('classify', rows_in=rows_read) as stage:
+            classified = pandas_engine.classify_entries(entries)
+            stage['rows_out'] = int((~classified[1]['skip']).sum())
+        # Duplicates and handle collisions, before anything is written
+        with report.stage('dedup', rows_in=rows_read) as stage:
+            keep, missing_products = check.check(entries, pandas_engine.frame_infos(classified[1]),
+                                                 MISSING_PRODUCTS)
+            if len(keep) < rows_read:
+                entries = [entries[idx] for idx in keep]
+                classified = tuple(part.iloc[keep] for part in classified)
+            stage['rows_out'] = len(entries)
+    else:
+        classifier = BomClassifier()
+        with report.stage('classify', rows_in=rows_read) as stage:
+            # Fills the classifier cache, dedup and grouping then only look results up
+            stage['rows_out'] = sum(1 for bom, description, _ in entries
+                                    if not classifier.classify(bom, description).skip)
+        with report.stage('dedup', rows_in=rows_read) as stage:
+            entries, missing_products = check.run(entries, classifier, MISSING_PRODUCTS)
+            stage['rows_out'] = len(entries)
+    print(check.summary())
+
+    if engine == 'pandas':
+        with report.stage('build', rows_in=len(entries)) as stage:
+            frame = pandas_engine.build_frame(entries, selling_prices, missing_products, pricing, classified)
+            stage['rows_out'] = len(frame)
+        # Image URLs and the search index need the rows one product at a time
+        products = pandas_engine.iter_frame_products(frame) if image_base_url or search_index_path else None
+    else:
+        with report.stage('group', rows_in=len(entries)) as stage:
+            product_groups, standalone_products = group_entries(entries, classifier, selling_prices, pricing)
+            stage['rows_out'] = len(product_groups) + len(standalone_products)
+        with report.stage('merge', rows_in=len(standalone_products)) as stage:
+            final_standalone = merge_standalone(product_groups, standalone_products)
+            stage['rows_out'] = len(product_groups) + len(final_standalone)
+        products = itertools.chain(
+            emit_products(product_groups, final_standalone),
+            # Add Missing "Classic" Products
+            ([missing_product_row(missing, pricing)] for missing in missing_products),
+        )
+        products_in = len(product_groups) + len(final_standalone) + len(missing_products)
+
+    if image_base_url:
+        products = with_image_urls(products, image_base_url)
+    search_index = None
+    if search_index_path:
+        # Indexed as the products stream to the CSV
+        search_index = SearchIndexBuilder()
+        products = search_index.wrap(products)
+
+    products_by_type, rows_by_type = {}, {}
+    with report.stage('write', rows_in=products_in) as stage:
+        if products is None:
+            # The whole frame through DataFrame.to_csv, no dict per row
+            pandas_engine.count_frame_products(frame, products_by_type, rows_by_type)
+            writer = write_frame(frame, OUTPUT_FILE, COLUMNS, max_rows=max_rows, compress=compress)
+        else:
+            writer = write_products(count_products(products, products_by_type, rows_by_type), OUTPUT_FILE,
+                                    COLUMNS, max_rows=max_rows, compress=compress)
+        stage['rows_out'] = writer.rows_written
+
+    if search_index:
+        with report.stage('index', rows_in=len(search_index.docs)) as stage:
+            index = search_index.write(search_index_path)
+            stage['rows_out'] = len(index['tokens'])
+        print(f"Search index: {len(index['docs'])} products, {len(index['tokens'])} tokens -> {search_index_path}")
+
+    # MISSING_PRODUCTS are written as standalone products
+    products_by_type['standalone'] = products_by_type.get('standalone', 0) - len(missing_products)
+    rows_by_type['standalone'] = rows_by_type.get('standalone', 0) - len(missing_products)
+    report.counts.update(
+        rows_read=rows_read,
+        duplicates_dropped=rows_read - len(entries),
+        skipped_hp_hw=len(entries) - (writer.rows_written - len(missing_products)),
+        missing_products=len(missing_products),
+        collisions=check.counts(),
+        products_by_type=products_by_type,
+        rows_by_type=rows_by_type,
+        output_files=writer.paths,
+    )
+
+    if report_path:
+        report.write(report_path)
+        report.print_summary()
+        print(f"Run report saved to {report_path}")
+    return report
+
+def cli(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog,
+                                     description="Generate the Shopify import CSV from the Vaonix price list")
+    parser.add_argument('--reader', choices=sorted(READERS), default=DEFAULT_READER,
+                        help="Workbook reader backend (default: %(default)s)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only write products added, changed or removed since the last incremental run "
+                             "to the delta CSV (reader, source, --collisions and --pricing-rules options apply)")
+    parser.add_argument('--selling-prices', nargs='?', const=SELLING_PRICES_SOURCE.path, metavar='XLSX',
+                        help="Join the BOM selling-prices export (default: %(const)s) and use its prices "
+                             "instead of the multiplier where present")
+    parser.add_argument('--workers', type=int, help="Processes used to read the sources (default: one per sheet)")
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false',
+                        help="Always parse the workbooks instead of using the catalog cache")
+    parser.add_argument('--engine', choices=ENGINES, default='python',
+                        help="Row engine: per-row Python or vectorized pandas (default: %(default)s)")
+    parser.add_argument('--gzip', dest='compress', action='store_true', help="Write gzip-compressed CSV")
+    parser.add_argument('--max-rows', type=int,
+                        help="Split the output into numbered files of at most N rows (products are never split)")
+    parser.add_argument('--report', nargs='?', const='vaonix_import_report.json', metavar='JSON',
+                        help="Write a JSON run report with per-stage timings, row counts and peak memory "
+                             "(default: %(const)s)")
+    parser.add_argument('--profile', choices=STAGES, metavar='STAGE',
+                        help=f"Run STAGE ({', '.join(STAGES)}) under cProfile "
+                             "and dump the stats to vaonix_import_STAGE.prof")
+    parser.add_argument('--image-base-url', metavar='URL',
+                        help="Fill Image Src with render_service.py URLs under URL (e.g. http://127.0.0.1:8765)")
+    parser.add_argument('--search-index', nargs='?', const=SEARCH_INDEX_FILE, metavar='JSON',
+                        help="Also write the storefront search / facet index (default: %(const)s)")
+    parser.add_argument('--collisions', choices=COLLISION_POLICIES, default=DEFAULT_COLLISION_POLICY,
+                        help="Duplicate rows and handle collisions: only list them, drop the later rows (resolve) "
+                             "or stop before writing (fail) (default: %(default)s)")
+    parser.add_argument('--pricing-rules', metavar='JSON',
+                        help="Margin rules per product type, form factor and speed (see pricing.py; "
+                             "default: the 1.15 multiplier on everything)")
+    args = parser.parse_args(argv)
+    if args.pricing_rules:
+        try:
+            PriceTable(load_rules(args.pricing_rules))
+        except (OSError, ValueError) as e:
+            parser.error(f"--pricing-rules: {e}")
+    if args.incremental:
+        # The delta CSV is built by the Python engine, without the full-run outputs
+        unsupported = [option for option, given in (
+            ('--engine pandas', args.engine != 'python'), ('--gzip', args.compress),
+            ('--max-rows', args.max_rows is not None), ('--report', args.report is not None),
+            ('--profile', args.profile is not None), ('--image-base-url', args.image_base_url is not None),
+            ('--search-index', args.search_index is not None)) if given]
+        if unsupported:
+            parser.error(f"{', '.join(unsupported)} cannot be combined with --incremental")
+    try:
+        if args.incremental:
+            from incremental_import import run_incremental
+            run_incremental(reader=args.reader, selling_prices_file=args.selling_prices, workers=args.workers,
+                            use_cache=args.use_cache, pricing_rules=args.pricing_rules, collisions=args.collisions)
+        else:
+            main(reader=args.reader, selling_prices_file=args.selling_prices, workers=args.workers,
+                 use_cache=args.use_cache, engine=args.engine, max_rows=args.max_rows, compress=args.compress,
+                 report_path=args.report, profile_stage=args.profile, image_base_url=args.image_base_url,
+                 search_index_path=args.search_index, collisions=args.collisions,
+                 pricing_rules=args.pricing_rules)
+    except CatalogCollisionError as e:
+        parser.exit(1, f"{e}\nNothing written (--collisions fail).\n")
 
 if __name__ == "__main__":
-    main()
+    cli()
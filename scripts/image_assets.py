@@ -0,0 +1,270 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import time
+
+from PIL import Image
+
+from image_derivatives import PUBLIC_DIR, public_url
+from render_cache import file_digest, write_atomic
+
+# Static asset stage for the storefront, run after create_product_images.py.
+# Every file under public/images is content-hashed (sha256). Identical files are
+# collapsed into one copy named <first name>.<hash>.<ext> under public/assets/images
+# (served with an immutable Cache-Control, see vercel.json); the extension follows
+# the real format, so JPEG data saved as .png becomes .jpg. The images of each
+# SPRITE_GROUPS directory are also packed, as thumbnails fitting SPRITE_CELL, into
+# one WebP sprite sheet per group. src/config/asset-manifest.json maps every public
+# URL to its hashed copy and, for sprited images, to its sheet and coordinates
+# (read by assetSrc() / spriteStyle() in src/lib/images.ts).
+# A sheet is only re-packed when its images or the sprite settings change.
+# Usage: python scripts/image_assets.py [--images-dir public/images] [--force]
+
+IMAGES_DIR = os.path.join(PUBLIC_DIR, "images")
+OUTPUT_DIR = os.path.join(PUBLIC_DIR, "assets", "images")
+MANIFEST_FILE = os.path.join("src", "config", "asset-manifest.json")
+# Generated by image_derivatives.py, not a source
+SKIP_DIRS = ("derived",)
+
+HASH_LENGTH = 12
+EXTENSIONS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp', 'GIF': '.gif'}
+
+# Group -> directory under IMAGES_DIR whose images share a sheet
+SPRITE_GROUPS = {'categories': 'categories', 'products': 'products'}
+# Thumbnail box: the category cards are 192 px high, twice that for 2x screens
+SPRITE_CELL = (384, 384)
+# Transparent gap around every cell so scaled backgrounds do not bleed
+SPRITE_PADDING = 2
+SPRITE_FORMAT = {'format': 'WEBP', 'quality': 90, 'method': 6}
+# Bump when the hashing, packing or encoding code changes
+ASSETS_VERSION = 1
+
+
+def scan_images(images_dir=IMAGES_DIR):
+    """Sorted paths of every file under images_dir, generated directories excluded"""
+    paths = []
+    for root, dirs, files in os.walk(images_dir):
+        if root == images_dir:
+            dirs[:] = [name for name in dirs if name not in SKIP_DIRS]
+        dirs.sort()
+        paths.extend(os.path.join(root, name) for name in sorted(files))
+    return paths
+
+
+def image_format(path):
+    try:
+        with Image.open(path) as img:
+            return img.format
+    except OSError:
+        return None
+
+
+def hashed_name(path, digest, fmt):
+    stem, ext = os.path.splitext(os.path.basename(path))
+    return f"{stem}.{digest[:HASH_LENGTH]}{EXTENSIONS.get(fmt, ext.lower())}"
+
+
+def dedup_files(paths, output_dir=OUTPUT_DIR):
+    """Copy every distinct file once to output_dir.
+
+    Returns ({public URL: hashed URL}, {hashed URL: [public URLs]}, {public URL: sha256}).
+    The first path (in sorted order) of a set of identical files names the copy.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rewrites, copies, digests = {}, {}, {}
+    first_by_digest = {}
+    for path in paths:
+        url = public_url(path)
+        digest = file_digest(path)
+        digests[url] = digest
+        target = first_by_digest.get(digest)
+        if target is None:
+            target_path = os.path.join(output_dir, hashed_name(path, digest, image_format(path)))
+            # The name is the content: an existing copy is up to date
+            if not os.path.exists(target_path):
+                tmp_path = f"{target_path}.{os.getpid()}.tmp"
+                shutil.copyfile(path, tmp_path)
+                os.replace(tmp_path, target_path)
+            target = first_by_digest[digest] = public_url(target_path)
+            copies[target] = []
+        rewrites[url] = target
+        copies[target].append(url)
+    return rewrites, copies, digests
+
+
+def fit_cell(size, cell=SPRITE_CELL):
+    """Thumbnail size of an image in the sprite: fits the cell, never upscaled"""
+    width, height = size
+    scale = min(1.0, cell[0] / width, cell[1] / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def pack_shelves(sizes, padding=SPRITE_PADDING):
+    """Shelf-pack (width, height) boxes, tallest first, onto rows of a roughly square sheet.
+
+    Returns ([(x, y), ...] in the order of sizes, (sheet width, sheet height)).
+    """
+    if not sizes:
+        return [], (0, 0)
+    area = sum((w + 2 * padding) * (h + 2 * padding) for w, h in sizes)
+    max_width = max(max(w for w, _ in sizes) + 2 * padding, round(area ** 0.5))
+    order = sorted(range(len(sizes)), key=lambda idx: (-sizes[idx][1], -sizes[idx][0], idx))
+    positions = [None] * len(sizes)
+    x = y = shelf_h = sheet_w = 0
+    for idx in order:
+        w, h = sizes[idx][0] + 2 * padding, sizes[idx][1] + 2 * padding
+        if x and x + w > max_width:
+            x, y, shelf_h = 0, y + shelf_h, 0
+        positions[idx] = (x + padding, y + padding)
+        x += w
+        shelf_h = max(shelf_h, h)
+        sheet_w = max(sheet_w, x)
+    return positions, (sheet_w, y + shelf_h)
+
+
+def sprite_key(digests):
+    payload = json.dumps([ASSETS_VERSION, SPRITE_CELL, SPRITE_PADDING, SPRITE_FORMAT, digests],
+                         sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def build_sprite(sources):
+    """Pack {hashed URL: source path} into one sheet; returns (sheet bytes, {hashed URL: cell})"""
+    thumbs = {}
+    for target, path in sources.items():
+        img = Image.open(path)
+        img.load()
+        img = img.convert('RGBA')
+        size = fit_cell(img.size)
+        thumbs[target] = img if size == img.size else img.resize(size, Image.Resampling.LANCZOS)
+
+    targets = list(thumbs)
+    positions, (sheet_w, sheet_h) = pack_shelves([thumbs[target].size for target in targets])
+    sheet = Image.new('RGBA', (sheet_w, sheet_h), (0, 0, 0, 0))
+    cells = {}
+    for target, (x, y) in zip(targets, positions):
+        thumb = thumbs[target]
+        sheet.paste(thumb, (x, y))
+        cells[target] = {'x': x, 'y': y, 'width': thumb.width, 'height': thumb.height}
+
+    settings = dict(SPRITE_FORMAT)
+    buffer = io.BytesIO()
+    sheet.save(buffer, settings.pop('format'), **settings)
+    return buffer.getvalue(), cells
+
+
+def _load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as fh:
+        manifest = json.load(fh)
+    return manifest if manifest.get('version') == ASSETS_VERSION else {}
+
+
+def _sheet_exists(sheet):
+    return os.path.exists(os.path.join(PUBLIC_DIR, sheet['src'].lstrip('/')))
+
+
+def _asset_names(manifest):
+    """Names of the hashed copies and sheets a manifest points at"""
+    return {os.path.basename(target) for target in manifest.get('files', {}).values()} | {
+        os.path.basename(sheet['src']) for sheet in manifest.get('sheets', {}).values()}
+
+
+def build_assets(images_dir=IMAGES_DIR, output_dir=OUTPUT_DIR, manifest_path=MANIFEST_FILE, force=False):
+    """Hash, dedup and sprite images_dir and rewrite the manifest; returns the manifest"""
+    previous = _load_manifest(manifest_path)
+    paths = scan_images(images_dir)
+    rewrites, copies, digests = dedup_files(paths, output_dir)
+    source_by_target = {}
+    for path in paths:
+        source_by_target.setdefault(rewrites[public_url(path)], path)
+
+    sheets, sprites = {}, {}
+    for name, directory in SPRITE_GROUPS.items():
+        group_dir = os.path.join(images_dir, directory)
+        urls = [public_url(path) for path in paths if os.path.dirname(path) == group_dir]
+        # Identical images share one cell
+        sources = {rewrites[url]: source_by_target[rewrites[url]] for url in urls
+                   if image_format(source_by_target[rewrites[url]])}
+        if not sources:
+            continue
+        key = sprite_key(sorted(digests[url] for url in urls))
+        sheet = previous.get('sheets', {}).get(name)
+        if force or not sheet or sheet.get('key') != key or not _sheet_exists(sheet):
+            data, cells = build_sprite(sources)
+            sheet_path = os.path.join(output_dir, f"sprite-{name}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}.webp")
+            write_atomic(sheet_path, data)
+            with Image.open(sheet_path) as img:
+                sheet_size = img.size
+            sheet = {'src': public_url(sheet_path), 'key': key, 'width': sheet_size[0], 'height': sheet_size[1],
+                     'bytes': len(data), 'cells': cells}
+            print(f"Packed {len(cells)} images into {sheet['src']} ({sheet_size[0]}x{sheet_size[1]})")
+        sheets[name] = sheet
+        for url in urls:
+            if rewrites[url] in sheet['cells']:
+                sprites[url] = dict(sheet['cells'][rewrites[url]], sheet=name)
+
+    manifest = {
+        'version': ASSETS_VERSION,
+        'files': rewrites,
+        'duplicates': {target: urls for target, urls in copies.items() if len(urls) > 1},
+        'sheets': sheets,
+        'sprites': sprites,
+    }
+
+    # Hashed copies and sheets of the previous run nobody points at any more; other files are left alone
+    for name in _asset_names(previous) - _asset_names(manifest):
+        stale_path = os.path.join(output_dir, name)
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2)
+        fh.write('\n')
+    os.replace(tmp_path, manifest_path)
+    return manifest
+
+
+def print_summary(manifest):
+    # Bytes of each distinct file, through the first URL that points at it
+    first_url = {}
+    for url, target in manifest['files'].items():
+        first_url.setdefault(target, url)
+    size = {target: os.path.getsize(os.path.join(PUBLIC_DIR, url.lstrip('/'))) for target, url in first_url.items()}
+    total = sum(size[target] for target in manifest['files'].values())
+    print(f"{len(manifest['files'])} files, {len(size)} distinct: "
+          f"{(total - sum(size.values())) / 1024:.0f} KB of duplicates collapsed")
+    for target, urls in manifest['duplicates'].items():
+        print(f"  {target} <- {', '.join(urls)}")
+
+    print(f"\n{'sprite sheet':<14}{'images':>8}{'requests':>10}{'source KB':>11}{'sheet KB':>10}")
+    for name, sheet in manifest['sheets'].items():
+        urls = [url for url, cell in manifest['sprites'].items() if cell['sheet'] == name]
+        distinct = {manifest['files'][url] for url in urls}
+        source_kb = sum(size[target] for target in distinct) / 1024
+        print(f"{name:<14}{len(urls):>8}{f'{len(distinct)} -> 1':>10}{source_kb:>11.0f}{sheet['bytes'] / 1024:>10.0f}")
+
+
+def main(images_dir=IMAGES_DIR, force=False):
+    start = time.perf_counter()
+    manifest = build_assets(images_dir, force=force)
+    print_summary(manifest)
+    print(f"\nManifest saved to {MANIFEST_FILE} in {time.perf_counter() - start:.2f}s")
+
+
+def cli(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Collapse duplicate images into hashed copies and pack "
+                                                            "the category / product thumbnails into sprite sheets")
+    parser.add_argument('--images-dir', default=IMAGES_DIR, help="Images to process (default: %(default)s)")
+    parser.add_argument('--force', action='store_true', help="Re-pack every sprite sheet")
+    args = parser.parse_args(argv)
+    main(args.images_dir, args.force)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,175 @@
+import argparse
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from render_cache import file_digest, write_atomic
+
+# Responsive derivatives of the storefront images, run after create_product_images.py.
+# Every source image gets WebP, AVIF and optimized PNG copies at several widths
+# under public/images/derived/, named <stem>.<source hash>-<width>.<format> so
+# sources sharing a file name in different directories never collide, and
+# src/config/image-manifest.json lists them per public URL for the srcset built in
+# src/lib/images.ts.
+# A source is only re-encoded when its bytes or the encoding settings change; the
+# derivatives of removed or re-encoded sources are deleted.
+# Usage: python scripts/image_derivatives.py [SOURCE_DIR ...] [--workers N]
+
+PUBLIC_DIR = "public"
+SOURCE_DIRS = [os.path.join(PUBLIC_DIR, "images", "products"), os.path.join(PUBLIC_DIR, "images", "categories")]
+OUTPUT_DIR = os.path.join(PUBLIC_DIR, "images", "derived")
+MANIFEST_FILE = os.path.join("src", "config", "image-manifest.json")
+
+WIDTHS = (320, 640, 960, 1280)
+# Listed in order of preference for <picture> sources
+FORMATS = {
+    'avif': {'quality': 60},
+    'webp': {'quality': 80, 'method': 6},
+    'png': {'optimize': True},
+}
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+HASH_LENGTH = 12
+# Bump when the resize, encode or naming code changes
+DERIVATIVES_VERSION = 2
+
+
+def public_url(path):
+    return '/' + os.path.relpath(path, PUBLIC_DIR).replace(os.sep, '/')
+
+
+def target_widths(source_width):
+    """The configured widths smaller than the source, plus the source width itself"""
+    return [w for w in WIDTHS if w < source_width] + [source_width]
+
+
+def settings_fingerprint():
+    return json.dumps([DERIVATIVES_VERSION, WIDTHS, FORMATS], sort_keys=True)
+
+
+def _encode_job(job):
+    """Resize one source to every target width and encode it in one format"""
+    source_path, digest, fmt, output_dir = job
+    img = Image.open(source_path)
+    img.load()
+    if fmt != 'png' and img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if 'transparency' in img.info or img.mode in ('LA', 'PA') else 'RGB')
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    variants = []
+    for width in target_widths(img.width):
+        height = max(1, round(img.height * width / img.width))
+        resized = img if width == img.width else img.resize((width, height), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        resized.save(buffer, fmt.upper(), **FORMATS[fmt])
+        output_path = os.path.join(output_dir, f"{stem}.{digest[:HASH_LENGTH]}-{width}.{fmt}")
+        write_atomic(output_path, buffer.getvalue())
+        variants.append({'src': public_url(output_path), 'width': width, 'height': height,
+                         'bytes': len(buffer.getvalue())})
+    return source_path, fmt, variants
+
+
+def _load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def _is_fresh(entry, digest, settings):
+    if not entry or entry.get('sha256') != digest or entry.get('settings') != settings:
+        return False
+    return all(os.path.exists(os.path.join(PUBLIC_DIR, variant['src'].lstrip('/')))
+               for variants in entry['formats'].values() for variant in variants)
+
+
+def _variant_srcs(manifest):
+    return {variant['src'] for entry in manifest.values()
+            for variants in entry['formats'].values() for variant in variants}
+
+
+def _source_path(url):
+    return os.path.join(PUBLIC_DIR, url.lstrip('/'))
+
+
+def build_derivatives(source_dirs=SOURCE_DIRS, output_dir=OUTPUT_DIR, manifest_path=MANIFEST_FILE, workers=None,
+                      force=False):
+    """Encode the derivatives of changed sources and rewrite the manifest; returns the manifest"""
+    os.makedirs(output_dir, exist_ok=True)
+    previous = _load_manifest(manifest_path)
+    settings = settings_fingerprint()
+
+    manifest = {}
+    stale = {}
+    digests = {}
+    for source_dir in source_dirs:
+        for name in sorted(os.listdir(source_dir)):
+            if not name.lower().endswith(SOURCE_EXTENSIONS):
+                continue
+            path = os.path.join(source_dir, name)
+            url = public_url(path)
+            digest = file_digest(path)
+            if not force and _is_fresh(previous.get(url), digest, settings):
+                manifest[url] = previous[url]
+                continue
+            with Image.open(path) as img:
+                size = img.size
+            stale[path] = url
+            digests[path] = digest
+            manifest[url] = {'width': size[0], 'height': size[1], 'sha256': digest, 'settings': settings,
+                             'formats': {}}
+
+    # Sources outside the directories scanned this time keep their entries
+    scanned = {os.path.abspath(source_dir) for source_dir in source_dirs}
+    for url, entry in previous.items():
+        path = _source_path(url)
+        if url not in manifest and os.path.dirname(os.path.abspath(path)) not in scanned and os.path.exists(path):
+            manifest[url] = entry
+
+    jobs = [(path, digests[path], fmt, output_dir) for path in stale for fmt in FORMATS]
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path, fmt, variants in pool.map(_encode_job, jobs):
+                manifest[stale[path]]['formats'][fmt] = variants
+        # Keep the format order stable regardless of completion order
+        for url in stale.values():
+            manifest[url]['formats'] = {fmt: manifest[url]['formats'][fmt] for fmt in FORMATS}
+
+    # Derivatives of removed or re-encoded sources
+    for src in _variant_srcs(previous) - _variant_srcs(manifest):
+        if os.path.exists(_source_path(src)):
+            os.remove(_source_path(src))
+
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2)
+        fh.write('\n')
+    os.replace(tmp_path, manifest_path)
+
+    print(f"{len(stale)} images encoded, {len(manifest) - len(stale)} unchanged, "
+          f"{len(set(previous) - set(manifest))} removed")
+    return manifest
+
+
+def main(source_dirs, workers=None, force=False):
+    start = time.perf_counter()
+    manifest = build_derivatives(source_dirs, workers=workers, force=force)
+    print(f"{'image':<45}{'source KB':>10}{'smallest KB':>12}{'largest KB':>11}")
+    for url, entry in manifest.items():
+        source_kb = os.path.getsize(_source_path(url)) / 1024
+        largest = {fmt: variants[-1]['bytes'] for fmt, variants in entry['formats'].items()}
+        smallest = {fmt: variants[0]['bytes'] for fmt, variants in entry['formats'].items()}
+        best = min(largest, key=largest.get)
+        print(f"{url[-45:]:<45}{source_kb:>10.0f}{smallest[best] / 1024:>12.0f}{largest[best] / 1024:>11.0f} {best}")
+    print(f"\nManifest saved to {MANIFEST_FILE} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate responsive WebP/AVIF/PNG derivatives and their manifest")
+    parser.add_argument('sources', nargs='*', default=SOURCE_DIRS, help="Source directories (default: %(default)s)")
+    parser.add_argument('--workers', type=int, help="Encoding processes (default: one per CPU)")
+    parser.add_argument('--force', action='store_true', help="Re-encode every source")
+    args = parser.parse_args()
+    main(args.sources, args.workers, args.force)
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+
+import generate_shopify_import as gen
+from bom_classifier import BomClassifier
+from catalog_cache import file_sha256
+from catalog_dedup import DEFAULT_POLICY, CatalogCheck
+
+# Incremental mode for generate_shopify_import.py.
+# Keeps a small on-disk state of per-BOM fingerprints from the last run and only
+# emits the Shopify products (handles) that were added, changed or removed.
+# Every product touched by a change is regrouped and written in full, since a
+# Shopify product is imported as a whole (all its variant rows).
+
+STATE_FILE = '.vaonix_import_state.json'
+DELTA_FILE = 'vaonix_shopify_import_delta.csv'
+STATE_VERSION = 1
+
+
+def config_fingerprint(pricing=gen.DEFAULT_PRICING, collisions=DEFAULT_POLICY):
+    # Anything outside the sheet that changes every generated row (or which rows are kept)
+    payload = [STATE_VERSION, pricing.fingerprint(), collisions, gen.VENDOR_NAME, gen.COLUMNS]
+    return hashlib.sha1(json.dumps(payload).encode('utf-8')).hexdigest()
+
+
+def row_fingerprint(description, price_raw, tags, previous=None):
+    payload = json.dumps([str(description), str(price_raw), tags], ensure_ascii=False)
+    if previous:
+        # Duplicate BOM rows: fold every occurrence into one fingerprint
+        payload = previous + payload
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def load_state(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as fh:
+        state = json.load(fh)
+    if state.get('version') != STATE_VERSION:
+        return None
+    return state
+
+
+def save_state(state, path):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump(state, fh, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def removed_product_row(handle, title):
+    # Shopify CSV imports cannot delete products, so removed handles are unpublished
+    return {'Handle': handle, 'Title': title, 'Published': 'FALSE'}
+
+
+def fingerprint_catalog(entries, classifier, selling_prices=None, missing_products=None):
+    """Return {key: [fingerprint, family handle]} for sheet rows and injected products"""
+    if missing_products is None:
+        missing_products = gen.MISSING_PRODUCTS
+    rows = {}
+    for (bom, description, price_raw), selling_price in gen.hash_join(entries, selling_prices or {}):
+        info = classifier.classify(bom, description)
+        if info.skip:
+            continue
+        if selling_price is not None:
+            price_raw = ('selling', selling_price)
+        key = str(bom)
+        previous = rows.get(key)
+        fingerprint = row_fingerprint(description, price_raw, info.tags, previous and previous[0])
+        rows[key] = [fingerprint, gen.family_key(info)]
+
+    for missing in missing_products:
+        row = gen.missing_product_row(missing)
+        key = 'missing:' + missing['Bom']
+        rows[key] = [row_fingerprint(row['Body (HTML)'], missing['Price'], row['Tags']), row['Handle']]
+    return rows
+
+
+def run_incremental(reader=gen.DEFAULT_READER, input_file=None, selling_prices_file=None,
+                    workers=None, use_cache=True, state_path=STATE_FILE, delta_path=DELTA_FILE, pricing_rules=None,
+                    collisions=DEFAULT_POLICY):
+    input_file = input_file or gen.INPUT_FILE
+    pricing = gen.PriceTable(gen.load_rules(pricing_rules)) if pricing_rules else gen.DEFAULT_PRICING
+    state = load_state(state_path)
+    source = {
+        'sha256': file_sha256(input_file),
+        'selling_prices': file_sha256(selling_prices_file) if selling_prices_file else None,
+        'config': config_fingerprint(pricing, collisions),
+    }
+
+    if state and state['source'] == source:
+        # Same bytes and same settings: nothing can have changed
+        print("Price list unchanged since last run, nothing to import.")
+        gen.write_csv([], delta_path)
+        return {'added': [], 'changed': [], 'removed': []}
+
+    selling_prices = None
+    if selling_prices_file:
+        print(f"Loading {input_file} and {selling_prices_file} in parallel ({reader} reader)...")
+        entries, selling_prices = gen.load_sources(reader, input_file, selling_prices_file, workers, use_cache)
+    else:
+        print(f"Loading Excel file ({reader} reader)...")
+        entries = list(gen.read_price_list(reader, input_file, use_cache))
+    classifier = BomClassifier()
+    # Same duplicate / collision handling as a full run ('fail' raises before the state is saved)
+    check = CatalogCheck(collisions)
+    entries, missing_products = check.run(entries, classifier, gen.MISSING_PRODUCTS)
+    print(check.summary())
+    rows = fingerprint_catalog(entries, classifier, selling_prices, missing_products)
+
+    old_rows = state['rows'] if state and state['source']['config'] == source['config'] else {}
+    old_families = state['families'] if state else {}
+
+    touched = set()
+    for key, (fingerprint, family) in rows.items():
+        old = old_rows.get(key)
+        if old is None or old[0] != fingerprint:
+            touched.add(family)
+        elif old[1] != family:
+            touched.update((family, old[1]))
+    for key, (fingerprint, family) in old_rows.items():
+        if key not in rows:
+            touched.add(family)
+
+    print(f"Regrouping {len(touched)} touched products...")
+    affected = []
+    for bom, description, price_raw in entries:
+        info = classifier.classify(bom, description)
+        if not info.skip and gen.family_key(info) in touched:
+            affected.append((bom, description, price_raw))
+    delta_rows = gen.group_rows(affected, classifier, selling_prices, pricing)
+    for missing in missing_products:
+        row = gen.missing_product_row(missing, pricing)
+        if row['Handle'] in touched:
+            delta_rows.append(row)
+
+    families = dict(old_families)
+    current = {row['Handle']: row['Title'] for row in delta_rows}
+    summary = {'added': [], 'changed': [], 'removed': []}
+    for handle in sorted(touched):
+        if handle in current:
+            summary['changed' if handle in old_families else 'added'].append(handle)
+            families[handle] = current[handle]
+        elif handle in old_families:
+            summary['removed'].append(handle)
+            delta_rows.append(removed_product_row(handle, families.pop(handle)))
+
+    gen.write_csv(delta_rows, delta_path)
+    print(f"Added: {len(summary['added'])}, changed: {len(summary['changed'])}, "
+          f"removed: {len(summary['removed'])}")
+
+    save_state({'version': STATE_VERSION, 'source': source, 'rows': rows, 'families': families},
+               state_path)
+    return summary
@@ -0,0 +1,218 @@
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Minimal local stand-in for the Shopify Admin GraphQL API, enough for shopify_upload.py:
+# aliased productSet / productUpdate mutations and productByIdentifier lookups, stagedUploadsCreate + staged upload target,
+# bulkOperationRunMutation / currentBulkOperation with a JSONL result, and the
+# leaky-bucket query cost (extensions.cost, THROTTLED errors).
+# Usage: python scripts/mock_shopify.py [--port 8766] [--bucket 1000] [--restore-rate 50]
+
+DEFAULT_PORT = 8766
+PRODUCT_SET_COST = 10
+PRODUCT_SET_RE = re.compile(r'(\w+)\s*:\s*productSet\(input:\s*\$(\w+)')
+PRODUCT_UPDATE_RE = re.compile(r'(\w+)\s*:\s*productUpdate\(product:\s*\$(\w+)')
+PRODUCT_LOOKUP_RE = re.compile(r'(\w+)\s*:\s*productByIdentifier\(identifier:\s*\$(\w+)')
+
+
+class MockShopify:
+    def __init__(self, bucket=1000, restore_rate=50, latency=0.0):
+        self.bucket = bucket
+        self.restore_rate = restore_rate
+        self.latency = latency
+        self.available = float(bucket)
+        self.products = {}
+        self.requests = 0
+        self.throttled = 0
+        self.staged = {}
+        self.bulk_results = {}
+        self.current_bulk = None
+        # Requests carrying one of these handles get HTTP 503, to simulate an outage
+        self.unavailable = set()
+        self.base_url = ''
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _spend(self, cost):
+        """Take cost points from the bucket; returns (allowed, throttleStatus)"""
+        with self._lock:
+            now = time.monotonic()
+            self.available = min(self.bucket, self.available + (now - self._updated) * self.restore_rate)
+            self._updated = now
+            allowed = self.available >= cost
+            if allowed:
+                self.available -= cost
+            else:
+                self.throttled += 1
+            status = {'maximumAvailable': float(self.bucket), 'currentlyAvailable': int(self.available),
+                      'restoreRate': float(self.restore_rate)}
+        return allowed, status
+
+    def product_set(self, product):
+        errors = []
+        if not product.get('title'):
+            errors.append({'field': ['input', 'title'], 'message': "Title can't be blank"})
+        values = [v['optionValues'][0]['name'] for v in product.get('variants', [])]
+        if len(values) != len(set(values)):
+            errors.append({'field': ['input', 'variants'], 'message': 'Duplicate option values'})
+        if errors:
+            return {'product': None, 'userErrors': errors}
+        with self._lock:
+            existing = self.products.get(product['handle'])
+            product_id = existing['id'] if existing else f"gid://shopify/Product/{len(self.products) + 1}"
+            self.products[product['handle']] = dict(product, id=product_id)
+        return {'product': {'id': product_id, 'handle': product['handle']}, 'userErrors': []}
+
+    def product_update(self, product):
+        with self._lock:
+            existing = next((p for p in self.products.values() if p['id'] == product.get('id')), None)
+            if existing is None:
+                return {'product': None, 'userErrors': [{'field': ['id'], 'message': 'Product does not exist'}]}
+            existing.update(product)
+        return {'product': {'id': existing['id'], 'handle': existing['handle']}, 'userErrors': []}
+
+    def product_by_identifier(self, identifier):
+        product = self.products.get(identifier.get('handle'))
+        return {'id': product['id'], 'handle': product['handle']} if product else None
+
+    def graphql(self, query, variables):
+        calls = PRODUCT_SET_RE.findall(query)
+        updates = PRODUCT_UPDATE_RE.findall(query)
+        lookups = PRODUCT_LOOKUP_RE.findall(query)
+        cost = 1 + PRODUCT_SET_COST * (len(calls) + len(updates)) + len(lookups)
+        allowed, status = self._spend(cost)
+        extensions = {'cost': {'requestedQueryCost': cost, 'actualQueryCost': cost if allowed else 0,
+                               'throttleStatus': status}}
+        if not allowed:
+            return {'errors': [{'message': 'Throttled', 'extensions': {'code': 'THROTTLED'}}],
+                    'extensions': extensions}
+
+        if 'stagedUploadsCreate' in query:
+            key = f"tmp/bulk/{len(self.staged) + 1}/products.jsonl"
+            data = {'stagedUploadsCreate': {'stagedTargets': [{
+                'url': f"{self.base_url}/staged-uploads", 'resourceUrl': None,
+                'parameters': [{'name': 'key', 'value': key}]}], 'userErrors': []}}
+        elif 'bulkOperationRunMutation' in query:
+            data = {'bulkOperationRunMutation': self._run_bulk(variables['path'])}
+        elif 'currentBulkOperation' in query:
+            data = {'currentBulkOperation': self.current_bulk}
+        elif calls:
+            data = {alias: self.product_set(variables[var]) for alias, var in calls}
+        elif updates:
+            data = {alias: self.product_update(variables[var]) for alias, var in updates}
+        elif lookups:
+            data = {alias: self.product_by_identifier(variables[var]) for alias, var in lookups}
+        else:
+            return {'errors': [{'message': 'Unsupported query'}], 'extensions': extensions}
+        return {'data': data, 'extensions': extensions}
+
+    def _run_bulk(self, path):
+        if path not in self.staged:
+            return {'bulkOperation': None, 'userErrors': [{'field': ['stagedUploadPath'], 'message': 'Not found'}]}
+        operation_id = f"gid://shopify/BulkOperation/{len(self.bulk_results) + 1}"
+        lines = []
+        for number, line in enumerate(self.staged[path].decode('utf-8').splitlines()):
+            result = self.product_set(json.loads(line)['input'])
+            lines.append(json.dumps({'data': {'productSet': result}, '__lineNumber': number}))
+        self.bulk_results[operation_id] = ('\n'.join(lines) + '\n').encode('utf-8')
+        self.current_bulk = {'id': operation_id, 'status': 'COMPLETED', 'errorCode': None,
+                             'objectCount': str(len(lines)), 'partialDataUrl': None,
+                             'url': f"{self.base_url}/bulk-results/{operation_id.rsplit('/', 1)[1]}.jsonl"}
+        return {'bulkOperation': {'id': operation_id, 'status': 'CREATED'}, 'userErrors': []}
+
+    def store_upload(self, content_type, body):
+        """Keep the file part of a multipart staged upload under its key"""
+        boundary = content_type.split('boundary=', 1)[1].encode('latin-1')
+        fields, content = {}, None
+        for part in body.split(b'--' + boundary):
+            head, _, value = part.partition(b'\r\n\r\n')
+            name = re.search(rb'name="([^"]+)"', head)
+            if not name:
+                continue
+            value = value[:-2] if value.endswith(b'\r\n') else value
+            if name.group(1) == b'file':
+                content = value
+            else:
+                fields[name.group(1).decode('utf-8')] = value.decode('utf-8')
+        self.staged[fields['key']] = content
+
+
+class MockShopifyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    shop = None
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        path = urlsplit(self.path).path
+        self.shop.requests += 1
+        if self.shop.latency:
+            time.sleep(self.shop.latency)
+        if path.endswith('/graphql.json'):
+            if not self.headers.get('X-Shopify-Access-Token'):
+                self._send(401, {'errors': '[API] Invalid API key or access token'})
+                return
+            request = json.loads(body)
+            variables = (request.get('variables') or {}).values()
+            if any(isinstance(v, dict) and v.get('handle') in self.shop.unavailable for v in variables):
+                self._send(503, {'errors': 'Service Unavailable'})
+                return
+            self._send(200, self.shop.graphql(request['query'], request.get('variables') or {}))
+        elif path == '/staged-uploads':
+            self.shop.store_upload(self.headers['Content-Type'], body)
+            self._send(201, {})
+        else:
+            self._send(404, {'errors': 'Not Found'})
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        operation = path.rsplit('/', 1)[-1][:-len('.jsonl')] if path.startswith('/bulk-results/') else None
+        data = self.shop.bulk_results.get(f"gid://shopify/BulkOperation/{operation}") if operation else None
+        if data is None:
+            self._send(404, {'errors': 'Not Found'})
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/jsonl')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(shop, host='127.0.0.1', port=DEFAULT_PORT):
+    handler = type('BoundMockShopifyHandler', (MockShopifyHandler,), {'shop': shop})
+    server = ThreadingHTTPServer((host, port), handler)
+    shop.base_url = f"http://{host}:{server.server_port}"
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mock of the Shopify Admin GraphQL API")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--bucket', type=int, default=1000, help="Cost bucket size (default: %(default)s)")
+    parser.add_argument('--restore-rate', type=int, default=50, help="Points restored per second (default: %(default)s)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every request")
+    args = parser.parse_args()
+    shop = MockShopify(args.bucket, args.restore_rate, args.latency)
+    server = make_server(shop, port=args.port)
+    print(f"Mock Shopify on {shop.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"{len(shop.products)} products, {shop.requests} requests, {shop.throttled} throttled")
@@ -0,0 +1,78 @@
+import time
+from collections import namedtuple
+
+from catalog_cache import iter_rows
+from workbook_readers import DEFAULT_READER, cell
+
+# Parallel ingestion of several workbooks / sheets.
+# Each (file, sheet) is read in its own worker process and normalized into
+# BOM-keyed records, so wall time follows the largest sheet instead of the sum.
+
+SELLING_PRICES_FILE = 'boms-selling-prices-20260115-163935.xlsx'
+
+# columns: 1-based sheet columns copied into each record, BOM first.
+# required: how many leading columns must be non-empty for a row to be kept.
+SheetSource = namedtuple('SheetSource', ['name', 'path', 'sheet', 'columns', 'required', 'min_row'])
+
+SELLING_PRICES_SOURCE = SheetSource(
+    name='selling_prices',
+    path=SELLING_PRICES_FILE,
+    sheet='Worksheet',
+    columns=(1, 3),  # Référence BOM, Prix recommandé
+    required=2,
+    min_row=2,
+)
+
+
+def canonical_bom(bom):
+    """Join key shared by every source"""
+    return str(bom).strip().upper()
+
+
+def load_source(source, reader=DEFAULT_READER, use_cache=True):
+    """Read one sheet and return (name, records, seconds); runs inside a worker process"""
+    start = time.perf_counter()
+    records = []
+    for values in iter_rows(source.path, source.sheet, min_row=source.min_row, reader=reader,
+                            use_cache=use_cache):
+        record = tuple(cell(values, column) for column in source.columns)
+        if all(record[:source.required]):
+            records.append(record)
+    return source.name, records, time.perf_counter() - start
+
+
+def ingest(sources, reader=DEFAULT_READER, max_workers=None, use_cache=True):
+    """Load every source in parallel and return {name: records}"""
+    start = time.perf_counter()
+    workers = max_workers or len(sources)
+    results = {}
+    if workers <= 1:
+        loaded = [load_source(source, reader, use_cache) for source in sources]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            loaded = list(pool.map(load_source, sources, [reader] * len(sources),
+                                   [use_cache] * len(sources)))
+
+    for name, records, seconds in loaded:
+        print(f"  {name}: {len(records)} records in {seconds:.2f}s")
+        results[name] = records
+    print(f"  ingested {len(sources)} sources in {time.perf_counter() - start:.2f}s")
+    return results
+
+
+def build_index(records, value_column=1):
+    """Hash side of the join: {canonical BOM: value}, first occurrence wins"""
+    index = {}
+    for record in records:
+        value = record[value_column]
+        if value is None or value == '' or value == 0:
+            continue
+        index.setdefault(canonical_bom(record[0]), value)
+    return index
+
+
+def hash_join(records, index):
+    """Probe side of the join: yield (record, matched value or None) in source order"""
+    for record in records:
+        yield record, index.get(canonical_bom(record[0]))
@@ -0,0 +1,259 @@
+import numpy as np
+import pandas as pd
+
+import generate_shopify_import as gen
+from bom_classifier import (
+    CWDM_RE, DAC_LENGTH_RE, DWDM_END_RE, DWDM_RE, FORM_FACTORS, MERGED_BASE_OPTIONS, SPEEDS, STANDALONE_OPTION,
+    TEMP_GRADES, TEMP_RE,
+)
+from multi_source import canonical_bom
+from pricing import round_exact
+
+# Vectorized alternative to generate_shopify_import.group_rows().
+# The sheet is loaded into one DataFrame, classified with str.extract / str.contains,
+# priced with one gather from the PriceTable and grouped with a single stable sort_values.
+# The frame is written with DataFrame.to_csv (csv_stream.write_frame), not row by row.
+# The resulting CSV is byte-identical to the per-row engine.
+
+def clean_prices(raw):
+    """Vectorized clean_price(): numbers pass through, strings are stripped of symbols"""
+    raw = pd.Series(raw, dtype='object')
+    is_str = raw.map(type).eq(str)
+    numbers = pd.to_numeric(raw.where(~is_str), errors='coerce')
+    if is_str.any():
+        text = raw[is_str].str.replace(r'[^\d.,]', '', regex=True).str.replace(',', '.', regex=False)
+        numbers[is_str] = pd.to_numeric(text, errors='coerce')
+    return numbers.fillna(0.0).astype('float64')
+
+
+def _contains(series, needle):
+    return series.str.contains(needle, regex=False)
+
+
+def _nonempty(series):
+    return series.notna() & series.ne('')
+
+
+def _extract(series, pattern, candidates):
+    """str.extract restricted to the rows that pass a cheap substring prefilter"""
+    parts = pd.DataFrame(np.nan, index=series.index, columns=range(pattern.groups), dtype='object')
+    if candidates.any():
+        parts.loc[candidates] = series[candidates].str.extract(pattern).astype('object').values
+    return parts
+
+
+def classify_frame(df):
+    """Add classification columns to a frame with bom / description columns"""
+    bom_s = df['bom'].astype(str)
+    bom_u = bom_s.str.upper()
+    desc_u = df['description'].astype(str).str.upper()
+
+    out = pd.DataFrame(index=df.index)
+    out['skip'] = _contains(bom_u, '-HP') | _contains(bom_u, ' HW') | _contains(desc_u, ' HW')
+    out['handle'] = bom_s.str.lower().str.replace(' ', '-', regex=False).str.replace('--', '-', regex=False)
+
+    # Product type and tags (same precedence as categorize_product)
+    dac = _contains(bom_u, 'DAC') | _contains(desc_u, 'CABLE')
+    aoc = ~dac & _contains(bom_u, 'AOC')
+    out['product_type'] = np.select([dac, aoc], ["Network Cable", "Active Optical Cable"], "Optical Transceiver")
+    tags = pd.Series(np.select([dac, aoc], ["DAC, Cable", "AOC, Cable"], "Transceiver"), index=df.index)
+
+    form_factor = pd.Series(np.select([_contains(bom_u, needle) for needle, _ in FORM_FACTORS],
+                                      [tag for _, tag in FORM_FACTORS], ''), index=df.index)
+    speed = pd.Series(np.select([_contains(bom_u, s) for s in SPEEDS], list(SPEEDS), ''), index=df.index)
+    flags = [
+        (form_factor, None),
+        ('DWDM', _contains(bom_u, 'DWDM') | _contains(desc_u, 'DWDM')),
+        ('CWDM', _contains(bom_u, 'CWDM') | _contains(desc_u, 'CWDM')),
+        ('BiDi', _contains(bom_u, 'BIDI') | _contains(desc_u, 'BIDI')),
+        ('Tunable', _contains(desc_u, 'TUNABLE')),
+        (speed, None),
+    ]
+    for tag, mask in flags:
+        if mask is None:
+            tags = tags + np.where(tag != '', ', ' + tag, '')
+        else:
+            tags = tags + np.where(mask, ', ' + tag, '')
+    out['tags'] = tags
+    out['form_factor'] = form_factor
+    out['speed'] = speed
+
+    is_cable = _contains(bom_u, 'DAC') | (_contains(bom_u, 'AOC') & _contains(desc_u, 'CABLE'))
+
+    # Cable lengths
+    dac_parts = _extract(bom_s, DAC_LENGTH_RE, is_cable & _contains(bom_u, 'M'))
+    length = dac_parts[1].str.replace('-', '.', regex=False)
+    suffix = dac_parts[2].str.strip('- ')
+    dac_name = length + 'm' + np.where(_nonempty(suffix), ' (' + suffix.fillna('') + ')', '')
+    is_length = is_cable & _nonempty(dac_parts[0])
+
+    # CWDM wavelengths
+    # (prefilter assumes ASCII digits, like every BOM in the price lists)
+    cwdm_parts = _extract(bom_s, CWDM_RE, ~is_cable & bom_s.str.contains(r'-\d{4}'))
+    wave = pd.to_numeric(cwdm_parts[1], errors='coerce')
+    cwdm_grade = cwdm_parts[2].str.replace('-', '', regex=False).str.upper()
+    cwdm_name = cwdm_parts[1] + 'nm' + np.select([cwdm_grade.eq('I'), cwdm_grade.eq('E')],
+                                                 [' (Ind.)', ' (Ext.)'], '')
+    is_wavelength = ~is_cable & _nonempty(cwdm_parts[0]) & wave.between(1270, 1610)
+
+    # DWDM channels: number from the first -Cxx, base strips the trailing one
+    dwdm_candidates = ~is_cable & _contains(bom_u, '-C')
+    channel = pd.to_numeric(_extract(bom_s, DWDM_RE, dwdm_candidates)[2], errors='coerce')
+    dwdm_end = pd.Series(False, index=df.index)
+    dwdm_base = pd.Series('', index=df.index, dtype='object')
+    if dwdm_candidates.any():
+        dwdm_end[dwdm_candidates] = bom_s[dwdm_candidates].str.contains(DWDM_END_RE).values
+        dwdm_base[dwdm_candidates] = bom_s[dwdm_candidates].str.replace(DWDM_END_RE, '', regex=True).values
+    channel_txt = channel.astype('Int64').astype(str)
+    dwdm_name = 'Channel ' + channel_txt + ' (C' + channel_txt + ')'
+    is_channel = dwdm_candidates & ~is_wavelength & channel.notna() & dwdm_end & _nonempty(dwdm_base)
+
+    # -I / -E temperature grades
+    temp_parts = _extract(bom_s, TEMP_RE, ~is_cable & (_contains(bom_u, '-I') | _contains(bom_u, '-E')))
+    temp_grade = temp_parts[1].str[1].str.upper()
+    temp_name = temp_grade.map({grade: name for grade, (name, _) in TEMP_GRADES.items()})
+    temp_weight = temp_grade.map({grade: weight for grade, (_, weight) in TEMP_GRADES.items()})
+    is_temp = ~is_cable & ~is_wavelength & ~is_channel & _nonempty(temp_parts[0])
+
+    conditions = [is_length, is_wavelength, is_channel, is_temp]
+    out['group_type'] = np.select(conditions, ['length', 'wavelength', 'channel', 'temp'], '')
+    out['base'] = np.select(conditions, [dac_parts[0], cwdm_parts[0], dwdm_base, temp_parts[0]], '')
+    out['option_name'] = np.select(
+        conditions + [is_cable], ['Length', 'Wavelength', 'Channel (ITU)', 'Temperature', 'Title'], 'Temperature')
+    out['option_value'] = np.select(
+        conditions + [is_cable], [dac_name, cwdm_name, dwdm_name, temp_name, 'Default Title'],
+        'Commercial (0/70°C)')
+    out['sort'] = np.select(
+        conditions + [is_cable], [length.astype('float64'), wave, channel, temp_weight, np.nan], 1.0)
+    return out
+
+
+def price_codes(info, pricing):
+    """PriceTable.code() of every classified row, computed once per distinct combination"""
+    # '' (no tag) falls back to code 0, like None
+    keys = info['product_type'] + '|' + info['form_factor'] + '|' + info['speed']
+    labels, combos = pd.factorize(keys)
+    return np.asarray([pricing.code(*combo.split('|')) for combo in combos], dtype='intp')[labels]
+
+
+def price_frame(df, info, selling_prices=None, pricing=gen.DEFAULT_PRICING):
+    multipliers = np.asarray(pricing.multipliers())[price_codes(info, pricing)]
+    final = pd.Series(round_exact(clean_prices(df['price_raw']).to_numpy() * multipliers), index=df.index)
+    if selling_prices:
+        selling = df['bom'].map(canonical_bom).map(selling_prices)
+        present = selling.notna()
+        if present.any():
+            final[present] = round_exact(clean_prices(selling[present]))
+    return final
+
+
+def classify_entries(entries):
+    """(bom, description, raw price) entries as a frame, and their classification columns"""
+    df = pd.DataFrame.from_records(list(entries), columns=['bom', 'description', 'price_raw'])
+    return df, classify_frame(df)
+
+
+# Classification columns CatalogCheck.check() reads
+CHECK_COLUMNS = ['skip', 'handle', 'group_type', 'base', 'option_value']
+
+
+def frame_infos(info):
+    """One record per row with the CHECK_COLUMNS as attributes, for CatalogCheck.check()"""
+    return list(info[CHECK_COLUMNS].itertuples(index=False, name='FrameClassification'))
+
+
+def build_frame(entries, selling_prices=None, missing_products=None, pricing=gen.DEFAULT_PRICING, classified=None):
+    """Vectorized group_rows(): returns the Shopify rows as a DataFrame in COLUMNS order.
+
+    classified is the (frame, classification) pair of classify_entries() for the same
+    entries, when the caller already has it.
+    """
+    if missing_products is None:
+        missing_products = gen.MISSING_PRODUCTS
+    df, info = classified if classified is not None else classify_entries(entries)
+    keep = ~info['skip']
+    df, info = df[keep], info[keep]
+    price = price_frame(df, info, selling_prices, pricing)
+
+    rows = pd.DataFrame({
+        'Handle': info['handle'],
+        'Title': df['bom'].astype(str),
+        'Body (HTML)': df['description'],
+        'Vendor': gen.VENDOR_NAME,
+        'Type': info['product_type'],
+        'Tags': info['tags'],
+        'Published': 'TRUE',
+        'Option1 Name': info['option_name'],
+        'Option1 Value': info['option_value'],
+        'Variant Grams': 100,
+        'Variant Inventory Qty': 100,
+        'Variant Inventory Policy': 'deny',
+        'Variant Price': price,
+        'Variant Compare At Price': '',
+        'Image Src': '',
+    })
+    rows['_seq'] = np.arange(len(rows))
+    rows['_sort'] = info['sort']
+
+    is_variant = info['group_type'].ne('')
+    group_key = info['base'].str.lower().str.replace(' ', '-', regex=False)
+
+    # One entry per group, in order of first appearance, typed by its first variant
+    groups = pd.DataFrame({'key': group_key[is_variant], 'type': info['group_type'][is_variant],
+                           'title': info['base'][is_variant]}).drop_duplicates('key')
+    groups['rank'] = np.arange(len(groups))
+    groups = groups.set_index('key')
+
+    variants = rows[is_variant].assign(_key=group_key[is_variant])
+    standalone = rows[~is_variant]
+
+    # Attach standalone bases to the group sharing their handle, after its own variants
+    merged_mask = standalone['Handle'].isin(groups.index)
+    merged = standalone[merged_mask].assign(_key=standalone['Handle'][merged_mask])
+    merged_type = merged['_key'].map(groups['type'])
+    merged['Option1 Name'] = merged_type.map({t: opt[0] for t, opt in MERGED_BASE_OPTIONS.items()})
+    merged['Option1 Value'] = merged_type.map({t: opt[1] for t, opt in MERGED_BASE_OPTIONS.items()})
+    merged['_seq'] += len(rows)
+
+    grouped = pd.concat([variants, merged])
+    grouped['_rank'] = grouped['_key'].map(groups['rank'])
+    grouped = grouped.sort_values(['_rank', '_sort', '_seq'], kind='stable', na_position='last')
+    grouped['Handle'] = grouped['_key']
+    grouped['Title'] = grouped['_key'].map(groups['title'])
+
+    final_standalone = standalone[~merged_mask].copy()
+    final_standalone['Option1 Name'], final_standalone['Option1 Value'] = STANDALONE_OPTION
+
+    missing = pd.DataFrame([gen.missing_product_row(m, pricing) for m in missing_products])
+    out = pd.concat([grouped[gen.COLUMNS], final_standalone[gen.COLUMNS], missing.reindex(columns=gen.COLUMNS)],
+                    ignore_index=True)
+    return out
+
+
+def count_frame_products(df, products_by_type, rows_by_type):
+    """generate_shopify_import.count_products() over the frame rows, without iterating them"""
+    first = df['Handle'].ne(df['Handle'].shift())
+    group_type = df['Option1 Name'].map(gen.OPTION_GROUP_TYPES).fillna('other')
+    products = group_type[first].value_counts()
+    # Every row counts under the group type of its product's first row
+    rows = group_type.where(first).ffill().value_counts()
+    for kind in pd.unique(group_type[first]):
+        products_by_type[kind] = products_by_type.get(kind, 0) + int(products[kind])
+        rows_by_type[kind] = rows_by_type.get(kind, 0) + int(rows[kind])
+
+
+def iter_frame_products(df, chunk_size=10000):
+    """Yield the frame rows as products (runs of rows sharing a handle), for per-product consumers"""
+    columns = list(df.columns)
+    pending = []
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        # Column lists zipped into dicts: several times faster than to_dict('records')
+        for values in zip(*(chunk[column].tolist() for column in columns)):
+            record = dict(zip(columns, values))
+            if pending and record['Handle'] != pending[0]['Handle']:
+                yield pending
+                pending = []
+            pending.append(record)
+    if pending:
+        yield pending
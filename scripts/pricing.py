@@ -0,0 +1,165 @@
+import argparse
+import json
+import time
+from functools import lru_cache
+
+from bom_classifier import FORM_FACTORS, SPEEDS
+
+# Table-driven pricing of the catalog.
+# A rule set is JSON:
+#   {"default": 1.15,
+#    "rules": [{"product_type": "Network Cable", "multiplier": 1.25},
+#              {"form_factor": "QSFP-DD", "speed": "400G", "multiplier": 1.10,
+#               "breaks": [[10, 1.08], [50, 1.06]]}]}
+# A rule applies to the rows whose classifier product type / form factor / speed
+# equal every field it sets; the most specific applicable rule wins, then the last
+# listed. "breaks" are [min quantity, multiplier] steps (the CSV is priced at 1).
+# PriceTable compiles a rule set once into a flat multiplier table indexed by the
+# classifier codes, so pricing a whole catalog is one gather, multiply and exact
+# round (numpy when installed, per-row round() otherwise, same results).
+# Usage: python scripts/pricing.py RULES.json [--quantity 10]  (reprice the catalog, print the changes)
+
+DEFAULT_MULTIPLIER = 1.15
+DEFAULT_RULES = {'default': DEFAULT_MULTIPLIER, 'rules': []}
+
+PRODUCT_TYPES = ('Optical Transceiver', 'Network Cable', 'Active Optical Cable')
+# Code 0 of every axis is "not set"
+AXES = {
+    'product_type': (None,) + PRODUCT_TYPES,
+    'form_factor': (None,) + tuple(dict.fromkeys(tag for _, tag in FORM_FACTORS)),
+    'speed': (None,) + SPEEDS,
+}
+RULE_KEYS = set(AXES) | {'multiplier', 'breaks'}
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError:  # per-row rounding, same prices
+        return None
+    return np
+
+
+def round_exact(values, decimals=2):
+    """Element-wise round(x, decimals) with Python's exact semantics.
+
+    np.round scales by 10**decimals first and can land on the other side of a
+    tie; those (rare) near-tie values are re-rounded with Python's round().
+    """
+    np = _numpy()
+    values = np.asarray(values, dtype='float64')
+    scaled = values * 10 ** decimals
+    result = np.round(values, decimals)
+    frac = np.abs(scaled - np.floor(scaled) - 0.5)
+    ambiguous = np.flatnonzero(frac < 1e-6)
+    for idx in ambiguous:
+        result[idx] = round(float(values[idx]), decimals)
+    return result
+
+
+def load_rules(path):
+    with open(path, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+class PriceTable:
+    def __init__(self, rules=DEFAULT_RULES):
+        self.rules = rules
+        self.default = float(rules.get('default', DEFAULT_MULTIPLIER))
+        for rule in rules.get('rules', []):
+            unknown = set(rule) - RULE_KEYS
+            if unknown:
+                raise ValueError(f"Unknown pricing rule keys {sorted(unknown)} in {rule}")
+            if 'multiplier' not in rule:
+                raise ValueError(f"Pricing rule without a multiplier: {rule}")
+            for field, values in AXES.items():
+                if field in rule and rule[field] not in values[1:]:
+                    raise ValueError(f"Unknown {field} '{rule[field]}' in pricing rule {rule}")
+        self._codes = {field: {value: idx for idx, value in enumerate(values)} for field, values in AXES.items()}
+        self._sizes = [len(values) for values in AXES.values()]
+        # Rows priced as they are (BOM export selling prices) use the last code
+        self.as_is = self._sizes[0] * self._sizes[1] * self._sizes[2]
+        self._tables = {}
+
+    def code(self, product_type, form_factor, speed):
+        codes = self._codes
+        _, forms, speeds = self._sizes
+        return ((codes['product_type'].get(product_type, 0) * forms + codes['form_factor'].get(form_factor, 0))
+                * speeds + codes['speed'].get(speed, 0))
+
+    def _multiplier(self, cell, quantity):
+        best = None
+        for order, rule in enumerate(self.rules.get('rules', [])):
+            if all(rule[field] == value for field, value in cell.items() if field in rule):
+                rank = (sum(field in rule for field in AXES), order)
+                if best is None or rank > best[0]:
+                    best = (rank, rule)
+        if best is None:
+            return self.default
+        rule = best[1]
+        multiplier = rule['multiplier']
+        for min_quantity, step in sorted(rule.get('breaks', [])):
+            if quantity >= min_quantity:
+                multiplier = step
+        return float(multiplier)
+
+    def multipliers(self, quantity=1):
+        """Flat multiplier table for `quantity`, indexed by code()"""
+        table = self._tables.get(quantity)
+        if table is None:
+            table = []
+            for product_type in AXES['product_type']:
+                for form_factor in AXES['form_factor']:
+                    for speed in AXES['speed']:
+                        cell = {'product_type': product_type, 'form_factor': form_factor, 'speed': speed}
+                        table.append(self._multiplier(cell, quantity))
+            table.append(1.0)
+            self._tables[quantity] = table
+        return table
+
+    def price(self, cost, code, quantity=1):
+        return round(cost * self.multipliers(quantity)[code], 2)
+
+    def price_batch(self, costs, codes, quantity=1):
+        """Prices of every (cost, code) pair, as a list of floats"""
+        table = self.multipliers(quantity)
+        np = _numpy()
+        if np is None:
+            return [round(cost * table[code], 2) for cost, code in zip(costs, codes)]
+        prices = np.asarray(costs, dtype='float64') * np.asarray(table)[np.asarray(codes, dtype='intp')]
+        return round_exact(prices).tolist()
+
+    def fingerprint(self):
+        return json.dumps(self.rules, sort_keys=True)
+
+
+def main(rules_path, quantity=1, top=10):
+    import generate_shopify_import as gen
+    from bom_classifier import BomClassifier
+
+    entries = list(gen.read_price_list())
+    current, new = PriceTable(), PriceTable(load_rules(rules_path))
+    rows, costs, codes = gen.catalog_costs(entries, BomClassifier(), current)
+    boms = [bom for bom, _, _ in rows]
+    before = current.price_batch(costs, codes)
+
+    start = time.perf_counter()
+    after = new.price_batch(costs, codes, quantity)
+    elapsed = time.perf_counter() - start
+
+    changes = sorted(((a - b, bom, b, a) for bom, b, a in zip(boms, before, after) if a != b), reverse=True,
+                     key=lambda change: abs(change[0]))
+    print(f"Repriced {len(after)} rows with {rules_path} (quantity {quantity}) in {elapsed * 1000:.2f} ms")
+    print(f"{len(changes)} prices changed, total {sum(after) - sum(before):+.2f}")
+    for delta, bom, b, a in changes[:top]:
+        print(f"  {bom:<40}{b:>10.2f} -> {a:>10.2f} ({delta:+.2f})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reprice the catalog under a rule set and show what changes")
+    parser.add_argument('rules', help="Pricing rules JSON")
+    parser.add_argument('--quantity', type=int, default=1, help="Order quantity for the breaks (default: 1)")
+    parser.add_argument('--top', type=int, default=10, help="Largest changes to list (default: %(default)s)")
+    args = parser.parse_args()
+    main(args.rules, args.quantity, args.top)
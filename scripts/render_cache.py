@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+
+# Content-addressed cache for create_product_images.py.
+# A render is identified by the sha256 of everything that goes into it: the base
+# image bytes, the logo bytes, the label config and the PNG settings. The manifest
+# records, per output file, the key it was rendered from and the size / mtime it was
+# written with; an output whose entry still matches is not rendered again.
+
+MANIFEST_FILE = '.product_images_manifest.json'
+# Bump when the compositing code changes the pixels
+RENDER_VERSION = 2
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def render_key(base_digest, logo_digest, label_config, compress_level):
+    payload = json.dumps([RENDER_VERSION, base_digest, logo_digest, label_config, compress_level],
+                         sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def write_atomic(path, data):
+    """Write bytes through a temporary file so readers never see a partial image"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as fh:
+        fh.write(data)
+    os.replace(tmp_path, path)
+
+
+class RenderManifest:
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as fh:
+                data = json.load(fh)
+            if data.get('version') == RENDER_VERSION:
+                self.entries = data.get('outputs', {})
+
+    @staticmethod
+    def _id(output_path):
+        return os.path.abspath(output_path)
+
+    def is_fresh(self, output_path, key):
+        """True when output_path was rendered from key and has not been touched since"""
+        entry = self.entries.get(self._id(output_path))
+        if entry is None or entry['key'] != key:
+            return False
+        try:
+            st = os.stat(output_path)
+        except FileNotFoundError:
+            return False
+        return entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns
+
+    def record(self, output_path, key):
+        st = os.stat(output_path)
+        self.entries[self._id(output_path)] = {'key': key, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump({'version': RENDER_VERSION, 'outputs': self.entries}, fh, indent=2)
+        os.replace(tmp_path, self.path)
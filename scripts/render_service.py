@@ -0,0 +1,283 @@
+import argparse
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from create_product_images import CONFIG_FILE, IMAGES_DIR, Renderer, load_config
+from render_cache import file_digest, render_key, write_atomic
+
+# On-demand product image service on top of create_label_with_logo().
+#   GET /render/<template>.png?bom=<text>
+# renders the template's base image with the Vaonix label and the BOM text under the
+# logo. Templates (base image + label config) come from the "templates" section of
+# product_images.json. Encoded PNGs are kept in a memory LRU bounded in bytes, backed
+# by a disk tier bounded the same way (least recently used by atime evicted first),
+# and served with an ETag (the render key) so clients revalidate with a 304.
+# Usage: python scripts/render_service.py [--port 8765] [--memory-mb 64] [--disk-mb 512]
+
+DEFAULT_PORT = 8765
+DISK_CACHE_DIR = '.render_service_cache'
+MEMORY_LIMIT = 64 << 20
+DISK_LIMIT = 512 << 20
+MAX_TEXT_LENGTH = 80
+
+
+class ByteLRU:
+    """Thread-safe LRU of bytes values, bounded by their total size"""
+    def __init__(self, max_bytes=MEMORY_LIMIT):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match list ("*", or comma-separated, W/ allowed) with an ETag"""
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or (candidate[2:] if candidate.startswith('W/') else candidate) == opaque:
+            return True
+    return False
+
+
+class RenderService:
+    """Template renders with a memory tier and a disk tier, keyed like render_cache"""
+    def __init__(self, config, images_dir=IMAGES_DIR, disk_dir=DISK_CACHE_DIR, memory_bytes=MEMORY_LIMIT,
+                 disk_bytes=DISK_LIMIT):
+        self.templates = config["templates"]
+        products_dir = os.path.join(images_dir, "products")
+        logo_path = os.path.join(images_dir, config["logo"])
+        self.renderer = Renderer(logo_path, products_dir)
+        self.memory = ByteLRU(memory_bytes)
+        self.disk_dir = disk_dir
+        self.disk_bytes = disk_bytes
+        os.makedirs(disk_dir, exist_ok=True)
+        self.disk_size = sum(size for _, _, size in self._disk_entries())
+        self._logo_digest = file_digest(logo_path)
+        self._base_digests = {name: file_digest(os.path.join(products_dir, template["base"]))
+                              for name, template in self.templates.items()}
+        # One lock per key being rendered, so concurrent misses of a key render it once
+        # while other keys render in parallel (the renderer's caches only ever gain
+        # finished entries)
+        self._key_locks = {}
+        self._key_locks_lock = threading.Lock()
+        # Guards the disk tier: its size and evictions
+        self._disk_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'memory': 0, 'disk': 0, 'render': 0}
+
+    def key(self, template, text):
+        label = dict(self.templates[template]["label"], text=text)
+        return render_key(self._base_digests[template], self._logo_digest, label, self.renderer.compress_level)
+
+    def get(self, template, text):
+        """(PNG bytes, ETag key, tier it came from) for a template and label text"""
+        key = self.key(template, text)
+        disk_path = os.path.join(self.disk_dir, key + '.png')
+        data, tier = self._cached(key, disk_path)
+        if data is None:
+            with self._key_lock(key):
+                # Another request may have rendered it while this one waited
+                data, tier = self._cached(key, disk_path)
+                if data is None:
+                    template_config = self.templates[template]
+                    data = self.renderer.encode(template_config["base"], template_config["label"], text or None)
+                    self._store(disk_path, data)
+                    tier = 'render'
+                self.memory.put(key, data)
+        self._count(tier)
+        return data, key, tier
+
+    def _cached(self, key, disk_path):
+        """(data, tier) from the memory or disk tier, (None, None) on a miss"""
+        data = self.memory.get(key)
+        if data is not None:
+            return data, 'memory'
+        try:
+            with open(disk_path, 'rb') as fh:
+                data = fh.read()
+        except FileNotFoundError:
+            return None, None
+        self._touch(disk_path)
+        self.memory.put(key, data)
+        return data, 'disk'
+
+    @contextmanager
+    def _key_lock(self, key):
+        with self._key_locks_lock:
+            lock, users = self._key_locks.get(key, (None, 0))
+            lock = lock or threading.Lock()
+            self._key_locks[key] = (lock, users + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._key_locks_lock:
+                lock, users = self._key_locks[key]
+                if users == 1:
+                    del self._key_locks[key]
+                else:
+                    self._key_locks[key] = (lock, users - 1)
+
+    def _store(self, disk_path, data):
+        """Add a render to the disk tier, evicting the least recently used PNGs past its budget"""
+        if len(data) > self.disk_bytes:
+            return
+        with self._disk_lock:
+            # Only a new file grows the tier, not one another process sharing disk_dir just wrote
+            existed = os.path.exists(disk_path)
+            write_atomic(disk_path, data)
+            if not existed:
+                self.disk_size += len(data)
+            if self.disk_size > self.disk_bytes:
+                self._evict_disk()
+
+    def stats_snapshot(self):
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def _count(self, tier):
+        with self._stats_lock:
+            self.stats[tier] += 1
+
+    def _disk_entries(self):
+        """(atime, path, size) of every cached PNG"""
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith('.png'):
+                path = os.path.join(self.disk_dir, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_atime, path, st.st_size))
+        return entries
+
+    @staticmethod
+    def _touch(path):
+        # Mounts with noatime / relatime do not record reads, the eviction order relies on it
+        try:
+            st = os.stat(path)
+            os.utime(path, (time.time(), st.st_mtime))
+        except FileNotFoundError:
+            pass
+
+    def _evict_disk(self):
+        """Remove the least recently used PNGs until the disk tier fits its budget"""
+        entries = sorted(self._disk_entries())
+        self.disk_size = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if self.disk_size <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.disk_size -= size
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/health':
+            self._send(200, b'ok', 'text/plain')
+            return
+        if not (url.path.startswith('/render/') and url.path.endswith('.png')):
+            self._send(404, b'not found', 'text/plain')
+            return
+
+        template = url.path[len('/render/'):-len('.png')]
+        if template not in self.service.templates:
+            self._send(404, f"unknown template {template!r}".encode('utf-8'), 'text/plain')
+            return
+        text = parse_qs(url.query).get('bom', [''])[0].strip()
+        if len(text) > MAX_TEXT_LENGTH:
+            self._send(400, b'bom too long', 'text/plain')
+            return
+
+        etag = f'"{self.service.key(template, text)[:32]}"'
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self._send(304, b'', None, etag)
+            return
+        data, _, tier = self.service.get(template, text)
+        self._send(200, data, 'image/png', etag, tier)
+
+    def _send(self, status, body, content_type, etag=None, tier=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'public, max-age=86400')
+        if tier:
+            self.send_header('X-Render-Cache', tier)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(service, host='127.0.0.1', port=DEFAULT_PORT):
+    handler = type('BoundRenderHandler', (RenderHandler,), {'service': service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve labelled product images rendered on demand")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--config', default=CONFIG_FILE, help="Templates config (default: %(default)s)")
+    parser.add_argument('--images-dir', default=IMAGES_DIR)
+    parser.add_argument('--memory-mb', type=int, default=MEMORY_LIMIT >> 20,
+                        help="Memory cache budget in MB (default: %(default)s)")
+    parser.add_argument('--disk-dir', default=DISK_CACHE_DIR, help="Disk cache directory (default: %(default)s)")
+    parser.add_argument('--disk-mb', type=int, default=DISK_LIMIT >> 20,
+                        help="Disk cache budget in MB (default: %(default)s)")
+    args = parser.parse_args()
+
+    service = RenderService(load_config(args.config), args.images_dir, args.disk_dir, args.memory_mb << 20,
+                            args.disk_mb << 20)
+    server = make_server(service, args.host, args.port)
+    print(f"Serving {', '.join(sorted(service.templates))} templates on http://{args.host}:{server.server_port}/render/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,86 @@
+import contextlib
+import cProfile
+import datetime
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, peak memory is not reported
+    resource = None
+
+# Per-stage instrumentation for generate_shopify_import.py.
+# Each stage records wall and CPU time, rows in and out and the peak RSS of the
+# process once it is done. One stage can be run under cProfile. The whole run is
+# written as a JSON report.
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, None where unavailable"""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+class RunReport:
+    def __init__(self, profile_stage=None, profile_path=None):
+        self.profile_stage = profile_stage
+        self.profile_path = profile_path or f"{profile_stage}.prof"
+        self.started = datetime.datetime.now().isoformat(timespec='seconds')
+        self.info = {}
+        self.counts = {}
+        self.stages = []
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    @contextlib.contextmanager
+    def stage(self, name, rows_in=None):
+        """Time the enclosed block; set record['rows_out'] inside it"""
+        record = {'name': name, 'rows_in': rows_in, 'rows_out': None}
+        profiler = cProfile.Profile() if name == self.profile_stage else None
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(self.profile_path)
+                record['profile'] = self.profile_path
+            record['wall_seconds'] = round(time.perf_counter() - wall, 4)
+            record['cpu_seconds'] = round(time.process_time() - cpu, 4)
+            record['peak_rss_mb'] = peak_rss_mb()
+            self.stages.append(record)
+
+    def to_dict(self):
+        return {
+            'started': self.started,
+            **self.info,
+            'wall_seconds': round(time.perf_counter() - self._wall, 4),
+            'cpu_seconds': round(time.process_time() - self._cpu, 4),
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': self.stages,
+            'counts': self.counts,
+        }
+
+    def write(self, path):
+        data = self.to_dict()
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return data
+
+    def print_summary(self):
+        print(f"{'stage':<10}{'wall s':>9}{'cpu s':>9}{'rows in':>9}{'rows out':>10}{'peak MB':>9}")
+        for record in self.stages:
+            rows_in = '-' if record['rows_in'] is None else record['rows_in']
+            rows_out = '-' if record['rows_out'] is None else record['rows_out']
+            peak = '-' if record['peak_rss_mb'] is None else record['peak_rss_mb']
+            print(f"{record['name']:<10}{record['wall_seconds']:>9.3f}{record['cpu_seconds']:>9.3f}"
+                  f"{rows_in:>9}{rows_out:>10}{peak:>9}")
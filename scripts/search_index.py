@@ -0,0 +1,183 @@
+import json
+import os
+import re
+
+from bom_classifier import FORM_FACTORS, SPEEDS
+
+# Prebuilt storefront search index, emitted by generate_shopify_import.py --search-index
+# in the same pass as the CSV. It holds, for the products of the import:
+#   docs    one spec record per handle (title, type, lowest price, variant count, specs)
+#   tokens  inverted index: token -> sorted doc ids, for ProductSearch
+#   facets  facet -> value -> {count, docs}, for ProductFilters
+# src/lib/search-index.ts loads it so the browser no longer runs parseProductSpecs
+# on every title.
+
+INDEX_FILE = 'src/config/search-index.json'
+INDEX_VERSION = 1
+
+FACETS = ('type', 'formFactor', 'speed', 'technology', 'media')
+CLASSIFIER_FORM_FACTORS = {tag for _, tag in FORM_FACTORS}
+CLASSIFIER_SPEEDS = set(SPEEDS)
+# Tags set by BomClassifier.categorize that are technologies
+TAG_TECHNOLOGIES = ('DWDM', 'CWDM', 'BiDi', 'Tunable', 'DAC', 'AOC')
+
+TOKEN_RE = re.compile(r'[0-9a-zà-ÿ]+(?:[./][0-9a-zà-ÿ]+)*\+?')
+
+# Same rules as parseProductSpecs in src/lib/product-parser.ts, first match wins
+SPEC_FORM_FACTORS = (
+    (('qsfp-dd', 'qsfpdd'), 'QSFP-DD'), (('qsfp28',), 'QSFP28'), (('qsfp56',), 'QSFP56'),
+    (('qsfp112',), 'QSFP112'), (('qsfp+',), 'QSFP+'), (('sfp-dd',), 'SFP-DD'), (('sfp28',), 'SFP28'),
+    (('sfp56',), 'SFP56'), (('sfp+',), 'SFP+'), (('xfp',), 'XFP'), (('cfp2',), 'CFP2'), (('cfp4',), 'CFP4'),
+    (('cfp',), 'CFP'), (('osfp',), 'OSFP'), (('dsfp',), 'DSFP'),
+)
+SFP_RE = re.compile(r'\bsfp\b')
+SPEC_SPEEDS = (
+    (('1.6t', '1600g'), '1.6T'), (('800g',), '800G'), (('400g',), '400G'), (('200g',), '200G'),
+    (('100g',), '100G'), (('56g',), '56G'), (('50g',), '50G'), (('40g',), '40G'), (('32g',), '32G'),
+    (('25g',), '25G'), (('16g',), '16G'), (('10g',), '10G'), (('8g',), '8G'), (('2.5g', '2,5g'), '2.5G'),
+    (('1.25g', '1g'), '1G'), (('100m',), '100M'),
+)
+DISTANCE_RE = re.compile(r'(\d+(?:\.\d+)?\s?(?:km|m))\b')
+WAVELENGTH_RE = re.compile(r'(\d{3,4}(?:/\d{3,4})?nm)\b')
+SPEC_TECHNOLOGIES = (
+    (('dwdm',), None, 'DWDM'), (('cwdm',), None, 'CWDM'), (('bidi', 'bx'), None, 'BiDi'),
+    (('tunable',), None, 'Tunable'), (('dac',), None, 'DAC'), (('aoc',), None, 'AOC'), (('pon',), None, 'PON'),
+    (('sr4', 'sr8'), re.compile(r'\bsr\b'), 'SR (Short Range)'),
+    (('lr4',), re.compile(r'\blr\b'), 'LR (Long Range)'),
+    (('er4',), re.compile(r'\ber\b'), 'ER (Extended Range)'),
+    (('zr4',), re.compile(r'\bzr\b'), 'ZR (Very Long Range)'),
+    (('dr4',), re.compile(r'\bdr\b'), 'DR (Datacenter Reach)'),
+    (('fr4',), re.compile(r'\bfr\b'), 'FR (Fiber Reach)'),
+    (('lx',), None, 'LX'), (('sx',), None, 'SX'), (('ex',), None, 'EX'), (('zx',), None, 'ZX'),
+)
+SPEC_MEDIA = (
+    (('singlemode', 'smf', '9/125'), 'Singlemode'),
+    (('multimode', 'mmf', 'om3', 'om4', 'om5'), 'Multimode'),
+    (('copper', 'rj45', 'cat6', 'cat5'), 'Copper'),
+)
+
+
+def _first(text, table):
+    return next((value for needles, value in table if any(needle in text for needle in needles)), None)
+
+
+def parse_specs(text):
+    """Python port of parseProductSpecs()"""
+    text = (text or '').lower()
+    form_factor = _first(text, SPEC_FORM_FACTORS) or ('SFP' if SFP_RE.search(text) else None)
+    speed = _first(text, SPEC_SPEEDS)
+    distance = DISTANCE_RE.search(text)
+    technology = [name for needles, pattern, name in SPEC_TECHNOLOGIES
+                  if any(needle in text for needle in needles) or (pattern and pattern.search(text))]
+    wavelength = WAVELENGTH_RE.search(text)
+    if wavelength:
+        wavelength = wavelength.group(1).upper()
+    else:
+        wavelength = next((f"{nm}NM" for nm in ('850', '1310', '1550') if nm in text), None)
+
+    if form_factor == 'SFP' and speed in ('10G', '8G', '16G'):
+        form_factor = 'SFP+'
+    return {
+        'speed': speed,
+        'formFactor': form_factor,
+        'distance': distance.group(1).replace(' ', '') if distance else None,
+        'technology': technology,
+        'media': _first(text, SPEC_MEDIA),
+        'wavelength': wavelength,
+    }
+
+
+def product_specs(rows):
+    """Specs of one product: classifier tags first, the title / description parse for the rest"""
+    first = rows[0]
+    tags = [tag.strip() for tag in str(first['Tags']).split(',')]
+    parsed = parse_specs(f"{first['Title']} {first['Body (HTML)']}")
+
+    speed = next((tag for tag in tags if tag in CLASSIFIER_SPEEDS), None) or parsed['speed']
+    form_factor = next((tag for tag in tags if tag in CLASSIFIER_FORM_FACTORS), None)
+    # The classifier only knows the family ("SFP", "QSFP+"): keep a more specific parse of it
+    if not form_factor or (parsed['formFactor'] or '').startswith(form_factor.rstrip('+')):
+        form_factor = parsed['formFactor'] or form_factor
+    if form_factor == 'SFP' and speed in ('10G', '8G', '16G'):
+        form_factor = 'SFP+'
+
+    technology = [tag for tag in TAG_TECHNOLOGIES if tag in tags]
+    technology += [name for name in parsed['technology'] if name not in technology]
+    return {
+        'speed': speed,
+        'formFactor': form_factor,
+        'distance': parsed['distance'],
+        'technology': technology,
+        'media': parsed['media'],
+        'wavelength': parsed['wavelength'],
+    }
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(str(text).lower())
+
+
+class SearchIndexBuilder:
+    """Collects products as they stream past and writes the index once"""
+    def __init__(self):
+        self.docs = []
+        self._ids = {}
+        self._tokens = {}
+
+    def add(self, rows):
+        handle = rows[0]['Handle']
+        doc_id = self._ids.get(handle)
+        if doc_id is None:
+            doc_id = self._ids[handle] = len(self.docs)
+            first = rows[0]
+            self.docs.append({'handle': handle, 'title': str(first['Title']), 'type': first['Type'],
+                              'price': None, 'variants': 0, 'specs': product_specs(rows)})
+            self._tokens[doc_id] = set(tokenize(handle))
+        doc = self.docs[doc_id]
+        tokens = self._tokens[doc_id]
+        for row in rows:
+            price = float(row['Variant Price'])
+            doc['price'] = price if doc['price'] is None else min(doc['price'], price)
+            doc['variants'] += 1
+            for field in ('Title', 'Body (HTML)', 'Tags', 'Option1 Value'):
+                tokens.update(tokenize(row[field]))
+        return rows
+
+    def wrap(self, products):
+        """Pass products through, indexing each one"""
+        for rows in products:
+            yield self.add(rows)
+
+    def build(self):
+        postings = {}
+        for doc_id, tokens in self._tokens.items():
+            for token in tokens:
+                postings.setdefault(token, []).append(doc_id)
+
+        facets = {facet: {} for facet in FACETS}
+        for doc_id, doc in enumerate(self.docs):
+            specs = doc['specs']
+            values = {'type': [doc['type']], 'formFactor': [specs['formFactor']], 'speed': [specs['speed']],
+                      'technology': specs['technology'], 'media': [specs['media']]}
+            for facet, facet_values in values.items():
+                for value in facet_values:
+                    if value:
+                        facets[facet].setdefault(value, []).append(doc_id)
+
+        return {
+            'version': INDEX_VERSION,
+            'docs': self.docs,
+            'tokens': {token: postings[token] for token in sorted(postings)},
+            'facets': {facet: {value: {'count': len(ids), 'docs': ids}
+                               for value, ids in sorted(values.items(), key=lambda kv: (-len(kv[1]), kv[0]))}
+                       for facet, values in facets.items()},
+        }
+
+    def write(self, path=INDEX_FILE):
+        index = self.build()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(index, fh, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        return index
@@ -0,0 +1,626 @@
+import argparse
+import asyncio
+import csv
+import glob
+import gzip
+import hashlib
+import json
+import os
+import ssl
+import time
+import uuid
+from urllib.parse import urlsplit
+
+# Push the generated Shopify CSV to the Admin GraphQL API instead of importing it by hand.
+# Products (rows sharing a Handle) become ProductSetInput objects and are sent either
+#   --mode batch: several aliased productSet mutations per request, from concurrent
+#                 workers sharing a cost-based rate limiter, or
+#   --mode bulk:  one JSONL staged upload run by bulkOperationRunMutation.
+# Products a delta CSV only unpublishes are sent as status-only productUpdate batches.
+# Finished handles are checkpointed with a fingerprint of their input, so an interrupted
+# run resumes where it stopped and unchanged products are skipped on the next run.
+# Only the standard library is used; the HTTP/1.1 keep-alive pool is below.
+# Usage: SHOPIFY_ADMIN_TOKEN=... python scripts/shopify_upload.py [CSV ...] --shop vaonix.myshopify.com
+#        python scripts/mock_shopify.py &
+#        SHOPIFY_ADMIN_TOKEN=test python scripts/shopify_upload.py --endpoint http://127.0.0.1:8766
+
+API_VERSION = '2025-01'
+DEFAULT_CSV = 'vaonix_shopify_import_v2.csv'
+CHECKPOINT_FILE = '.shopify_upload_state.json'
+CHECKPOINT_VERSION = 1
+BATCH_SIZE = 10
+CONCURRENCY = 4
+# Requested cost of one productSet until the API tells us better
+PRODUCT_SET_COST = 10
+MAX_RETRIES = 5
+
+
+class ShopifyError(Exception):
+    pass
+
+
+# --- HTTP ---------------------------------------------------------------------------------
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one origin, at most `size` in use at once"""
+    def __init__(self, scheme, host, port, size=CONCURRENCY, timeout=60):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+        self.connections_opened = 0
+
+    async def _connect(self):
+        ssl_context = ssl.create_default_context() if self.scheme == 'https' else None
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=ssl_context), self.timeout)
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    async def request(self, method, target, body=b'', headers=None):
+        async with self._slots:
+            # A kept-alive connection may have been closed by the server: retry once on a fresh one
+            for attempt in range(2):
+                reused = bool(self._idle)
+                conn = self._idle.pop() if reused else await self._connect()
+                try:
+                    status, response_headers, data, keep_alive = await asyncio.wait_for(
+                        self._roundtrip(conn, method, target, body, headers or {}), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    conn.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                if keep_alive:
+                    self._idle.append(conn)
+                else:
+                    conn.close()
+                return status, response_headers, data
+
+    async def _roundtrip(self, conn, method, target, body, headers):
+        default_port = 443 if self.scheme == 'https' else 80
+        host = self.host if self.port == default_port else f"{self.host}:{self.port}"
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host}", f"Content-Length: {len(body)}",
+                 "Connection: keep-alive"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        conn.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+        await conn.writer.drain()
+
+        status_line = await conn.reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await conn.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await conn.reader.readuntil(b"\r\n")).split(b';')[0], 16)
+                if size == 0:
+                    await conn.reader.readuntil(b"\r\n")
+                    break
+                chunks.append(await conn.reader.readexactly(size))
+                await conn.reader.readexactly(2)
+            data = b''.join(chunks)
+        elif 'content-length' in response_headers:
+            data = await conn.reader.readexactly(int(response_headers['content-length']))
+        else:
+            data = await conn.reader.read()
+            return status, response_headers, data, False
+        keep_alive = (response_headers.get('connection', '').lower() != 'close'
+                      and not status_line.startswith(b'HTTP/1.0'))
+        return status, response_headers, data, keep_alive
+
+    def close(self):
+        while self._idle:
+            self._idle.pop().close()
+
+
+class HttpClient:
+    """One ConnectionPool per origin"""
+    def __init__(self, pool_size=CONCURRENCY):
+        self.pool_size = pool_size
+        self._pools = {}
+
+    def pool(self, url):
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        if key not in self._pools:
+            self._pools[key] = ConnectionPool(parts.scheme, parts.hostname, port, self.pool_size)
+        return self._pools[key]
+
+    async def request(self, method, url, body=b'', headers=None):
+        parts = urlsplit(url)
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        return await self.pool(url).request(method, target, body, headers)
+
+    @property
+    def connections_opened(self):
+        return sum(pool.connections_opened for pool in self._pools.values())
+
+    def close(self):
+        for pool in self._pools.values():
+            pool.close()
+
+
+# --- Rate limiting ------------------------------------------------------------------------
+
+class CostLimiter:
+    """Client-side copy of Shopify's leaky bucket of query cost points.
+
+    Requests reserve their estimated cost before being sent and wait for the bucket
+    to refill at restore_rate points per second; every response resyncs the bucket
+    with the server's throttleStatus.
+    """
+    def __init__(self, maximum=1000, restore_rate=50):
+        self.maximum = maximum
+        self.restore_rate = restore_rate
+        self.available = maximum
+        self.in_flight = 0
+        self.waited = 0.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.maximum, self.available + (now - self._updated) * self.restore_rate)
+        self._updated = now
+
+    async def acquire(self, cost):
+        cost = min(cost, self.maximum)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.available >= cost:
+                    self.available -= cost
+                    self.in_flight += cost
+                    return cost
+                delay = (cost - self.available) / self.restore_rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+
+    def release(self, reserved, cost_extension=None):
+        self.in_flight -= reserved
+        status = (cost_extension or {}).get('throttleStatus')
+        if status:
+            self.maximum = status['maximumAvailable']
+            self.restore_rate = status['restoreRate']
+            # The server's figure already includes this request; other reservations are not in it yet
+            self.available = status['currentlyAvailable'] - self.in_flight
+            self._updated = time.monotonic()
+
+
+class AdminClient:
+    """Admin GraphQL requests with cost-based throttling and retries"""
+    def __init__(self, endpoint, token, http, limiter):
+        self.url = f"{endpoint.rstrip('/')}/admin/api/{API_VERSION}/graphql.json"
+        self.token = token
+        self.http = http
+        self.limiter = limiter
+        self.requests = 0
+        self.throttled = 0
+
+    async def graphql(self, query, variables=None, cost=1):
+        body = json.dumps({'query': query, 'variables': variables or {}}).encode('utf-8')
+        headers = {'Content-Type': 'application/json', 'X-Shopify-Access-Token': self.token}
+        for attempt in range(MAX_RETRIES):
+            reserved = await self.limiter.acquire(cost)
+            try:
+                status, _, data = await self.http.request('POST', self.url, body, headers)
+            except BaseException:
+                self.limiter.release(reserved)
+                raise
+            self.requests += 1
+            if status == 429 or status >= 500:
+                self.limiter.release(reserved)
+                await asyncio.sleep(2 ** attempt)
+                continue
+            payload = json.loads(data)
+            self.limiter.release(reserved, payload.get('extensions', {}).get('cost'))
+            if status != 200:
+                raise ShopifyError(f"HTTP {status}: {payload}")
+            errors = payload.get('errors') or []
+            if any(e.get('extensions', {}).get('code') == 'THROTTLED' for e in errors):
+                self.throttled += 1
+                continue
+            if errors:
+                raise ShopifyError('; '.join(e.get('message', json.dumps(e)) for e in errors))
+            return payload['data'], payload.get('extensions', {}).get('cost')
+        raise ShopifyError(f"Gave up after {MAX_RETRIES} throttled or failed attempts")
+
+
+# --- Products -----------------------------------------------------------------------------
+
+def _open_csv(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def csv_parts(path):
+    """The CSV itself, or its numbered parts (--max-rows) if it was split"""
+    if os.path.exists(path):
+        return [path]
+    stem, gz = (path[:-3], '.gz') if path.endswith('.gz') else (path, '')
+    stem, ext = os.path.splitext(stem)
+    return sorted(glob.glob(f"{stem}-[0-9][0-9][0-9]{ext}{gz}"))
+
+
+def iter_csv_products(paths):
+    """Yield the rows of each product (consecutive rows sharing a Handle)"""
+    pending = []
+    for path in paths:
+        with _open_csv(path) as fh:
+            for row in csv.DictReader(fh):
+                if pending and row['Handle'] != pending[0]['Handle']:
+                    yield pending
+                    pending = []
+                pending.append(row)
+    if pending:
+        yield pending
+
+
+# Columns a delta CSV fills for a removed product (incremental_import.removed_product_row)
+UNPUBLISH_COLUMNS = {'Handle', 'Title', 'Published'}
+
+
+def unpublish_only(rows):
+    """True for the single row a delta CSV writes to unpublish a removed product"""
+    row = rows[0]
+    return (len(rows) == 1 and row['Published'].upper() == 'FALSE'
+            and not any(value for column, value in row.items() if column not in UNPUBLISH_COLUMNS))
+
+
+def product_input(rows):
+    """ProductSetInput for the rows of one product.
+
+    Rows that only unpublish give {'handle', 'status'} instead: a productSet from them would
+    wipe the product's variants and description, it is sent as a status-only productUpdate.
+    """
+    first = rows[0]
+    if unpublish_only(rows):
+        return {'handle': first['Handle'], 'status': 'DRAFT'}
+    option_name = first['Option1 Name'] or 'Title'
+    variants, values = [], []
+    for row in rows:
+        value = row['Option1 Value'] or 'Default Title'
+        if value in values:
+            # Shopify rejects two variants with the same option value
+            print(f"  {first['Handle']}: duplicate variant {value!r} skipped")
+            continue
+        values.append(value)
+        variant = {
+            'optionValues': [{'optionName': option_name, 'name': value}],
+            'price': row['Variant Price'],
+            'inventoryPolicy': (row['Variant Inventory Policy'] or 'deny').upper(),
+        }
+        if row['Variant Compare At Price']:
+            variant['compareAtPrice'] = row['Variant Compare At Price']
+        if row['Variant Grams']:
+            variant['inventoryItem'] = {'measurement': {'weight': {'value': float(row['Variant Grams']),
+                                                                   'unit': 'GRAMS'}}}
+        variants.append(variant)
+
+    product = {
+        'handle': first['Handle'],
+        'title': first['Title'],
+        'descriptionHtml': first['Body (HTML)'],
+        'vendor': first['Vendor'],
+        'productType': first['Type'],
+        'tags': [tag.strip() for tag in first['Tags'].split(',') if tag.strip()],
+        'status': 'ACTIVE' if first['Published'].upper() == 'TRUE' else 'DRAFT',
+        'productOptions': [{'name': option_name, 'values': [{'name': value} for value in values]}],
+        'variants': variants,
+    }
+    if first['Image Src']:
+        product['files'] = [{'originalSource': first['Image Src'], 'contentType': 'IMAGE'}]
+    return product
+
+
+def input_fingerprint(product):
+    return hashlib.sha1(json.dumps(product, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class Checkpoint:
+    """Handles already uploaded, with the fingerprint of the input they were uploaded with"""
+    def __init__(self, path=CHECKPOINT_FILE, store=''):
+        self.path = path
+        self.store = store
+        self.done = {}
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as fh:
+                data = json.load(fh)
+            if data.get('version') == CHECKPOINT_VERSION and data.get('store') == store:
+                self.done = data.get('done', {})
+
+    def is_done(self, product):
+        return self.done.get(product['handle']) == input_fingerprint(product)
+
+    def mark(self, products):
+        for product in products:
+            self.done[product['handle']] = input_fingerprint(product)
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump({'version': CHECKPOINT_VERSION, 'store': self.store, 'done': self.done}, fh)
+        os.replace(tmp_path, self.path)
+
+
+# --- Upload modes -------------------------------------------------------------------------
+
+PRODUCT_SET_FIELDS = "product { id handle } userErrors { field message }"
+
+def product_set_batch_query(count):
+    params = ', '.join(f"$p{idx}: ProductSetInput!" for idx in range(count))
+    calls = '\n'.join(f"  p{idx}: productSet(input: $p{idx}, synchronous: true) {{ {PRODUCT_SET_FIELDS} }}"
+                      for idx in range(count))
+    return f"mutation productSetBatch({params}) {{\n{calls}\n}}"
+
+
+def status_update(product):
+    return 'variants' not in product
+
+
+PRODUCT_LOOKUP_FIELDS = "id handle"
+PRODUCT_UPDATE_FIELDS = PRODUCT_SET_FIELDS
+
+
+def product_lookup_query(count):
+    params = ', '.join(f"$p{idx}: ProductIdentifierInput!" for idx in range(count))
+    calls = '\n'.join(f"  p{idx}: productByIdentifier(identifier: $p{idx}) {{ {PRODUCT_LOOKUP_FIELDS} }}"
+                      for idx in range(count))
+    return f"query productLookup({params}) {{\n{calls}\n}}"
+
+
+def product_update_batch_query(count):
+    params = ', '.join(f"$p{idx}: ProductUpdateInput!" for idx in range(count))
+    calls = '\n'.join(f"  p{idx}: productUpdate(product: $p{idx}) {{ {PRODUCT_UPDATE_FIELDS} }}"
+                      for idx in range(count))
+    return f"mutation productUpdateBatch({params}) {{\n{calls}\n}}"
+
+
+async def _set_products(client, batch, cost_per_product):
+    """productSet outcomes of the batch, in order (None where the alias came back empty)"""
+    data, cost = await client.graphql(
+        product_set_batch_query(len(batch)), {f"p{idx}": product for idx, product in enumerate(batch)},
+        cost=int(cost_per_product[0] * len(batch)) + 1)
+    if cost:
+        cost_per_product[0] = max(1, (cost['requestedQueryCost'] - 1) / len(batch))
+    return [data.get(f"p{idx}") for idx in range(len(batch))]
+
+
+async def _update_statuses(client, batch, cost_per_product):
+    """productUpdate outcomes of a batch of status-only inputs, looked up by handle first"""
+    data, _ = await client.graphql(
+        product_lookup_query(len(batch)), {f"p{idx}": {'handle': product['handle']}
+                                           for idx, product in enumerate(batch)}, cost=len(batch) + 1)
+    found = [(idx, data[f"p{idx}"]['id']) for idx in range(len(batch)) if data.get(f"p{idx}")]
+    # A product the store does not have is already as unpublished as it gets
+    outcomes = [{'product': None, 'userErrors': []}] * len(batch)
+    if found:
+        updates = {f"p{n}": {'id': product_id, 'status': batch[idx]['status']}
+                   for n, (idx, product_id) in enumerate(found)}
+        data, _ = await client.graphql(product_update_batch_query(len(found)), updates,
+                                       cost=PRODUCT_SET_COST * len(found) + 1)
+        for n, (idx, _) in enumerate(found):
+            outcomes[idx] = data.get(f"p{n}")
+    return outcomes
+
+
+async def upload_batches(client, batches, checkpoint, concurrency=CONCURRENCY):
+    """Send each batch as one request of aliased productSet mutations; returns (uploaded, failed).
+
+    Batches of status-only inputs (see product_input) go out as productUpdate mutations instead.
+    """
+    queue = asyncio.Queue()
+    for batch in batches:
+        queue.put_nowait(batch)
+    result = {'uploaded': 0, 'failed': []}
+    cost_per_product = [PRODUCT_SET_COST]
+
+    async def worker():
+        while not queue.empty():
+            batch = queue.get_nowait()
+            send = _update_statuses if status_update(batch[0]) else _set_products
+            try:
+                outcomes = await send(client, batch, cost_per_product)
+            except ShopifyError as e:
+                # Retries exhausted or request rejected: this batch fails, the others still go out
+                result['failed'].extend((product['handle'], str(e)) for product in batch)
+                continue
+            succeeded = []
+            for product, outcome in zip(batch, outcomes):
+                if outcome is None:
+                    result['failed'].append((product['handle'], 'No mutation result'))
+                elif outcome['userErrors']:
+                    result['failed'].append((product['handle'], outcome['userErrors']))
+                else:
+                    succeeded.append(product)
+            checkpoint.mark(succeeded)
+            checkpoint.save()
+            result['uploaded'] += len(succeeded)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return result['uploaded'], result['failed']
+
+
+STAGED_UPLOAD = """mutation stagedUploadsCreate($input: [StagedUploadInput!]!) {
+  stagedUploadsCreate(input: $input) {
+    stagedTargets { url resourceUrl parameters { name value } }
+    userErrors { field message }
+  }
+}"""
+
+BULK_RUN = """mutation bulkRun($mutation: String!, $path: String!) {
+  bulkOperationRunMutation(mutation: $mutation, stagedUploadPath: $path) {
+    bulkOperation { id status }
+    userErrors { field message }
+  }
+}"""
+
+BULK_PRODUCT_SET = f"""mutation call($input: ProductSetInput!) {{
+  productSet(input: $input, synchronous: true) {{ {PRODUCT_SET_FIELDS} }}
+}}"""
+
+BULK_STATUS = """query {
+  currentBulkOperation(type: MUTATION) { id status errorCode objectCount url partialDataUrl }
+}"""
+
+
+def _multipart(parameters, filename, content):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for param in parameters:
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{param["name"]}"\r\n\r\n'
+                     f'{param["value"]}\r\n'.encode('utf-8'))
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                 f'Content-Type: text/jsonl\r\n\r\n'.encode('utf-8') + content + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode('utf-8'))
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+async def upload_bulk(client, products, checkpoint, poll_interval=1.0):
+    """Run every productSet in one bulk operation; returns (uploaded, failed)"""
+    if not products:
+        return 0, []
+    content = ''.join(json.dumps({'input': product}) + '\n' for product in products).encode('utf-8')
+    data, _ = await client.graphql(STAGED_UPLOAD, {'input': [{
+        'resource': 'BULK_MUTATION_VARIABLES', 'filename': 'products.jsonl', 'mimeType': 'text/jsonl',
+        'httpMethod': 'POST'}]})
+    target = data['stagedUploadsCreate']['stagedTargets'][0]
+    body, content_type = _multipart(target['parameters'], 'products.jsonl', content)
+    status, _, response = await client.http.request('POST', target['url'], body, {'Content-Type': content_type})
+    if status >= 300:
+        raise ShopifyError(f"Staged upload failed with HTTP {status}: {response[:200]!r}")
+    path = next(p['value'] for p in target['parameters'] if p['name'] == 'key')
+
+    data, _ = await client.graphql(BULK_RUN, {'mutation': BULK_PRODUCT_SET, 'path': path})
+    run = data['bulkOperationRunMutation']
+    if run['userErrors']:
+        raise ShopifyError(f"bulkOperationRunMutation: {run['userErrors']}")
+
+    while True:
+        data, _ = await client.graphql(BULK_STATUS)
+        operation = data['currentBulkOperation']
+        if operation['status'] not in ('CREATED', 'RUNNING'):
+            break
+        await asyncio.sleep(poll_interval)
+    result_url = operation.get('url') or operation.get('partialDataUrl')
+    if not result_url:
+        raise ShopifyError(f"Bulk operation {operation['status']} ({operation.get('errorCode')})")
+
+    # One result line per input line, in any order, tagged with __lineNumber
+    _, _, lines = await client.http.request('GET', result_url)
+    succeeded, failed = [], []
+    for line in lines.decode('utf-8').splitlines():
+        if not line.strip():
+            continue
+        outcome = json.loads(line)
+        product = products[outcome['__lineNumber']]
+        result = (outcome.get('data') or {}).get('productSet') or {}
+        errors = result.get('userErrors') or outcome.get('errors')
+        if errors:
+            failed.append((product['handle'], errors))
+        else:
+            succeeded.append(product)
+    checkpoint.mark(succeeded)
+    checkpoint.save()
+    return len(succeeded), failed
+
+
+def _chunks(products, size):
+    return [products[idx:idx + size] for idx in range(0, len(products), size)]
+
+
+async def upload(paths, endpoint, token, mode='batch', batch_size=BATCH_SIZE, concurrency=CONCURRENCY,
+                 checkpoint_path=CHECKPOINT_FILE):
+    """Upload the products of the CSV files that are not checkpointed yet and print the throughput"""
+    checkpoint = Checkpoint(checkpoint_path, store=endpoint)
+    # productSet upserts by handle: rows of one handle must go out as one product
+    rows_by_handle = {}
+    for rows in iter_csv_products(paths):
+        handle = rows[0]['Handle']
+        if handle in rows_by_handle:
+            print(f"  {handle}: rows are not contiguous in the CSV, merged")
+            rows_by_handle[handle].extend(rows)
+        else:
+            rows_by_handle[handle] = rows
+
+    products, skipped = [], 0
+    for rows in rows_by_handle.values():
+        product = product_input(rows)
+        if checkpoint.is_done(product):
+            skipped += 1
+        else:
+            products.append(product)
+    print(f"{len(products)} products to upload, {skipped} already up to date ({mode} mode)")
+
+    http = HttpClient(pool_size=concurrency)
+    client = AdminClient(endpoint, token, http, CostLimiter())
+    start = time.perf_counter()
+    full = [product for product in products if not status_update(product)]
+    # A batch is all productSet or all status-only productUpdate; the latter never go in bulk
+    batches = _chunks([product for product in products if status_update(product)], batch_size)
+    try:
+        if mode == 'bulk':
+            uploaded, failed = await upload_bulk(client, full, checkpoint)
+        else:
+            uploaded, failed = 0, []
+            batches = _chunks(full, batch_size) + batches
+        if batches:
+            updated, update_failed = await upload_batches(client, batches, checkpoint, concurrency)
+            uploaded, failed = uploaded + updated, failed + update_failed
+    finally:
+        http.close()
+    elapsed = time.perf_counter() - start
+
+    for handle, errors in failed:
+        print(f"  {handle}: {errors}")
+    rate = uploaded / elapsed if elapsed else 0.0
+    print(f"Uploaded {uploaded} products ({len(failed)} failed) in {elapsed:.2f}s: {rate:.1f} products/s, "
+          f"{client.requests} requests, {client.throttled} throttled, {http.connections_opened} connections, "
+          f"{client.limiter.waited:.2f}s waiting for cost budget")
+    return {'uploaded': uploaded, 'failed': failed, 'skipped': skipped, 'seconds': elapsed,
+            'products_per_second': rate, 'requests': client.requests, 'throttled': client.throttled}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Upload the generated Shopify CSV through the Admin GraphQL API")
+    parser.add_argument('csv', nargs='*', default=[DEFAULT_CSV], help="Generated CSV files (default: %(default)s)")
+    parser.add_argument('--shop', default=os.environ.get('SHOPIFY_SHOP'), help="e.g. vaonix.myshopify.com")
+    parser.add_argument('--endpoint', help="Base URL instead of https://SHOP (e.g. the mock server)")
+    parser.add_argument('--mode', choices=('batch', 'bulk'), default='batch')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="productSet mutations per request")
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY, help="Requests in flight")
+    parser.add_argument('--checkpoint', default=CHECKPOINT_FILE, help="Resume state file (default: %(default)s)")
+    args = parser.parse_args()
+
+    endpoint = args.endpoint or (f"https://{args.shop}" if args.shop else None)
+    if not endpoint:
+        parser.error("--shop (or SHOPIFY_SHOP) or --endpoint is required")
+    token = os.environ.get('SHOPIFY_ADMIN_TOKEN')
+    if not token:
+        parser.error("SHOPIFY_ADMIN_TOKEN is not set (any value works with the mock server)")
+    paths = [part for path in args.csv for part in csv_parts(path)]
+    if not paths:
+        parser.error(f"No CSV found for {args.csv}")
+    asyncio.run(upload(paths, endpoint, token, args.mode, args.batch_size, args.concurrency, args.checkpoint))
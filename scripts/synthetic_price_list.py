@@ -0,0 +1,167 @@
+import argparse
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+# Synthetic supplier price lists for benchmarking generate_shopify_import.py.
+# The sheet has the same layout as 'Liste de prix' (Bom, Description, supplier
+# prices, cheapest price in column 9 ...) and a realistic BOM mix: DAC/AOC lengths,
+# -I/-E temperature grades, DWDM -Cxx channels, CWDM wavelengths and -HP / HW rows
+# that the generator filters out.
+# The xlsx is written directly as XML (inline strings) so 1M rows take seconds.
+
+SHEET_NAME = 'Liste de prix'
+HEADER = ['Bom', 'Description', 'Moduletek', 'Linktel', 'Do networks ', 'HGGenuine', 'Estel', 'Olink',
+          'Prix fournisseur le moins chère', 'Fournisseur le moins chère']
+SUPPLIERS = ['Moduletek', 'Linktel', 'Do networks', 'Olink']
+
+FORM_FACTORS = [
+    ('SFP', '1G', 'SFP 1000BASE'),
+    ('SFP', '10G', 'SFP+ 10GBASE'),
+    ('SFP', '25G', 'SFP28 25GBASE'),
+    ('QSFP', '40G', 'QSFP+ 40GBASE'),
+    ('QSFP28', '100G', 'QSFP28 100GBASE'),
+    ('QSFP-DD', '400G', 'QSFP-DD 400GBASE'),
+]
+REACHES = ['SR', 'LR', 'ER', 'ZR', 'LX', 'SX', 'BX-U', 'BX-D']
+LENGTHS = ['0-5', '1', '1-5', '2', '3', '5', '7', '10']
+CWDM_WAVES = list(range(1270, 1611, 20))
+DWDM_CHANNELS = list(range(17, 62))
+
+# Relative weight of each family kind in the mix
+FAMILY_MIX = [('temp', 40), ('dac', 15), ('aoc', 10), ('cwdm', 15), ('dwdm', 10), ('filtered', 10)]
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/></Relationships>'
+)
+
+
+def _family_rows(kind, n, rng):
+    form, speed, label = rng.choice(FORM_FACTORS)
+    reach = rng.choice(REACHES)
+    base = f"{form}-{speed}-{reach}{n}"
+    km = rng.choice([2, 10, 20, 40, 80])
+
+    if kind == 'temp':
+        yield base, f"{label}-{reach} 1310nm {km}km Singlemode"
+        for suffix, text in (('-E', '-15/+80°C'), ('-I', '-40/+85°C')):
+            if rng.random() < 0.7:
+                yield base + suffix, f"{label}-{reach} 1310nm {km}km Singlemode {text}"
+    elif kind == 'dac':
+        for length in rng.sample(LENGTHS, rng.randint(2, 6)):
+            yield f"{form}-{speed}-DAC{n}-{length}M", f"{label} Passive Direct Attach Copper Cable {length.replace('-', '.')}m"
+    elif kind == 'aoc':
+        for length in rng.sample(LENGTHS, rng.randint(2, 6)):
+            yield f"AOC-{speed}-{form}{n}-{length}M", f"{label}-AOC {length.replace('-', '.')}m Active Optical Cable"
+    elif kind == 'cwdm':
+        for wave in rng.sample(CWDM_WAVES, rng.randint(4, len(CWDM_WAVES))):
+            suffix = rng.choice(['', '', '', '-I'])
+            yield f"{form}-{speed}-CWDM{n}-{wave}{suffix}", f"{label} CWDM {wave}nm {km}km"
+    elif kind == 'dwdm':
+        for channel in rng.sample(DWDM_CHANNELS, rng.randint(4, 20)):
+            yield f"{form}-{speed}-ZR-DWDM{n}-C{channel}", f"{label} DWDM C{channel} {km}km"
+    else:
+        if rng.random() < 0.5:
+            yield base + '-HP', f"{label}-{reach} HP compatible"
+        else:
+            yield base + ' HW', f"{label}-{reach} HW compatible"
+
+
+def iter_synthetic_rows(rows, seed=0):
+    """Yield `rows` price-list rows: (bom, description, supplier prices..., cheapest, supplier)"""
+    rng = random.Random(seed)
+    kinds = [kind for kind, _ in FAMILY_MIX]
+    weights = [weight for _, weight in FAMILY_MIX]
+    emitted = 0
+    n = 0
+    while emitted < rows:
+        n += 1
+        kind = rng.choices(kinds, weights)[0]
+        for bom, description in _family_rows(kind, n, rng):
+            prices = [round(rng.uniform(2, 900), 2) if rng.random() < 0.7 else None for _ in range(6)]
+            offered = [p for p in prices if p is not None] or [round(rng.uniform(2, 900), 2)]
+            cheapest = min(offered)
+            # A few suppliers quote prices as text
+            cheapest_cell = f"{cheapest:.2f} €" if rng.random() < 0.02 else cheapest
+            yield [bom, description] + prices + [cheapest_cell, rng.choice(SUPPLIERS)]
+            emitted += 1
+            if emitted == rows:
+                return
+
+
+def _column_letter(idx):
+    letters = ''
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _row_xml(row_num, values):
+    cells = []
+    for col, value in enumerate(values, start=1):
+        if value is None:
+            continue
+        ref = f"{_column_letter(col)}{row_num}"
+        if isinstance(value, str):
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t>{escape(value)}</t></is></c>')
+        else:
+            cells.append(f'<c r="{ref}"><v>{value!r}</v></c>')
+    return f'<row r="{row_num}">{"".join(cells)}</row>'
+
+
+def write_price_list(path, rows, seed=0):
+    """Write a synthetic price list with a header and `rows` data rows"""
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        zf.writestr('_rels/.rels', _ROOT_RELS)
+        zf.writestr('xl/workbook.xml', _WORKBOOK.format(name=escape(SHEET_NAME)))
+        zf.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        with zf.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as fh:
+            fh.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                     b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                     b'<sheetData>')
+            fh.write(_row_xml(1, HEADER).encode('utf-8'))
+            for row_num, values in enumerate(iter_synthetic_rows(rows, seed), start=2):
+                fh.write(_row_xml(row_num, values).encode('utf-8'))
+            fh.write(b'</sheetData></worksheet>')
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic Vaonix price list")
+    parser.add_argument('rows', type=int, help="Number of data rows")
+    parser.add_argument('--out', help="Output .xlsx (default: synthetic-<rows>.xlsx)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    out = args.out or f"synthetic-{args.rows}.xlsx"
+    write_price_list(out, args.rows, args.seed)
+    print(f"Saved {args.rows} rows to {out}")
@@ -0,0 +1,101 @@
+import os
+
+import pytest
+
+import generate_shopify_import as legacy
+from bom_classifier import BomClassifier
+from workbook_readers import cell, iter_sheet_rows
+
+PRICE_LIST = os.path.join(os.path.dirname(__file__), '..', legacy.INPUT_FILE)
+
+SAMPLE_ROWS = [
+    ('SFP-1G-SX', 'SFP 1000BASE-SX 850nm 550m Multimode'),
+    ('SFP-1G-SX-I', 'SFP 1000BASE-SX 850nm 550m Multimode -40/+85°C'),
+    ('SFP-1G-SX-e', 'SFP 1000BASE-SX 850 550m Multimode -15/+80°C'),
+    ('SFP-10G-ZR-DWDM-C17', 'SFP+ 10G DWDM 80km'),
+    ('SFP-10G-ZR-DWDM-C17-C34', 'SFP+ 10G DWDM 80km'),
+    ('XFP-10G-DWDM-C61X', 'XFP 10G Tunable DWDM'),
+    ('SFP-10G-CWDM-1470', 'SFP+ 10G CWDM 1470nm 40km'),
+    ('SFP-10G-CWDM-1610NM-I', 'SFP+ 10G CWDM 1610nm 40km Industrial'),
+    ('SFP-1G-CWDM-1650', 'SFP CWDM out of grid'),
+    ('QSFP28-100G-DAC-1-5M', '100G QSFP28 Passive Direct Attach Copper Cable'),
+    ('SFP-10G-DAC-3M-AWG30', '10G SFP+ Passive DAC Cable'),
+    ('QSFP-40G-AOC-10M', '40G QSFP+ Active Optical Cable'),
+    ('QSFP-40G-AOC-10M', '40G QSFP+ Active Optical'),
+    ('SFP-25G-DAC', '25G SFP28 Cable without length'),
+    ('QSFP-DD-400G-FR4', '400G QSFP-DD FR4 1310nm 2km'),
+    ('SFP-10G-BIDI-20-U', 'SFP+ 10G BiDi 20km'),
+    ('SFP-10G-LR-HP', 'HP compatible'),
+    ('SFP-10G-LR HW', 'Huawei compatible'),
+    ('SFP-10G-LR', 'SFP+ 10G LR HW compatible'),
+    ('-I', 'Empty base'),
+    ('-3M', 'Empty base cable DAC'),
+    ('SFP-10G-SR--X', 'Double dash handle'),
+]
+
+
+def _sheet_rows():
+    if not os.path.exists(PRICE_LIST):
+        return []
+    rows = []
+    for values in iter_sheet_rows(PRICE_LIST, legacy.SHEET_NAME, min_row=2, reader='xml'):
+        bom, description = cell(values, 1), cell(values, 2)
+        if bom and description:
+            rows.append((str(bom), description))
+    return rows
+
+
+ROWS = SAMPLE_ROWS + _sheet_rows()
+
+
+@pytest.fixture(scope='module')
+def classifier():
+    return BomClassifier(cache_size=128)
+
+
+@pytest.mark.parametrize('bom,description', ROWS)
+def test_helpers_parity(classifier, bom, description):
+    assert classifier.temp_variant(bom) == legacy.check_temp_variant(bom)
+    assert classifier.dwdm_variant(bom) == legacy.check_dwdm_variant(bom)
+    assert classifier.cwdm_variant(bom) == legacy.check_cwdm_variant(bom)
+    assert classifier.dac_length(bom) == legacy.parse_dac_length(bom)
+    assert classifier.categorize(bom, description) == legacy.categorize_product(bom, description)
+
+
+@pytest.mark.parametrize('bom,description', ROWS)
+def test_classify_matches_legacy_chain(classifier, bom, description):
+    info = classifier.classify(bom, description)
+    bom_u, desc_u = bom.upper(), str(description).upper()
+
+    assert info.skip == ('-HP' in bom_u or ' HW' in bom_u or ' HW' in desc_u)
+    if info.skip:
+        return
+
+    assert (info.product_type, info.tags) == legacy.categorize_product(bom, description)
+
+    is_cable = 'DAC' in bom_u or ('AOC' in bom_u and 'CABLE' in desc_u)
+    if is_cable:
+        expected = legacy.parse_dac_length(bom)
+        group_type = 'length' if expected[0] else None
+    else:
+        checks = [
+            ('wavelength', legacy.check_cwdm_variant(bom)),
+            ('channel', legacy.check_dwdm_variant(bom)),
+            ('temp', legacy.check_temp_variant(bom)),
+        ]
+        group_type, expected = next(((t, r) for t, r in checks if r[0]), (None, None))
+
+    assert info.group_type == group_type
+    if group_type:
+        assert (info.base, info.option_value, info.sort) == expected
+    else:
+        assert info.is_base == (not is_cable)
+
+
+def test_classify_is_memoized():
+    classifier = BomClassifier(cache_size=2)
+    first = classifier.classify('SFP-1G-SX-I', 'desc')
+    assert classifier.classify('SFP-1G-SX-I', 'desc') is first
+    classifier.classify('A', 'desc')
+    classifier.classify('B', 'desc')
+    assert classifier.cache_info().currsize == 2
@@ -0,0 +1,122 @@
+import datetime
+
+import pytest
+
+import catalog_cache
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+
+@pytest.fixture
+def sheet(tmp_path, monkeypatch):
+    """Serve rows from a list instead of Excel; returns (workbook path, rows, reads)"""
+    workbook = tmp_path / 'prices.xlsx'
+    workbook.write_bytes(b'workbook')
+    rows, reads = [], []
+
+    def iter_sheet_rows(path, sheet_name, min_row=1, reader=None):
+        reads.append(sheet_name)
+        return iter(rows)
+    monkeypatch.setattr(catalog_cache, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(catalog_cache, 'BATCH_SIZE', 2)
+    monkeypatch.setattr(catalog_cache, 'iter_sheet_rows', iter_sheet_rows)
+    return str(workbook), rows, reads
+
+
+def _padded(rows):
+    width = max((len(row) for row in rows), default=0)
+    return [tuple(row) + (None,) * (width - len(row)) for row in rows]
+
+
+def _entry(path, reader=catalog_cache.DEFAULT_READER):
+    return catalog_cache._entry_paths(path, catalog_cache._sheet_entry('Sheet', reader))
+
+
+def _meta(path):
+    return catalog_cache._load_valid_meta(path, _entry(path)[2])
+
+
+def test_typed_batches_are_written_in_one_pass(sheet):
+    path, rows, reads = sheet
+    day = datetime.datetime(2025, 2, 27, 9, 30)
+    rows.extend([('SFP-1G-SX', 10.0, 1, day, True), ('SFP-10G-LR', None, 2, day, False), ('QSFP28', 40.5, None)])
+    assert catalog_cache.read_rows(path, 'Sheet') == _padded(rows)
+    assert reads == ['Sheet']
+    assert _meta(path)['encodings'] == ['str', 'float', 'int', 'datetime', 'bool']
+    parquet_path = _entry(path)[1]
+    assert pq.ParquetFile(parquet_path).metadata.num_row_groups == 2
+    # Warm read from the cache
+    assert catalog_cache.read_rows(path, 'Sheet', min_row=2) == _padded(rows)[1:]
+    assert reads == ['Sheet']
+
+
+def test_later_batches_that_do_not_fit_widen_the_schema(sheet):
+    path, rows, reads = sheet
+    rows.extend([('Bom', 1), ('SFP-1G-SX', 2), ('SFP-10G-LR', 'n/a'), ('QSFP28', 2 ** 70, None, 'new column'),
+                 (None, 3)])
+    assert catalog_cache.read_rows(path, 'Sheet') == _padded(rows)
+    assert reads == ['Sheet', 'Sheet']
+    assert _meta(path)['encodings'] == ['str', 'json', 'json', 'json']
+
+
+@pytest.mark.parametrize('rows', [[], [(), ()]])
+def test_empty_and_zero_width_sheets_keep_their_row_count(sheet, rows):
+    path, sheet_rows, _ = sheet
+    sheet_rows.extend(rows)
+    assert catalog_cache.read_rows(path, 'Sheet') == rows
+    assert _meta(path)['rows'] == len(rows)
+
+
+def test_mixed_columns_keep_their_python_types(sheet):
+    path, rows, _ = sheet
+    rows.extend([('Date', 'Heure', 'Délai', 'Prix'),
+                 (datetime.datetime(2025, 2, 27), datetime.time(9, 30), datetime.timedelta(days=2, hours=3), 1.5),
+                 (datetime.date(2025, 3, 1), 'sur devis', None, 2),
+                 (None, datetime.time(0, 0, 1, 500), datetime.timedelta(microseconds=-1), True)])
+    assert catalog_cache.read_rows(path, 'Sheet') == rows
+    assert [[type(v) for v in row] for row in catalog_cache.read_rows(path, 'Sheet')] == [
+        [type(v) for v in row] for row in rows]
+    assert _meta(path)['encodings'] == ['json'] * 4
+
+
+@pytest.mark.parametrize('reader', ['xml', 'openpyxl'])
+def test_cold_and_warm_reads_of_a_workbook_match(tmp_path, monkeypatch, reader):
+    openpyxl = pytest.importorskip('openpyxl')
+    monkeypatch.setattr(catalog_cache, 'CACHE_DIR', str(tmp_path / 'cache'))
+    path = str(tmp_path / 'prices.xlsx')
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Prices'
+    ws.append(['Bom', 'Date', 'Time', 'Price'])
+    ws.append(['SFP-1G-SX', datetime.datetime(2025, 2, 27, 14, 5), datetime.time(9, 30), 11.5])
+    ws.append(['SFP-10G-LR', datetime.datetime(2024, 12, 31), datetime.time(18, 0), 'sur devis'])
+    ws['B2'].number_format = ws['B3'].number_format = 'yyyy-mm-dd hh:mm'
+    ws['C2'].number_format = ws['C3'].number_format = 'h:mm'
+    wb.save(path)
+
+    cold = catalog_cache.read_rows(path, 'Prices', reader=reader, use_cache=False)
+    assert isinstance(cold[1][1], datetime.datetime) and isinstance(cold[1][2], datetime.time)
+    assert catalog_cache.read_rows(path, 'Prices', reader=reader) == cold
+    assert catalog_cache.read_rows(path, 'Prices', reader=reader) == cold
+
+
+def test_each_reader_has_its_own_entry(sheet, monkeypatch):
+    path, rows, reads = sheet
+    rows.append(('SFP-1G-SX', 10.0))
+    by_reader = {'openpyxl': [('SFP-1G-SX', 10.0)], 'xml': [('SFP-1G-SX', 'ten')]}
+    monkeypatch.setattr(catalog_cache, 'iter_sheet_rows',
+                        lambda path, sheet_name, min_row=1, reader=None: reads.append(reader) or iter(by_reader[reader]))
+    for reader in ('openpyxl', 'xml', 'openpyxl', 'xml'):
+        assert catalog_cache.read_rows(path, 'Sheet', reader=reader) == by_reader[reader]
+    assert reads == ['openpyxl', 'xml']
+    assert _meta(path)['reader'] == 'openpyxl'
+
+
+def test_a_truncated_meta_file_is_a_cache_miss(sheet):
+    path, rows, reads = sheet
+    rows.append(('SFP-1G-SX', 10.0))
+    catalog_cache.read_rows(path, 'Sheet')
+    with open(_entry(path)[2], 'w', encoding='utf-8') as fh:
+        fh.write('{"version": 3, "si')
+    assert catalog_cache.read_rows(path, 'Sheet') == rows
+    assert reads == ['Sheet', 'Sheet']
@@ -0,0 +1,90 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import generate_shopify_import as gen
+from bom_classifier import BomClassifier
+from catalog_dedup import CatalogCheck, CatalogCollisionError, bom_fingerprint
+
+ENTRIES = [
+    ('SFP-1G-SX', 'SFP 1000BASE-SX 850nm 550m Multimode', 10.0),
+    ('SFP-1G-SX-I', 'SFP 1000BASE-SX 850nm 550m Multimode -40/+85°C', 12.0),
+    ('SFP-10G-LR', 'SFP+ 10GBASE-LR 1310nm 10km Singlemode', 20.0),
+    ('sfp-10g-lr', 'SFP+ 10GBASE-LR 1310nm 10km Singlemode', 20.0),
+    ('XFP-10G-CWDM-XX-100km-I', 'XFP 10GBASE-CWDM 1470nm 100km Singlemode -40/+85°C', 30.0),
+    ('XFP-10G-CWDM-XX-100km-I', 'XFP 10GBASE-CWDM 1490nm 100km Singlemode -40/+85°C', 31.0),
+    ('QSFP28 100G LR4', 'QSFP28 100GBASE-LR4 1310nm 10km Singlemode', 200.0),
+    ('QSFP28-100G-LR4', 'QSFP28 100GBASE-LR4 1310nm 10km Singlemode', 210.0),
+    ('QSFP-100G-SR4-1310', 'QSFP28 100GBASE-SR4', 90.0),
+    ('QSFP-100G-1310NM-SR4', 'QSFP28 100GBASE-SR4', 90.0),
+]
+
+
+def _run(policy):
+    check = CatalogCheck(policy)
+    entries, missing = check.run(ENTRIES, BomClassifier(), gen.MISSING_PRODUCTS)
+    return check, entries, missing
+
+
+def test_fingerprint_ignores_order_separators_and_units():
+    assert bom_fingerprint('SFP-10G-LR 1310nm') == bom_fingerprint('sfp 1310 LR 10G')
+    assert bom_fingerprint('SFP28-25G') == bom_fingerprint('SFP 28 25G')
+    assert bom_fingerprint('SFP-10G-LR') != bom_fingerprint('SFP-10G-ER')
+
+
+def test_report_lists_findings_and_keeps_rows():
+    check, entries, missing = _run('report')
+    assert entries == ENTRIES and missing == gen.MISSING_PRODUCTS
+    assert check.counts() == {'duplicate_row': 1, 'conflicting_bom': 1, 'handle_collision': 1,
+                              'duplicate_option': 2, 'near_duplicate': 1, 'injected_duplicate': 1}
+    assert {f.key for f in check.findings if f.kind == 'duplicate_option'} == {
+        'xfp-10g-cwdm-xx-100km / Industrial (-40/+85°C)', 'qsfp28-100g-lr4 / Default Title'}
+    assert all(f.action == 'kept' for f in check.findings)
+
+
+def test_resolve_keeps_first_occurrence():
+    check, entries, missing = _run('resolve')
+    boms = [bom for bom, _, _ in entries]
+    assert boms == ['SFP-1G-SX', 'SFP-1G-SX-I', 'SFP-10G-LR', 'XFP-10G-CWDM-XX-100km-I', 'QSFP28 100G LR4',
+                    'QSFP-100G-SR4-1310', 'QSFP-100G-1310NM-SR4']
+    assert [m['Bom'] for m in missing] == ['QSFP-DD-400G-FR4', 'QSFP-DD-400G-DR4', 'QSFP-DD-400G-SR8']
+    handles = [(row['Handle'], row['Option1 Value']) for row in gen.group_rows(entries, BomClassifier())]
+    assert len(handles) == len(set(handles))
+
+
+def test_fail_raises_before_writing():
+    with pytest.raises(CatalogCollisionError, match='duplicate_row'):
+        _run('fail')
+    # Near-duplicates alone are only warnings
+    entries = [ENTRIES[-2], ENTRIES[-1]]
+    check = CatalogCheck('fail')
+    assert check.run(entries, BomClassifier()) == (entries, [])
+    assert check.counts() == {'near_duplicate': 1}
+
+
+def test_dedup_does_not_import_the_generator():
+    # The generator imports catalog_dedup; the reverse would load a second copy of the script under __main__
+    code = "import sys, catalog_dedup; assert 'generate_shopify_import' not in sys.modules"
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+
+def _main_csv(monkeypatch, tmp_path, engine, policy):
+    path = str(tmp_path / f'{engine}.csv')
+    monkeypatch.setattr(gen, 'read_price_list', lambda *args, **kwargs: iter(ENTRIES))
+    monkeypatch.setattr(gen, 'OUTPUT_FILE', path)
+    report = gen.main(engine=engine, collisions=policy)
+    with open(path, 'rb') as fh:
+        return fh.read(), report.counts['collisions']
+
+
+@pytest.mark.parametrize('policy', ['report', 'resolve'])
+def test_pandas_engine_dedups_on_its_own_classification(monkeypatch, tmp_path, policy):
+    pytest.importorskip('pandas')
+    expected = _main_csv(monkeypatch, tmp_path, 'python', policy)
+
+    def per_row(self, bom, description):
+        raise AssertionError(f"BomClassifier.classify called on {bom} in the pandas engine")
+    monkeypatch.setattr(BomClassifier, '_classify', per_row)
+    assert _main_csv(monkeypatch, tmp_path, 'pandas', policy) == expected
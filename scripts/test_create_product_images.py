@@ -0,0 +1,144 @@
+import copy
+import os
+
+import pytest
+from PIL import Image, ImageChops
+
+import create_product_images
+from create_product_images import Renderer, create_label_with_logo, load_config, render_products
+
+BASE_SIZE = (1024, 1024)
+
+
+def _baseline(base_img, logo_img, label_config):
+    """The placement before the affine transform: Image.rotate(expand=True) pasted at (left, top)"""
+    base = base_img.copy()
+    w, h = base.size
+    label_w, label_h = int(w * label_config["width"]), int(h * label_config["height"])
+    label = Image.new("RGBA", (label_w, label_h), (255, 255, 255, 255))
+    logo = logo_img.copy()
+    logo.thumbnail((int(label_w * 0.8), int(label_h * 0.8)), Image.Resampling.LANCZOS)
+    label.paste(logo, ((label_w - logo.width) // 2, (label_h - logo.height) // 2), logo)
+    label = label.rotate(label_config["rotation"], expand=True, resample=Image.Resampling.BICUBIC)
+    base.paste(label, (int(w * label_config["left"]), int(h * label_config["top"])), label)
+    return base
+
+
+def _label_mask(img):
+    return img.convert("L").point(lambda v: 255 if v > 128 else 0)
+
+
+def _centroid(mask):
+    x0, y0, x1, y1 = mask.getbbox()
+    pixels = [(x, y) for y in range(y0, y1) for x in range(x0, x1) if mask.getpixel((x, y))]
+    return sum(x for x, _ in pixels) / len(pixels), sum(y for _, y in pixels) / len(pixels)
+
+
+@pytest.fixture
+def images():
+    base = Image.new("RGBA", BASE_SIZE, (0, 0, 0, 255))
+    logo = Image.new("RGBA", (120, 40), (0, 90, 200, 255))
+    return base, logo
+
+
+def test_unskewed_label_lands_where_the_rotated_paste_did(images):
+    label_config = dict(load_config()["products"][0]["label"], skew_x=0)
+    expected = _baseline(*images, label_config)
+    actual = create_label_with_logo(*images, label_config)
+    # rotate(expand=True) rounds its canvas to whole pixels: edges agree within one
+    assert _label_mask(actual).getbbox() == pytest.approx(_label_mask(expected).getbbox(), abs=1)
+    # Only antialiased edge pixels may differ
+    diff = ImageChops.difference(actual.convert("RGB"), expected.convert("RGB")).convert("L")
+    differing = sum(diff.histogram()[65:])
+    label_area = _label_mask(expected).histogram()[255]
+    assert differing < label_area * 0.02
+
+
+def test_skewed_label_keeps_the_rotated_label_centre(images):
+    label_config = load_config()["products"][0]["label"]
+    assert label_config["skew_x"]
+    expected = _centroid(_label_mask(_baseline(*images, label_config)))
+    actual = _centroid(_label_mask(create_label_with_logo(*images, label_config)))
+    assert actual == pytest.approx(expected, abs=1.0)
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    images = tmp_path / 'images'
+    (images / 'products').mkdir(parents=True)
+    Image.new('RGBA', (40, 20), (0, 0, 200, 255)).save(str(images / 'logo.png'))
+    for name in ('a-base.png', 'b-base.png'):
+        Image.new('RGBA', (200, 100), (90, 90, 90, 255)).save(str(images / 'products' / name))
+    label = {'top': 0.2, 'left': 0.3, 'width': 0.4, 'height': 0.2, 'rotation': -10, 'skew_x': 5}
+    config = {'logo': 'logo.png', 'products': [
+        {'name': 'a.png', 'base': 'a-base.png', 'label': label},
+        {'name': 'b.png', 'base': 'b-base.png', 'label': label},
+        {'name': 'c.png', 'base': 'b-base.png', 'label': dict(label, top=0.5)},
+    ]}
+    rendered = []
+    render = Renderer.render
+
+    def counted(self, product, output_paths):
+        rendered.extend(os.path.basename(path) for path in output_paths)
+        return render(self, product, output_paths)
+    monkeypatch.setattr(create_product_images.Renderer, 'render', counted)
+
+    def run(config=config):
+        rendered.clear()
+        render_products(config, str(images), str(tmp_path / 'out'), workers=1,
+                        manifest_path=str(tmp_path / 'manifest.json'))
+        return sorted(rendered)
+    return run, config, images
+
+
+def _read(path):
+    with open(path, 'rb') as fh:
+        return fh.read()
+
+
+def _stamps(out_dir):
+    return {name: os.stat(os.path.join(out_dir, name)).st_mtime_ns for name in os.listdir(out_dir)}
+
+
+def test_a_rebuild_without_changes_writes_nothing(tree, tmp_path):
+    run, _, _ = tree
+    assert run() == ['a.png', 'b.png', 'c.png']
+    before = _stamps(tmp_path / 'out')
+    assert run() == []
+    assert _stamps(tmp_path / 'out') == before
+
+
+def test_a_changed_config_field_rerenders_only_that_output(tree):
+    run, config, _ = tree
+    run()
+    changed = copy.deepcopy(config)
+    changed['products'][2]['label']['rotation'] = 15
+    assert run(changed) == ['c.png']
+    assert run(changed) == []
+
+
+def test_a_changed_base_image_rerenders_only_its_outputs(tree):
+    run, _, images = tree
+    run()
+    Image.new('RGBA', (200, 100), (10, 120, 10, 255)).save(str(images / 'products' / 'a-base.png'))
+    assert run() == ['a.png']
+
+
+def test_a_touched_output_is_rendered_again(tree, tmp_path):
+    run, _, _ = tree
+    run()
+    with open(tmp_path / 'out' / 'b.png', 'ab') as fh:
+        fh.write(b'edited')
+    assert run() == ['b.png']
+
+
+def test_parallel_and_serial_renders_are_identical(tree, tmp_path):
+    _, config, images = tree
+    outputs = {}
+    for workers in (1, 2):
+        out_dir = str(tmp_path / f'out-{workers}')
+        paths = render_products(config, str(images), out_dir, workers=workers,
+                                manifest_path=str(tmp_path / f'manifest-{workers}.json'))
+        assert [os.path.basename(path) for path in paths] == ['a.png', 'b.png', 'c.png']
+        outputs[workers] = [_read(path) for path in paths]
+    assert outputs[1] == outputs[2]
@@ -0,0 +1,73 @@
+import gzip
+import os
+
+import pytest
+
+from csv_stream import ShopifyCsvWriter, write_products
+from shopify_upload import csv_parts
+
+COLUMNS = ('Handle', 'Title', 'Variant Price')
+PRODUCTS = [
+    [{'Handle': 'sfp-1g-sx', 'Title': 'SFP 1G SX', 'Variant Price': 11.5},
+     {'Handle': 'sfp-1g-sx', 'Variant Price': 13.8}],
+    [{'Handle': 'sfp-10g-lr', 'Title': 'SFP+ 10G LR', 'Variant Price': 23.0}],
+    [{'Handle': 'qsfp28-100g-lr4', 'Title': 'QSFP28 100G LR4', 'Variant Price': float('nan')}],
+]
+
+
+def _read(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as fh:
+        return fh.read().splitlines()
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_parts_hold_whole_products_and_appear_on_close(tmp_path, compress):
+    path = str(tmp_path / 'import.csv')
+    with ShopifyCsvWriter(path, COLUMNS, max_rows=2, compress=compress) as writer:
+        for rows in PRODUCTS:
+            writer.write_product(rows)
+        # Nothing is visible under the final names before the writer closes
+        assert not any(os.path.exists(part) for part in writer.paths)
+    ext = '.csv.gz' if compress else '.csv'
+    assert writer.paths == [str(tmp_path / f'import-{n:03d}{ext}') for n in (1, 2)]
+    assert sorted(os.listdir(tmp_path)) == [os.path.basename(part) for part in writer.paths]
+    assert _read(writer.paths[0]) == ['Handle,Title,Variant Price', 'sfp-1g-sx,SFP 1G SX,11.5', 'sfp-1g-sx,,13.8']
+    assert _read(writer.paths[1]) == ['Handle,Title,Variant Price', 'sfp-10g-lr,SFP+ 10G LR,23.0',
+                                      'qsfp28-100g-lr4,QSFP28 100G LR4,']
+
+
+def test_a_shorter_run_removes_the_stale_parts(tmp_path):
+    path = str(tmp_path / 'import.csv')
+    products = [[{'Handle': f'sfp-{idx}', 'Title': f'SFP {idx}', 'Variant Price': idx}] for idx in range(5)]
+    assert len(write_products(products, path, COLUMNS, max_rows=1).paths) == 5
+    writer = write_products(products[:3], path, COLUMNS, max_rows=1)
+    assert sorted(os.listdir(tmp_path)) == ['import-001.csv', 'import-002.csv', 'import-003.csv']
+    assert csv_parts(path) == writer.paths
+    assert _read(writer.paths[2])[1] == 'sfp-2,SFP 2,2'
+
+    # Unsplit again: the parts go, and the other way round
+    write_products(products, path, COLUMNS)
+    assert os.listdir(tmp_path) == ['import.csv']
+    write_products(products, path, COLUMNS, max_rows=3)
+    assert sorted(os.listdir(tmp_path)) == ['import-001.csv', 'import-002.csv']
+
+
+def test_failed_run_keeps_the_previous_output(tmp_path):
+    path = str(tmp_path / 'import.csv')
+    write_products(PRODUCTS[:1], path, COLUMNS)
+    before = _read(path)
+
+    def broken():
+        yield PRODUCTS[1]
+        raise RuntimeError("price list changed mid-run")
+    with pytest.raises(RuntimeError):
+        write_products(broken(), path, COLUMNS)
+    assert _read(path) == before
+    assert os.listdir(tmp_path) == ['import.csv']
+
+
+def test_empty_run_leaves_the_header(tmp_path):
+    path = str(tmp_path / 'import.csv')
+    write_products([], path, COLUMNS)
+    assert _read(path) == ['Handle,Title,Variant Price']
@@ -0,0 +1,36 @@
+import os
+
+import pytest
+from PIL import Image
+
+import fix_logo
+from fix_logo import remove_white_background_batch
+
+
+def _save(path, fmt='PNG'):
+    img = Image.new('RGB', (4, 2), (255, 255, 255))
+    img.putpixel((0, 0), (200, 0, 0))
+    img.save(path, fmt)
+
+
+def test_batch_writes_one_transparent_png_per_image(tmp_path):
+    (tmp_path / 'in').mkdir()
+    _save(str(tmp_path / 'in' / 'vaonix.png'))
+    _save(str(tmp_path / 'in' / 'partner.jpg'), 'JPEG')
+    (tmp_path / 'in' / 'notes.txt').write_text('not an image')
+    assert remove_white_background_batch(str(tmp_path / 'in'), str(tmp_path / 'out'), workers=1) == 2
+    assert sorted(os.listdir(tmp_path / 'out')) == ['partner.png', 'vaonix.png']
+    with Image.open(tmp_path / 'out' / 'vaonix.png') as img:
+        assert (img.getpixel((0, 0)), img.getpixel((1, 1))) == ((200, 0, 0, 255), (255, 255, 255, 0))
+
+
+def test_batch_refuses_images_sharing_an_output_name(tmp_path, capsys):
+    (tmp_path / 'in').mkdir()
+    _save(str(tmp_path / 'in' / 'logo.png'))
+    _save(str(tmp_path / 'in' / 'logo.jpg'), 'JPEG')
+    with pytest.raises(ValueError, match='logo.jpg/logo.png'):
+        remove_white_background_batch(str(tmp_path / 'in'), str(tmp_path / 'out'), workers=1)
+    assert not (tmp_path / 'out').exists()
+    with pytest.raises(SystemExit) as excinfo:
+        fix_logo.cli(['--batch', str(tmp_path / 'in'), str(tmp_path / 'out')])
+    assert excinfo.value.code == 2 and 'sharing an output name' in capsys.readouterr().err
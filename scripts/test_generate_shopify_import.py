@@ -0,0 +1,57 @@
+import pytest
+
+import generate_shopify_import as gen
+from bom_classifier import BomClassifier
+from generate_shopify_import import COLUMNS, VariantRow
+
+
+def _row(**kwargs):
+    fields = dict(handle='sfp-10g-lr', title='SFP-10G-LR', body='SFP+ 10GBASE-LR', product_type='Optical Transceiver',
+                  tags='Transceiver, SFP+, 10G', option_name='Title', option_value='Default Title', price=23.0)
+    fields.update(kwargs)
+    return VariantRow(**fields)
+
+
+def test_variant_row_reads_and_writes_like_a_dict():
+    row = _row()
+    assert row['Handle'] == 'sfp-10g-lr' and row['Variant Price'] == 23.0
+    assert row['Vendor'] == gen.VENDOR_NAME and row['Published'] == 'TRUE' and row['Image Src'] == ''
+    row['Image Src'] = 'http://127.0.0.1:8765/render/sfp.png?bom=SFP-10G-LR'
+    row['Variant Price'] = 25.0
+    assert (row.image_src, row.price) == ('http://127.0.0.1:8765/render/sfp.png?bom=SFP-10G-LR', 25.0)
+    assert row.get('Title') == 'SFP-10G-LR'
+    assert row.get('_sort') is None and row.get('_sort', 'missing') == 'missing'
+    with pytest.raises(KeyError):
+        row['_sort']
+
+
+def test_cells_follow_the_requested_column_order():
+    row = _row()
+    row['Image Src'] = 'sfp.png'
+    assert row.cells(tuple(COLUMNS)) == tuple(row[column] for column in COLUMNS)
+    assert row.cells(('Variant Price', 'Handle')) == (23.0, 'sfp-10g-lr')
+    # The getter is cached per column tuple, not per row
+    assert _row(price=9.0).cells(('Variant Price', 'Handle')) == (9.0, 'sfp-10g-lr')
+
+
+def test_setting_a_shared_column_only_changes_that_row():
+    first, second = _row(), _row(handle='sfp-1g-sx')
+    first['Variant Compare At Price'] = 30.0
+    first['Vendor'] = 'Other'
+    assert (first['Vendor'], first['Variant Compare At Price']) == ('Other', 30.0)
+    assert first.get('Vendor') == 'Other' and first.cells(('Vendor', 'Handle')) == ('Other', 'sfp-10g-lr')
+    assert (second['Vendor'], second['Variant Compare At Price']) == (gen.VENDOR_NAME, '')
+    assert VariantRow.vendor == gen.VENDOR_NAME and VariantRow.compare_at_price == ''
+
+
+def test_a_cable_base_without_length_goes_after_the_lengths():
+    pytest.importorskip('pandas')
+    import pandas_engine
+    description = '100G QSFP28 Passive Direct Attach Copper Cable'
+    entries = [('QSFP28-100G-DAC-3M', description, 45.0), ('QSFP28-100G-DAC', description, 35.0),
+               ('QSFP28-100G-DAC-1M', description, 40.0)]
+    rows = gen.group_rows(entries, BomClassifier())
+    assert [(row['Handle'], row['Option1 Value']) for row in rows] == [
+        ('qsfp28-100g-dac', '1m'), ('qsfp28-100g-dac', '3m'), ('qsfp28-100g-dac', 'Standard')]
+    frame = pandas_engine.build_frame(entries, missing_products=[])
+    assert [row.cells(tuple(COLUMNS)) for row in rows] == list(frame.itertuples(index=False, name=None))
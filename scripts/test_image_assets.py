@@ -0,0 +1,92 @@
+import json
+import os
+
+from PIL import Image
+
+import image_assets
+from image_assets import build_assets, pack_shelves
+
+
+def _save(path, size, color, fmt='PNG'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.new('RGB', size, color).save(path, fmt)
+
+
+def _public_tree(root):
+    images = root / 'public' / 'images'
+    _save(str(images / 'products' / 'a.png'), (800, 400), (200, 0, 0))
+    _save(str(images / 'products' / 'b.png'), (800, 400), (200, 0, 0))
+    _save(str(images / 'products' / 'c.png'), (100, 300), (0, 0, 200), 'JPEG')
+    _save(str(images / 'logo.png'), (50, 20), (0, 200, 0))
+    _save(str(images / 'derived' / 'a-320.png'), (320, 160), (200, 0, 0))
+    (root / 'src' / 'config').mkdir(parents=True)
+
+
+def test_pack_shelves_places_boxes_without_overlap():
+    sizes = [(300, 200), (100, 100), (384, 248), (50, 384), (384, 384)]
+    positions, (sheet_w, sheet_h) = pack_shelves(sizes, padding=2)
+    boxes = [(x - 2, y - 2, x + w + 2, y + h + 2) for (x, y), (w, h) in zip(positions, sizes)]
+    assert all(0 <= x0 and 0 <= y0 and x1 <= sheet_w and y1 <= sheet_h for x0, y0, x1, y1 in boxes)
+    for i, a in enumerate(boxes):
+        for b in boxes[i + 1:]:
+            assert a[2] <= b[0] or b[2] <= a[0] or a[3] <= b[1] or b[3] <= a[1]
+
+
+def test_duplicates_share_one_hashed_copy_and_one_cell(tmp_path, monkeypatch):
+    _public_tree(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    manifest = build_assets()
+
+    files = manifest['files']
+    assert '/images/derived/a-320.png' not in files
+    assert files['/images/products/a.png'] == files['/images/products/b.png']
+    assert files['/images/products/a.png'].startswith('/assets/images/a.')
+    # JPEG data saved as .png keeps its real extension
+    assert files['/images/products/c.png'].endswith('.jpg')
+    assert manifest['duplicates'] == {files['/images/products/a.png']: ['/images/products/a.png',
+                                                                       '/images/products/b.png']}
+    assert sorted(os.listdir('public/assets/images')) == sorted(
+        [os.path.basename(target) for target in set(files.values())]
+        + [os.path.basename(manifest['sheets']['products']['src'])])
+
+    sprites = manifest['sprites']
+    assert set(sprites) == {'/images/products/a.png', '/images/products/b.png', '/images/products/c.png'}
+    assert sprites['/images/products/a.png'] == sprites['/images/products/b.png']
+    assert (sprites['/images/products/a.png']['width'], sprites['/images/products/a.png']['height']) == (384, 192)
+    with open('src/config/asset-manifest.json', encoding='utf-8') as fh:
+        assert json.load(fh) == manifest
+
+
+def test_sprite_cells_hold_the_thumbnails(tmp_path, monkeypatch):
+    _public_tree(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    manifest = build_assets()
+    sheet = manifest['sheets']['products']
+    with Image.open(os.path.join('public', sheet['src'].lstrip('/'))) as img:
+        img = img.convert('RGB')
+        for url, color in (('/images/products/a.png', (200, 0, 0)), ('/images/products/c.png', (0, 0, 200))):
+            cell = manifest['sprites'][url]
+            center = img.getpixel((cell['x'] + cell['width'] // 2, cell['y'] + cell['height'] // 2))
+            assert all(abs(got - want) <= 8 for got, want in zip(center, color))
+
+    # Unchanged images: the sheet is reused, a changed one is re-packed and the old sheet pruned
+    assert build_assets()['sheets']['products'] == sheet
+    _save(os.path.join(image_assets.IMAGES_DIR, 'products', 'c.png'), (100, 300), (0, 200, 200), 'JPEG')
+    repacked = build_assets()['sheets']['products']
+    assert repacked['src'] != sheet['src']
+    assert not os.path.exists(os.path.join('public', sheet['src'].lstrip('/')))
+
+
+def test_prune_only_removes_files_of_the_previous_manifest(tmp_path, monkeypatch):
+    _public_tree(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(image_assets.OUTPUT_DIR)
+    unrelated = os.path.join(image_assets.OUTPUT_DIR, 'hero.jpg')
+    with open(unrelated, 'wb') as fh:
+        fh.write(b'uploaded by hand')
+    stale = build_assets()['files']['/images/logo.png']
+
+    _save(os.path.join(image_assets.IMAGES_DIR, 'logo.png'), (50, 20), (0, 0, 0))
+    build_assets()
+    assert not os.path.exists(os.path.join('public', stale.lstrip('/')))
+    assert os.path.exists(unrelated)
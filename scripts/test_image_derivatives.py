@@ -0,0 +1,56 @@
+import os
+
+from PIL import Image
+
+from image_derivatives import FORMATS, OUTPUT_DIR, SOURCE_DIRS, build_derivatives
+
+PRODUCTS, CATEGORIES = SOURCE_DIRS
+
+
+def _save(path, size, color):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.new('RGB', size, color).save(path, 'PNG')
+
+
+def _srcs(entry):
+    return [variant['src'] for variants in entry['formats'].values() for variant in variants]
+
+
+def _tree(root, monkeypatch):
+    monkeypatch.chdir(root)
+    (root / 'src' / 'config').mkdir(parents=True)
+    _save(os.path.join(PRODUCTS, 'sfp.png'), (400, 200), (200, 0, 0))
+    _save(os.path.join(CATEGORIES, 'sfp.png'), (400, 200), (0, 0, 200))
+    _save(os.path.join(CATEGORIES, 'qsfp.png'), (400, 200), (0, 200, 0))
+
+
+def test_same_file_names_in_different_directories_do_not_collide(tmp_path, monkeypatch):
+    _tree(tmp_path, monkeypatch)
+    manifest = build_derivatives(workers=1)
+    product, category = _srcs(manifest['/images/products/sfp.png']), _srcs(manifest['/images/categories/sfp.png'])
+    assert len(product) == len(category) == 2 * len(FORMATS)
+    assert not set(product) & set(category)
+    assert sorted(os.listdir(OUTPUT_DIR)) == sorted(os.path.basename(src) for entry in manifest.values()
+                                                    for src in _srcs(entry))
+
+
+def test_removed_and_changed_sources_lose_their_derivatives(tmp_path, monkeypatch):
+    _tree(tmp_path, monkeypatch)
+    first = build_derivatives(workers=1)
+    os.remove(os.path.join(CATEGORIES, 'qsfp.png'))
+    _save(os.path.join(PRODUCTS, 'sfp.png'), (400, 200), (200, 200, 0))
+
+    manifest = build_derivatives(workers=1)
+    assert '/images/categories/qsfp.png' not in manifest
+    assert manifest['/images/categories/sfp.png'] == first['/images/categories/sfp.png']
+    gone = _srcs(first['/images/categories/qsfp.png']) + _srcs(first['/images/products/sfp.png'])
+    assert not any(os.path.exists(os.path.join('public', src.lstrip('/'))) for src in gone)
+
+
+def test_sources_outside_the_scanned_directories_are_kept(tmp_path, monkeypatch):
+    _tree(tmp_path, monkeypatch)
+    first = build_derivatives(workers=1)
+    manifest = build_derivatives([PRODUCTS], workers=1)
+    assert manifest == first
+    assert all(os.path.exists(os.path.join('public', src.lstrip('/'))) for entry in manifest.values()
+               for src in _srcs(entry))
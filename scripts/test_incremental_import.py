@@ -0,0 +1,134 @@
+import csv
+import json
+
+import openpyxl
+import pytest
+
+import generate_shopify_import as gen
+import incremental_import as inc
+from bom_classifier import BomClassifier
+from catalog_dedup import CatalogCheck
+from csv_stream import write_products
+
+ROWS = [
+    ('SFP-1G-SX', 'SFP 1000BASE-SX 850nm 550m Multimode', 10.0),
+    ('SFP-1G-SX-I', 'SFP 1000BASE-SX 850nm 550m Multimode -40/+85°C', 12.0),
+    ('SFP-10G-LR', 'SFP+ 10GBASE-LR 1310nm 10km', 20.0),
+    ('QSFP28-100G-DAC-1M', '100G QSFP28 Passive Direct Attach Copper Cable', 40.0),
+    ('QSFP28-100G-DAC-3M', '100G QSFP28 Passive Direct Attach Copper Cable', 45.0),
+    ('XFP-10G-LR', 'XFP 10GBASE-LR 1310nm 10km', 30.0),
+    ('SFP-10G-LR-HP', 'HP compatible', 9.0),
+]
+
+
+def save_workbook(path, rows):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = gen.SHEET_NAME
+    ws.append(['Bom', 'Description'] + [None] * 6 + ['Prix fournisseur le moins chère'])
+    for bom, description, price in rows:
+        ws.append([bom, description] + [None] * 6 + [price])
+    wb.save(path)
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as fh:
+        return list(csv.DictReader(fh))
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return {'input_file': str(tmp_path / 'prices.xlsx'), 'state_path': str(tmp_path / 'state.json'),
+            'delta_path': str(tmp_path / 'delta.csv')}
+
+
+def run(paths, rows, **kwargs):
+    save_workbook(paths['input_file'], rows)
+    return inc.run_incremental(reader='xml', use_cache=False, **paths, **kwargs)
+
+
+def full_run(path, rows, policy='report'):
+    entries, missing = CatalogCheck(policy).run(rows, BomClassifier(), gen.MISSING_PRODUCTS)
+    products = list(gen.iter_products(entries, BomClassifier()))
+    products += [[gen.missing_product_row(m)] for m in missing]
+    write_products(products, path, gen.COLUMNS)
+    with open(path, 'rb') as fh:
+        return fh.read()
+
+
+def test_row_fingerprint_folds_duplicates_and_tracks_price():
+    first = inc.row_fingerprint('SFP+ 10G LR', 20.0, 'Transceiver, SFP+, 10G')
+    assert first == inc.row_fingerprint('SFP+ 10G LR', 20.0, 'Transceiver, SFP+, 10G')
+    assert first != inc.row_fingerprint('SFP+ 10G LR', 21.0, 'Transceiver, SFP+, 10G')
+    assert first != inc.row_fingerprint('SFP+ 10G LR', 20.0, 'Transceiver, SFP+, 10G', previous=first)
+
+
+def test_first_run_writes_every_product_and_the_state(paths, tmp_path):
+    summary = run(paths, ROWS)
+    with open(paths['delta_path'], 'rb') as fh:
+        assert fh.read() == full_run(str(tmp_path / 'full.csv'), ROWS)
+    assert summary['changed'] == [] and summary['removed'] == []
+    assert 'qsfp28-100g-dac' in summary['added'] and 'sfp-10g-lr-hp' not in summary['added']
+
+    with open(paths['state_path'], encoding='utf-8') as fh:
+        state = json.load(fh)
+    assert state['version'] == inc.STATE_VERSION
+    assert state['source']['sha256'] == inc.file_sha256(paths['input_file'])
+    assert state['source']['config'] == inc.config_fingerprint()
+    assert state['rows']['QSFP28-100G-DAC-3M'][1] == 'qsfp28-100g-dac'
+    assert 'SFP-10G-LR-HP' not in state['rows'] and 'missing:QSFP-DD-400G-FR4' in state['rows']
+    assert state['families']['sfp-1g-sx'] == 'SFP-1G-SX'
+
+
+def test_unchanged_workbook_writes_an_empty_delta(paths):
+    run(paths, ROWS)
+    assert inc.run_incremental(reader='xml', use_cache=False, **paths) == {'added': [], 'changed': [],
+                                                                          'removed': []}
+    assert read_csv(paths['delta_path']) == []
+
+
+def test_changed_row_rewrites_its_whole_product(paths):
+    run(paths, ROWS)
+    edited = [(bom, description, 50.0 if bom == 'QSFP28-100G-DAC-3M' else price) for bom, description, price in ROWS]
+    summary = run(paths, edited)
+    assert summary == {'added': [], 'changed': ['qsfp28-100g-dac'], 'removed': []}
+    delta = read_csv(paths['delta_path'])
+    # Both variants, since Shopify imports a product as a whole
+    assert [(row['Handle'], row['Option1 Value'], row['Variant Price']) for row in delta] == [
+        ('qsfp28-100g-dac', '1m', '46.0'), ('qsfp28-100g-dac', '3m', '57.5')]
+
+
+def test_removed_product_is_unpublished(paths):
+    run(paths, ROWS)
+    summary = run(paths, [row for row in ROWS if row[0] != 'XFP-10G-LR'])
+    assert summary == {'added': [], 'changed': [], 'removed': ['xfp-10g-lr']}
+    delta = read_csv(paths['delta_path'])
+    assert [(row['Handle'], row['Title'], row['Published'], row['Variant Price']) for row in delta] == [
+        ('xfp-10g-lr', 'XFP-10G-LR', 'FALSE', '')]
+    with open(paths['state_path'], encoding='utf-8') as fh:
+        assert 'xfp-10g-lr' not in json.load(fh)['families']
+
+    # Back again: added
+    assert run(paths, ROWS)['added'] == ['xfp-10g-lr']
+
+
+def test_duplicates_are_resolved_like_a_full_run(paths, tmp_path):
+    rows = ROWS + [ROWS[2], ('SFP-10G-LR', 'SFP+ 10GBASE-LR 1310nm 10km', 25.0)]
+    added = run(paths, rows, collisions='resolve')['added']
+    with open(paths['delta_path'], 'rb') as fh:
+        assert fh.read() == full_run(str(tmp_path / 'full.csv'), rows, 'resolve')
+    assert [row['Variant Price'] for row in read_csv(paths['delta_path']) if row['Handle'] == 'sfp-10g-lr'] == ['23.0']
+
+    # Another policy is another configuration: everything is rewritten
+    assert run(paths, rows)['changed'] == added
+    assert [row['Variant Price'] for row in read_csv(paths['delta_path']) if row['Handle'] == 'sfp-10g-lr'] == [
+        '23.0', '23.0', '28.75']
+
+
+@pytest.mark.parametrize('option', [['--engine', 'pandas'], ['--gzip'], ['--max-rows', '10'], ['--report'],
+                                    ['--search-index'], ['--image-base-url', 'http://x'], ['--profile', 'load']])
+def test_cli_rejects_options_incremental_ignores(option, capsys):
+    with pytest.raises(SystemExit) as exc:
+        gen.cli(['--incremental', *option])
+    assert exc.value.code == 2
+    assert option[0] in capsys.readouterr().err
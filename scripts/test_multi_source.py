@@ -0,0 +1,63 @@
+import openpyxl
+import pytest
+
+from multi_source import SheetSource, build_index, canonical_bom, hash_join, ingest
+
+
+@pytest.mark.parametrize('bom, expected', [
+    ('SFP-10G-LR', 'SFP-10G-LR'),
+    ('  sfp-10g-lr\t', 'SFP-10G-LR'),
+    ('Qsfp28 100G LR4 ', 'QSFP28 100G LR4'),
+    (1234, '1234'),
+])
+def test_canonical_bom(bom, expected):
+    assert canonical_bom(bom) == expected
+
+
+def test_build_index_keeps_the_first_usable_price_of_a_bom():
+    records = [
+        ('SFP-10G-LR', 25.0),
+        (' sfp-10g-lr', 30.0),
+        ('SFP-1G-SX', None),
+        ('sfp-1g-sx', ''),
+        ('SFP-1G-SX ', 0),
+        ('SFP-1G-SX', 12.5),
+        ('QSFP28-100G-LR4', '199,00 €'),
+    ]
+    assert build_index(records) == {'SFP-10G-LR': 25.0, 'SFP-1G-SX': 12.5, 'QSFP28-100G-LR4': '199,00 €'}
+
+
+def test_hash_join_keeps_every_record_in_order():
+    index = build_index([('sfp-10g-lr', 25.0), ('XFP-10G-ZR', 80.0)])
+    records = [('SFP-10G-LR ', 'SFP+ LR', 20.0), ('SFP-1G-SX', 'SFP SX', 10.0), ('sfp-10g-lr', 'duplicate', 21.0)]
+    # Records without a match keep None; index keys no record asks for are ignored
+    assert list(hash_join(records, index)) == [
+        (records[0], 25.0), (records[1], None), (records[2], 25.0)]
+    assert list(hash_join([], index)) == []
+    assert [value for _, value in hash_join(records, {})] == [None, None, None]
+
+
+def _workbook(path, rows):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Sheet'
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def test_single_and_multi_worker_ingest_match(tmp_path):
+    prices, selling = str(tmp_path / 'prices.xlsx'), str(tmp_path / 'selling.xlsx')
+    _workbook(prices, [['Bom', 'Description', 'Prix'], ['SFP-10G-LR', 'SFP+ LR', 20.0], ['SFP-1G-SX', None, 10.0],
+                       ['QSFP28-100G-LR4', 'QSFP28 LR4', '199,00 €']])
+    _workbook(selling, [['Référence', 'Nom', 'Prix recommandé'], ['sfp-10g-lr', 'x', 25.0], ['XFP', 'x', None]])
+    sources = [SheetSource('prices', prices, 'Sheet', columns=(1, 2, 3), required=2, min_row=2),
+               SheetSource('selling', selling, 'Sheet', columns=(1, 3), required=2, min_row=2)]
+
+    single = ingest(sources, reader='xml', max_workers=1, use_cache=False)
+    multi = ingest(sources, reader='xml', max_workers=2, use_cache=False)
+    assert single == multi
+    assert single == {
+        'prices': [('SFP-10G-LR', 'SFP+ LR', 20), ('QSFP28-100G-LR4', 'QSFP28 LR4', '199,00 €')],
+        'selling': [('sfp-10g-lr', 25)],
+    }
@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+import generate_shopify_import as gen
+from synthetic_price_list import write_price_list
+
+pytest.importorskip('pandas')
+
+
+@pytest.fixture(scope='module')
+def price_list(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('prices') / 'prices.xlsx')
+    write_price_list(path, 3000, seed=7)
+    return path
+
+
+def _run(monkeypatch, tmp_path, price_list, engine, **kwargs):
+    out_dir = tmp_path / engine
+    out_dir.mkdir()
+    monkeypatch.setattr(gen, 'INPUT_FILE', price_list)
+    monkeypatch.setattr(gen, 'OUTPUT_FILE', str(out_dir / 'import.csv'))
+    report = gen.main(reader='xml', use_cache=False, engine=engine, **kwargs)
+    files = {}
+    for path in report.counts['output_files']:
+        with open(path, 'rb') as fh:
+            files[os.path.basename(path)] = fh.read()
+    return files, report.counts['products_by_type'], report.counts['rows_by_type']
+
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'max_rows': 500},
+    {'max_rows': 500, 'compress': True},
+    # Per-product path: the frame is iterated instead of written with to_csv
+    {'image_base_url': 'http://127.0.0.1:8765'},
+])
+def test_engines_write_identical_csvs(monkeypatch, tmp_path, price_list, options):
+    python = _run(monkeypatch, tmp_path, price_list, 'python', **options)
+    pandas = _run(monkeypatch, tmp_path, price_list, 'pandas', **options)
+    assert list(pandas[0]) == list(python[0])
+    assert pandas == python
+    if 'max_rows' in options:
+        assert len(python[0]) > 1
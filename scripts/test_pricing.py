@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+import pricing
+from pricing import PriceTable
+
+RULES = {
+    'default': 1.15,
+    'rules': [
+        {'product_type': 'Network Cable', 'multiplier': 1.25},
+        {'speed': '100G', 'multiplier': 1.2},
+        {'form_factor': 'QSFP28', 'speed': '100G', 'multiplier': 1.1, 'breaks': [[50, 1.06], [10, 1.08]]},
+        {'form_factor': 'SFP', 'multiplier': 1.3},
+    ],
+}
+
+
+def _multiplier(table, product_type, form_factor, speed, quantity=1):
+    return table.multipliers(quantity)[table.code(product_type, form_factor, speed)]
+
+
+def test_most_specific_rule_wins_then_last_listed():
+    table = PriceTable(RULES)
+    assert _multiplier(table, 'Optical Transceiver', 'QSFP28', '100G') == 1.1
+    assert _multiplier(table, 'Optical Transceiver', 'QSFP+', '100G') == 1.2
+    assert _multiplier(table, 'Optical Transceiver', 'SFP+', '10G') == 1.15
+    # Network Cable and SFP both set one field: the later rule applies
+    assert _multiplier(table, 'Network Cable', 'SFP', '1G') == 1.3
+    assert _multiplier(table, 'Network Cable', None, None) == 1.25
+
+
+def test_quantity_breaks():
+    table = PriceTable(RULES)
+    assert [_multiplier(table, None, 'QSFP28', '100G', quantity) for quantity in (1, 9, 10, 49, 50)] == [
+        1.1, 1.1, 1.08, 1.08, 1.06]
+    assert _multiplier(table, None, 'SFP', None, 50) == 1.3
+
+
+def test_as_is_code_and_defaults():
+    table = PriceTable()
+    assert table.price(19.99, table.as_is) == 19.99
+    assert table.price(10.0, table.code('Optical Transceiver', 'SFP', '1G')) == 11.5
+    assert set(table.multipliers()[:-1]) == {pricing.DEFAULT_MULTIPLIER}
+
+
+@pytest.mark.parametrize('rule', [
+    {'form_factor': 'OSFP', 'multiplier': 1.1},
+    {'speed': '100G'},
+    {'speed': '100G', 'multiplier': 1.1, 'margin': 0.1},
+])
+def test_invalid_rules_are_rejected(rule):
+    with pytest.raises(ValueError):
+        PriceTable({'rules': [rule]})
+
+
+def test_batch_matches_scalar_prices(monkeypatch):
+    table = PriceTable(RULES)
+    rng = random.Random(7)
+    costs = [round(rng.uniform(0, 2000), rng.choice((0, 1, 2, 3))) for _ in range(5000)] + [0.05, 1.005, 2.675]
+    codes = [rng.randrange(table.as_is + 1) for _ in costs]
+    expected = [table.price(cost, code, 10) for cost, code in zip(costs, codes)]
+    assert table.price_batch(costs, codes, 10) == expected
+    # Without numpy the batch is priced row by row
+    monkeypatch.setattr(pricing, '_numpy', lambda: None)
+    assert table.price_batch(costs, codes, 10) == expected
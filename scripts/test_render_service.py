@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+from PIL import Image
+
+from render_service import ByteLRU, RenderService, etag_matches, make_server
+
+ETAG = '"0123456789abcdef"'
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    images = tmp_path / 'images'
+    (images / 'products').mkdir(parents=True)
+    Image.new('RGBA', (40, 20), (0, 0, 0, 255)).save(str(images / 'logo.png'))
+    Image.new('RGBA', (200, 100), (255, 255, 255, 255)).save(str(images / 'products' / 'sfp.png'))
+    config = {'logo': 'logo.png', 'templates': {'sfp': {'base': 'sfp.png', 'label': {}}}}
+    service = RenderService(config, str(images), str(tmp_path / 'disk'), disk_bytes=250)
+    # 100 bytes per render, the text makes them distinct
+    monkeypatch.setattr(service.renderer, 'encode', lambda base, label, text=None: (text or '').encode().ljust(100))
+    return service
+
+
+@pytest.mark.parametrize('header, expected', [
+    (ETAG, True),
+    ('W/' + ETAG, True),
+    (f'"other", {ETAG}', True),
+    (f'"other",W/{ETAG}', True),
+    ('*', True),
+    ('"other"', False),
+    ('0123456789abcdef', False),
+    ('', False),
+    (None, False),
+])
+def test_if_none_match_lists_use_the_weak_comparison(header, expected):
+    assert etag_matches(header, ETAG) is expected
+
+
+def test_byte_lru_evicts_the_least_recently_used():
+    lru = ByteLRU(max_bytes=10)
+    lru.put('a', b'1234')
+    lru.put('b', b'1234')
+    lru.get('a')
+    lru.put('c', b'1234')
+    assert (lru.get('a'), lru.get('b'), lru.size, len(lru)) == (b'1234', None, 8, 2)
+    lru.put('huge', b'x' * 11)
+    assert lru.get('huge') is None
+
+
+def test_counters_are_exact_under_concurrent_hits(service):
+    service.get('sfp', 'SFP-10G-LR')
+
+    def hit():
+        for _ in range(500):
+            service.get('sfp', 'SFP-10G-LR')
+    threads = [threading.Thread(target=hit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert service.stats_snapshot() == {'memory': 4000, 'disk': 0, 'render': 1}
+
+
+def test_disk_tier_evicts_the_least_recently_read(service):
+    for text in ('A', 'B'):
+        service.get('sfp', text)
+    paths = {text: os.path.join(service.disk_dir, service.key('sfp', text) + '.png') for text in 'ABC'}
+    # Read from disk: A becomes more recent than B
+    os.utime(paths['A'], (1, 1))
+    os.utime(paths['B'], (2, 2))
+    service.memory = ByteLRU()
+    assert service.get('sfp', 'A')[2] == 'disk'
+
+    service.get('sfp', 'C')
+    assert [os.path.exists(paths[text]) for text in 'ABC'] == [True, False, True]
+    assert service.disk_size == 200
+
+
+def _in_threads(target, args_list):
+    threads = [threading.Thread(target=target, args=args) for args in args_list]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert not any(thread.is_alive() for thread in threads)
+
+
+def test_concurrent_misses_of_a_key_render_it_once(service, monkeypatch):
+    renders, started, release = [], threading.Event(), threading.Event()
+
+    def slow_encode(base, label, text=None):
+        renders.append(text)
+        started.set()
+        release.wait(5)
+        return text.encode().ljust(100)
+    monkeypatch.setattr(service.renderer, 'encode', slow_encode)
+
+    def request(wait):
+        if wait:
+            started.wait(5)
+        service.get('sfp', 'A')
+
+    def release_later():
+        # The other requests are past the memory and disk tiers by then, waiting on the key
+        started.wait(5)
+        time.sleep(0.2)
+        release.set()
+    _in_threads(lambda fn, *args: fn(*args), [(request, False)] + [(request, True)] * 4 + [(release_later,)])
+    assert renders == ['A']
+    assert service.stats_snapshot()['render'] == 1
+    assert service.disk_size == 100
+
+
+def test_unrelated_keys_render_in_parallel(service, monkeypatch):
+    # A's render only finishes once B's has started: a global render lock would deadlock
+    b_started = threading.Event()
+
+    def encode(base, label, text=None):
+        if text == 'A':
+            assert b_started.wait(5)
+        else:
+            b_started.set()
+        return text.encode().ljust(100)
+    monkeypatch.setattr(service.renderer, 'encode', encode)
+    results = {}
+    _in_threads(lambda text: results.update({text: service.get('sfp', text)[2]}), [('A',), ('B',)])
+    assert results == {'A': 'render', 'B': 'render'}
+    assert service.disk_size == 200
+
+
+def test_a_render_already_on_disk_is_not_counted_twice(service):
+    service.get('sfp', 'A')
+    # Written meanwhile by another process sharing the disk tier
+    service._store(os.path.join(service.disk_dir, service.key('sfp', 'A') + '.png'), b'A'.ljust(100))
+    assert service.disk_size == 100
+
+
+def test_server_answers_304_for_a_matching_etag_list(service):
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f'http://127.0.0.1:{server.server_port}/render/sfp.png?bom=SFP-10G-LR'
+    try:
+        with urllib.request.urlopen(url) as response:
+            etag = response.headers['ETag']
+            assert response.read() == b'SFP-10G-LR'.ljust(100)
+        request = urllib.request.Request(url, headers={'If-None-Match': f'"stale", W/{etag}'})
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(request)
+        assert excinfo.value.code == 304
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,69 @@
+import json
+import os
+import pstats
+
+import pytest
+
+import generate_shopify_import as gen
+from run_report import RunReport
+
+ENTRIES = [
+    ('SFP-1G-SX', 'SFP 1000BASE-SX 850nm 550m Multimode', 10.0),
+    ('SFP-1G-SX-I', 'SFP 1000BASE-SX 850nm 550m Multimode -40/+85°C', 12.0),
+    ('QSFP28-100G-DAC-1M', '100G QSFP28 Passive Direct Attach Copper Cable', 40.0),
+    ('SFP-10G-LR-HP', 'HP compatible', 9.0),
+]
+TIMINGS = ('wall_seconds', 'cpu_seconds', 'peak_rss_mb')
+
+
+def test_stage_records_rows_and_timings(tmp_path):
+    report = RunReport('work', str(tmp_path / 'work.prof'))
+    with report.stage('load') as stage:
+        stage['rows_out'] = 3
+    with pytest.raises(ValueError):
+        with report.stage('work', rows_in=3):
+            sum(range(1000))
+            raise ValueError
+    assert [(s['name'], s['rows_in'], s['rows_out']) for s in report.stages] == [('load', None, 3), ('work', 3, None)]
+    assert all(s[key] is not None for s in report.stages for key in TIMINGS[:2])
+    # The profiled stage is dumped even when it fails
+    assert report.stages[1]['profile'] == str(tmp_path / 'work.prof')
+    assert pstats.Stats(report.stages[1]['profile']).total_calls > 0
+
+
+@pytest.mark.parametrize('engine, stages', [
+    ('python', ['load', 'classify', 'dedup', 'group', 'merge', 'write', 'index']),
+    ('pandas', ['load', 'classify', 'dedup', 'build', 'write', 'index']),
+])
+def test_report_has_every_stage_of_the_run(monkeypatch, tmp_path, engine, stages):
+    if engine == 'pandas':
+        pytest.importorskip('pandas')
+    monkeypatch.setattr(gen, 'read_price_list', lambda *args, **kwargs: iter(ENTRIES))
+    monkeypatch.setattr(gen, 'OUTPUT_FILE', str(tmp_path / 'import.csv'))
+    report_path = str(tmp_path / 'report.json')
+    gen.main(engine=engine, report_path=report_path, search_index_path=str(tmp_path / 'index.json'))
+
+    with open(report_path, encoding='utf-8') as fh:
+        report = json.load(fh)
+    assert [stage['name'] for stage in report['stages']] == stages
+    assert set(stages) <= set(gen.STAGES)
+    for stage in report['stages']:
+        assert {'rows_in', 'rows_out', *TIMINGS} <= set(stage)
+        assert stage['rows_out'] is not None and stage['wall_seconds'] >= 0 and stage['cpu_seconds'] >= 0
+    by_name = {stage['name']: stage for stage in report['stages']}
+    assert by_name['load']['rows_out'] == by_name['classify']['rows_in'] == len(ENTRIES)
+    assert by_name['classify']['rows_out'] == len(ENTRIES) - 1
+    assert by_name['write']['rows_out'] == len(ENTRIES) - 1 + len(gen.MISSING_PRODUCTS)
+    assert report['engine'] == engine and report['counts']['output_files'] == [str(tmp_path / 'import.csv')]
+
+
+def test_profile_only_accepts_a_stage_name(monkeypatch, tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        gen.cli(['--profile', 'grouping'])
+    assert "invalid choice: 'grouping'" in capsys.readouterr().err
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(gen, 'read_price_list', lambda *args, **kwargs: iter(ENTRIES))
+    monkeypatch.setattr(gen, 'OUTPUT_FILE', str(tmp_path / 'import.csv'))
+    gen.cli(['--profile', 'group'])
+    assert os.path.exists(tmp_path / 'vaonix_import_group.prof')
@@ -0,0 +1,62 @@
+import json
+
+import generate_shopify_import as gen
+from bom_classifier import BomClassifier
+from search_index import SearchIndexBuilder, parse_specs, product_specs, tokenize
+
+ENTRIES = [
+    ('SFP-1G-SX', 'SFP 1000BASE-SX 850nm 550m Multimode', 10.0),
+    ('SFP-1G-SX-I', 'SFP 1000BASE-SX 850nm 550m Multimode -40/+85°C', 12.0),
+    ('SFP-10G-LR', 'SFP+ 10GBASE-LR 1310nm 10km Singlemode', 20.0),
+    ('QSFP-100G-LR4', 'QSFP28 100GBASE-LR4 1310nm 10km Singlemode', 200.0),
+    ('QSFP28-100G-DAC-1M', '100G QSFP28 Passive Direct Attach Copper Cable', 40.0),
+    ('QSFP28-100G-DAC-3M', '100G QSFP28 Passive Direct Attach Copper Cable', 45.0),
+]
+
+
+def _products():
+    return list(gen.iter_products(ENTRIES, BomClassifier()))
+
+
+def test_parse_specs_matches_product_parser():
+    assert parse_specs('QSFP28 100GBASE-ZR DWDM 80km Singlemode') == {
+        'speed': '100G', 'formFactor': 'QSFP28', 'distance': '80km',
+        'technology': ['DWDM', 'ZR (Very Long Range)'], 'media': 'Singlemode', 'wavelength': None}
+    # 10G "SFP" is corrected to SFP+, bare 850 still gives the wavelength
+    specs = parse_specs('SFP 10G SR 850 300m OM3')
+    assert specs['formFactor'] == 'SFP+' and specs['wavelength'] == '850NM' and specs['media'] == 'Multimode'
+    assert parse_specs('')['technology'] == []
+
+
+def test_product_specs_prefers_classifier_tags():
+    products = {rows[0]['Handle']: rows for rows in _products()}
+    # Classifier says QSFP+ from the BOM, the description narrows it to QSFP28
+    assert product_specs(products['qsfp-100g-lr4'])['formFactor'] == 'QSFP28'
+    cable = product_specs(products['qsfp28-100g-dac'])
+    assert cable['technology'][0] == 'DAC' and cable['media'] == 'Copper'
+
+
+def test_index_merges_handles_and_counts_facets(tmp_path):
+    builder = SearchIndexBuilder()
+    products = _products()
+    # A non-contiguous duplicate handle stays one doc
+    list(builder.wrap(products + [products[0]]))
+    index = builder.write(str(tmp_path / 'index.json'))
+    assert json.loads((tmp_path / 'index.json').read_text(encoding='utf-8')) == index
+
+    handles = [doc['handle'] for doc in index['docs']]
+    assert len(handles) == len(set(handles)) == len(products)
+    sfp = index['docs'][handles.index('sfp-1g-sx')]
+    assert sfp['variants'] == 4 and sfp['price'] == 11.5
+
+    assert set(index['tokens']['1310nm']) == {handles.index('sfp-10g-lr'), handles.index('qsfp-100g-lr4')}
+    assert index['tokens']['industrial'] == [handles.index('sfp-1g-sx')]
+    assert all(ids == sorted(ids) for ids in index['tokens'].values())
+    speeds = index['facets']['speed']
+    assert speeds['100G'] == {'count': 2, 'docs': sorted([handles.index('qsfp-100g-lr4'),
+                                                          handles.index('qsfp28-100g-dac')])}
+    assert list(speeds) == ['100G', '10G', '1G']
+
+
+def test_tokenize_keeps_form_factor_and_wavelength_tokens():
+    assert tokenize('SFP+ 10GBASE-LR 1270/1330nm 0.5m') == ['sfp+', '10gbase', 'lr', '1270/1330nm', '0.5m']
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+
+import pytest
+
+import generate_shopify_import as gen
+from bom_classifier import BomClassifier
+from csv_stream import write_products
+from incremental_import import removed_product_row
+import shopify_upload
+from mock_shopify import MockShopify, make_server
+from shopify_upload import Checkpoint, iter_csv_products, product_input, upload
+
+ENTRIES = [
+    ('SFP-1G-SX', 'SFP 1000BASE-SX 850nm 550m Multimode', 10.0),
+    ('SFP-1G-SX-I', 'SFP 1000BASE-SX 850nm 550m Multimode -40/+85°C', 12.0),
+    ('SFP-1G-SX-E', 'SFP 1000BASE-SX 850nm 550m Multimode -15/+80°C', 11.0),
+    ('QSFP28-100G-DAC-1M', '100G QSFP28 Passive Direct Attach Copper Cable', 40.0),
+    ('QSFP28-100G-DAC-3M', '100G QSFP28 Passive Direct Attach Copper Cable', 45.0),
+    ('SFP-10G-LR-HP', 'HP compatible', 9.0),
+] + [(f'SFP-10G-LR{idx}', f'SFP+ 10GBASE-LR 1310nm 10km #{idx}', '12,50 €') for idx in range(40)]
+
+
+@pytest.fixture
+def catalog_csv(tmp_path, capsys):
+    path = str(tmp_path / 'import.csv')
+    products = gen.iter_products(ENTRIES, BomClassifier())
+    write_products(products, path, gen.COLUMNS)
+    capsys.readouterr()
+    return path
+
+
+@pytest.fixture
+def shop():
+    shop = MockShopify(bucket=1000, restore_rate=100000)
+    server = make_server(shop, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield shop
+    server.shutdown()
+    server.server_close()
+
+
+def _upload(shop, csv_path, tmp_path, **kwargs):
+    return asyncio.run(upload([csv_path], shop.base_url, 'test', checkpoint_path=str(tmp_path / 'state.json'),
+                              **kwargs))
+
+
+def test_product_input_groups_variants(catalog_csv):
+    products = {rows[0]['Handle']: product_input(rows) for rows in iter_csv_products([catalog_csv])}
+    sfp = products['sfp-1g-sx']
+    assert sfp['title'] == 'SFP-1G-SX'
+    assert sfp['status'] == 'ACTIVE'
+    assert sfp['productOptions'] == [{'name': 'Temperature', 'values': [
+        {'name': 'Commercial (0/70°C)'}, {'name': 'Extended (-10/+80°C)'}, {'name': 'Industrial (-40/+85°C)'}]}]
+    assert [v['price'] for v in sfp['variants']] == ['11.5', '12.65', '13.8']
+    assert sfp['variants'][0]['inventoryPolicy'] == 'DENY'
+    assert sfp['variants'][0]['inventoryItem']['measurement']['weight'] == {'value': 100.0, 'unit': 'GRAMS'}
+    assert 'Transceiver' in sfp['tags']
+    assert len(products['qsfp28-100g-dac']['variants']) == 2
+    assert 'sfp-10g-lr-hp' not in products
+
+
+def test_batch_upload_and_resume(shop, catalog_csv, tmp_path):
+    expected = len(list(iter_csv_products([catalog_csv])))
+    result = _upload(shop, catalog_csv, tmp_path, batch_size=4, concurrency=3)
+    assert result['uploaded'] == expected and not result['failed']
+    assert len(shop.products) == expected
+    assert len(shop.products['sfp-1g-sx']['variants']) == 3
+
+    # Everything is checkpointed: nothing left to send
+    requests = shop.requests
+    again = _upload(shop, catalog_csv, tmp_path)
+    assert again['uploaded'] == 0 and again['skipped'] == expected
+    assert shop.requests == requests
+
+
+def test_a_failing_batch_does_not_stop_the_others(shop, catalog_csv, tmp_path, monkeypatch):
+    monkeypatch.setattr(shopify_upload, 'MAX_RETRIES', 1)
+    handles = [rows[0]['Handle'] for rows in iter_csv_products([catalog_csv])]
+    # Every request holding the 5th product gets a 503, i.e. the whole second batch
+    shop.unavailable.add(handles[4])
+    result = _upload(shop, catalog_csv, tmp_path, batch_size=4, concurrency=2)
+    assert [handle for handle, _ in result['failed']] == handles[4:8]
+    assert result['uploaded'] == len(handles) - 4
+    assert sorted(shop.products) == sorted(handles[:4] + handles[8:])
+
+    # The failed batch was not checkpointed: it is the only one sent once the store is back
+    shop.unavailable.clear()
+    again = _upload(shop, catalog_csv, tmp_path, batch_size=4)
+    assert again['uploaded'] == 4 and again['skipped'] == len(handles) - 4 and not again['failed']
+    assert len(shop.products) == len(handles)
+
+
+def test_unpublished_products_only_change_status(shop, catalog_csv, tmp_path):
+    _upload(shop, catalog_csv, tmp_path)
+    before = dict(shop.products['sfp-1g-sx'])
+    delta = str(tmp_path / 'delta.csv')
+    write_products([[removed_product_row('sfp-1g-sx', 'SFP-1G-SX')], [removed_product_row('gone', 'Gone')]],
+                   delta, gen.COLUMNS)
+    assert [product_input(rows) for rows in iter_csv_products([delta])] == [
+        {'handle': 'sfp-1g-sx', 'status': 'DRAFT'}, {'handle': 'gone', 'status': 'DRAFT'}]
+
+    for mode in ('batch', 'bulk'):
+        shop.products['sfp-1g-sx']['status'] = 'ACTIVE'
+        (tmp_path / mode).mkdir()
+        result = _upload(shop, delta, tmp_path / mode, mode=mode)
+        assert result['uploaded'] == 2 and not result['failed']
+        # Variants, description and the rest are left as they were
+        assert shop.products['sfp-1g-sx'] == dict(before, status='DRAFT')
+        assert 'gone' not in shop.products
+
+
+def test_checkpoint_skips_only_unchanged_products(shop, catalog_csv, tmp_path):
+    checkpoint = Checkpoint(str(tmp_path / 'state.json'), store=shop.base_url)
+    products = [product_input(rows) for rows in iter_csv_products([catalog_csv])]
+    checkpoint.mark(products[:5])
+    checkpoint.save()
+    products[0]['variants'][0]['price'] = '99.0'
+
+    reloaded = Checkpoint(str(tmp_path / 'state.json'), store=shop.base_url)
+    assert [reloaded.is_done(p) for p in products[:6]] == [False, True, True, True, True, False]
+    assert not Checkpoint(str(tmp_path / 'state.json'), store='https://other.myshopify.com').is_done(products[1])
+
+
+def test_bulk_upload(shop, catalog_csv, tmp_path):
+    result = _upload(shop, catalog_csv, tmp_path, mode='bulk')
+    assert result['uploaded'] == len(shop.products) > 0
+    assert result['requests'] <= 4
+
+
+def test_throttled_requests_are_retried(catalog_csv, tmp_path):
+    # Far smaller bucket than the client assumes: the first requests get THROTTLED
+    shop = MockShopify(bucket=60, restore_rate=2000)
+    server = make_server(shop, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        result = _upload(shop, catalog_csv, tmp_path, batch_size=5, concurrency=4)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert result['uploaded'] == len(shop.products) > 0
+    assert shop.throttled > 0
+    assert result['throttled'] == shop.throttled
@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import vaonix
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _heavy_imports(args):
+    # Fresh interpreter: this test session has long imported pandas / PIL
+    proc = subprocess.run([sys.executable, os.path.join(SCRIPTS_DIR, 'bench_cli.py'), '--worker', *args],
+                          capture_output=True, text=True, check=True, cwd=vaonix.ROOT_DIR)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_help_lists_every_command(capsys):
+    with pytest.raises(SystemExit):
+        vaonix.main(['--help'])
+    out = capsys.readouterr().out
+    assert all(name in out for name in vaonix.COMMANDS)
+
+
+def test_command_options_go_to_the_module(capsys):
+    with pytest.raises(SystemExit):
+        vaonix.main(['import', '--help'])
+    out = capsys.readouterr().out
+    assert out.startswith('usage: vaonix import') and '--collisions' in out
+
+
+@pytest.mark.parametrize('args', [['--help'], ['import', '--help'], ['analyze', '--help'], ['inspect', '--help']])
+def test_light_commands_skip_heavy_imports(args):
+    assert _heavy_imports(args) == []
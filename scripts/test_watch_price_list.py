@@ -0,0 +1,218 @@
+import json
+import os
+
+import openpyxl
+import pytest
+
+import generate_shopify_import as gen
+from bom_classifier import BomClassifier
+from csv_stream import write_products
+from pricing import PriceTable, load_rules
+from watch_price_list import WarmPipeline
+
+ROWS = [
+    ('SFP-1G-SX', 'SFP 1000BASE-SX 850nm 550m Multimode', 10.0),
+    ('SFP-1G-SX-I', 'SFP 1000BASE-SX 850nm 550m Multimode -40/+85°C', 12.0),
+    ('SFP-10G-LR', 'SFP+ 10GBASE-LR 1310nm 10km', 20.0),
+    ('QSFP28-100G-DAC-1M', '100G QSFP28 Passive Direct Attach Copper Cable', 40.0),
+    ('SFP-10G-ZR-DWDM-C21', 'SFP+ 10G DWDM 80km', 100.0),
+    ('SFP-10G-LR', 'SFP+ 10GBASE-LR 1310nm 10km', 21.0),
+    ('QSFP28-100G-DAC-3M', '100G QSFP28 Passive Direct Attach Copper Cable', 45.0),
+    ('SFP-10G-LR-HP', 'HP compatible', 9.0),
+    ('SFP-10G-ZR-DWDM-C22', 'SFP+ 10G DWDM 80km', 100.0),
+]
+
+
+def save_workbook(path, rows):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = gen.SHEET_NAME
+    ws.append(['Bom', 'Description'] + [None] * 6 + ['Prix fournisseur le moins chère'])
+    for bom, description, price in rows:
+        ws.append([bom, description] + [None] * 6 + [price])
+    # Saved elsewhere and renamed over the workbook, like Excel does
+    tmp_path = os.path.join(os.path.dirname(path), 'A1B2C3D4')
+    wb.save(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def full_run(workbook, path):
+    entries = list(gen.read_price_list('xml', workbook, use_cache=False))
+    products = list(gen.iter_products(entries, BomClassifier()))
+    products += [[gen.missing_product_row(missing)] for missing in gen.MISSING_PRODUCTS]
+    write_products(products, path, gen.COLUMNS)
+    with open(path, 'rb') as fh:
+        return fh.read()
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    workbook = str(tmp_path / 'prices.xlsx')
+    save_workbook(workbook, ROWS)
+    pipeline = WarmPipeline(workbook, str(tmp_path / 'import.csv'))
+    pipeline.start()
+    return pipeline
+
+
+def _output(pipeline):
+    with open(pipeline.output_file, 'rb') as fh:
+        return fh.read()
+
+
+@pytest.mark.parametrize('edit, expected_touched', [
+    (lambda rows: rows[:2] + [(rows[2][0], rows[2][1], 25.0)] + rows[3:], {'sfp-10g-lr'}),
+    (lambda rows: rows + [('SFP-1G-SX-E', 'SFP 1000BASE-SX 850nm 550m Multimode -15/+80°C', 11.0)], {'sfp-1g-sx'}),
+    (lambda rows: [row for row in rows if row[0] != 'QSFP28-100G-DAC-1M'], {'qsfp28-100g-dac'}),
+    (lambda rows: rows + [('XFP-10G-LR', 'XFP 10GBASE-LR 1310nm 10km', 30.0)], {'xfp-10g-lr'}),
+    (lambda rows: rows[:4] + rows[5:], {'sfp-10g-zr-dwdm'}),
+    (lambda rows: rows[5:] + rows[:5], {'sfp-10g-lr', 'qsfp28-100g-dac', 'sfp-10g-zr-dwdm'}),
+])
+def test_refresh_matches_full_run(pipeline, tmp_path, capsys, edit, expected_touched):
+    assert _output(pipeline) == full_run(pipeline.input_file, str(tmp_path / 'full.csv'))
+    save_workbook(pipeline.input_file, edit(ROWS))
+    touched = pipeline.refresh()
+    pipeline.write()
+    assert touched == expected_touched
+    assert _output(pipeline) == full_run(pipeline.input_file, str(tmp_path / 'full.csv'))
+
+
+def test_poll_waits_for_a_finished_save(pipeline, tmp_path):
+    assert pipeline.poll() is None
+    # Excel's lock file appearing next to the workbook is not a save
+    (tmp_path / '~$prices.xlsx').write_bytes(b'\x00' * 165)
+    assert pipeline.poll() is None
+
+    save_workbook(pipeline.input_file, ROWS[:-1])
+    # First poll only sees the change, the second one finds it stable and processes it
+    assert pipeline.poll() is None
+    touched, rows = pipeline.poll()
+    assert touched == {'sfp-10g-zr-dwdm'} and rows > 0
+    assert pipeline.poll() is None
+
+    # Renamed away mid-save: nothing happens until the workbook is back
+    os.replace(pipeline.input_file, str(tmp_path / 'moved.xlsx'))
+    assert pipeline.poll() is None
+    os.replace(str(tmp_path / 'moved.xlsx'), pipeline.input_file)
+
+
+def test_save_without_changes_keeps_outputs(pipeline):
+    before = os.stat(pipeline.output_file).st_mtime_ns
+    save_workbook(pipeline.input_file, ROWS)
+    pipeline.poll()
+    assert pipeline.poll() == (set(), 0)
+    assert os.stat(pipeline.output_file).st_mtime_ns == before
+
+
+RULES = {'default': 1.15, 'rules': [{'speed': '100G', 'multiplier': 1.2}, {'form_factor': 'SFP', 'multiplier': 1.3}]}
+
+
+def generator_run(monkeypatch, workbook, path, **kwargs):
+    with monkeypatch.context() as patch:
+        patch.setattr(gen, 'INPUT_FILE', workbook)
+        patch.setattr(gen, 'OUTPUT_FILE', path)
+        gen.main(reader='xml', use_cache=False, **kwargs)
+    with open(path, 'rb') as fh:
+        return fh.read()
+
+
+def test_watch_matches_the_generator_with_pricing_rules(tmp_path, monkeypatch):
+    rules_path = str(tmp_path / 'rules.json')
+    with open(rules_path, 'w', encoding='utf-8') as fh:
+        json.dump(RULES, fh)
+    workbook = str(tmp_path / 'prices.xlsx')
+    save_workbook(workbook, ROWS)
+    pipeline = WarmPipeline(workbook, str(tmp_path / 'import.csv'), pricing=PriceTable(load_rules(rules_path)))
+    pipeline.start()
+    full = str(tmp_path / 'full.csv')
+    assert _output(pipeline) == generator_run(monkeypatch, workbook, full, pricing_rules=rules_path)
+    assert _output(pipeline) != generator_run(monkeypatch, workbook, full)
+
+
+def test_default_paths_are_read_at_call_time(tmp_path, monkeypatch):
+    workbook = str(tmp_path / 'prices.xlsx')
+    save_workbook(workbook, ROWS)
+    monkeypatch.setattr(gen, 'INPUT_FILE', workbook)
+    monkeypatch.setattr(gen, 'OUTPUT_FILE', str(tmp_path / 'import.csv'))
+    assert list(gen.read_price_list('xml', use_cache=False)) == ROWS
+    pipeline = WarmPipeline()
+    assert (pipeline.input_file, pipeline.output_file) == (gen.INPUT_FILE, gen.OUTPUT_FILE)
+
+
+@pytest.mark.parametrize('collisions', ['report', 'resolve'])
+def test_watch_matches_the_generator_with_duplicates_and_pricing_rules(tmp_path, monkeypatch, collisions):
+    rules_path = str(tmp_path / 'rules.json')
+    with open(rules_path, 'w', encoding='utf-8') as fh:
+        json.dump(RULES, fh)
+    workbook = str(tmp_path / 'prices.xlsx')
+    # ROWS lists SFP-10G-LR twice, at two prices
+    save_workbook(workbook, ROWS)
+    pipeline = WarmPipeline(workbook, str(tmp_path / 'import.csv'), pricing=PriceTable(load_rules(rules_path)),
+                            collisions=collisions)
+    pipeline.start()
+    full = str(tmp_path / 'full.csv')
+    expected = generator_run(monkeypatch, workbook, full, collisions=collisions, pricing_rules=rules_path)
+    assert _output(pipeline) == expected
+    assert pipeline.check.counts()['conflicting_bom'] == 1
+
+    # A sheet row for an injected product: dropped from the injected ones under resolve
+    save_workbook(workbook, ROWS + [('QSFP-DD-400G-FR4', 'QSFP-DD 400GBASE-FR4 1310nm 2km Singlemode', 300.0)])
+    touched = pipeline.refresh()
+    pipeline.write()
+    assert _output(pipeline) == generator_run(monkeypatch, workbook, full, collisions=collisions,
+                                              pricing_rules=rules_path)
+    assert ('qsfp-dd-400g-fr4' in touched) and (pipeline.check.counts()['injected_duplicate'] == 1)
+
+
+def test_fail_policy_keeps_the_last_outputs(pipeline, tmp_path, capsys):
+    pipeline.collisions = 'fail'
+    before = _output(pipeline)
+    save_workbook(pipeline.input_file, ROWS + [ROWS[0]])
+    assert pipeline.poll() is None
+    assert pipeline.poll() is None
+    assert 'Outputs kept' in capsys.readouterr().out
+    assert _output(pipeline) == before
+
+
+def _poll_save(pipeline):
+    # The first poll sees the save, the second confirms it is finished
+    assert pipeline.poll() is None
+    return pipeline.poll()
+
+
+def test_unexpected_refresh_error_waits_for_the_next_save(pipeline, tmp_path, capsys, monkeypatch):
+    before = _output(pipeline)
+    rows = ROWS[:2] + [(ROWS[2][0], ROWS[2][1], 25.0)] + ROWS[3:]
+    build_family = WarmPipeline._build_family
+
+    def broken(self, entries):
+        raise RuntimeError("classifier bug")
+    monkeypatch.setattr(WarmPipeline, '_build_family', broken)
+    save_workbook(pipeline.input_file, rows)
+    assert _poll_save(pipeline) is None
+    captured = capsys.readouterr()
+    assert 'RuntimeError: classifier bug' in captured.err and 'Rebuild failed' in captured.out
+    assert _output(pipeline) == before
+
+    monkeypatch.setattr(WarmPipeline, '_build_family', build_family)
+    save_workbook(pipeline.input_file, rows)
+    assert _poll_save(pipeline) is not None
+    assert _output(pipeline) == full_run(pipeline.input_file, str(tmp_path / 'full.csv'))
+
+
+def test_failed_write_is_redone_on_the_next_save(pipeline, tmp_path, capsys, monkeypatch):
+    rows = ROWS + [('XFP-10G-LR', 'XFP 10GBASE-LR 1310nm 10km', 30.0)]
+    write = WarmPipeline.write
+
+    def disk_full(self):
+        raise OSError(28, 'No space left on device')
+    monkeypatch.setattr(WarmPipeline, 'write', disk_full)
+    save_workbook(pipeline.input_file, rows)
+    assert _poll_save(pipeline) is None
+    assert 'Writing the outputs failed' in capsys.readouterr().out
+
+    # Saved again without row changes: everything is rebuilt and written anyway
+    monkeypatch.setattr(WarmPipeline, 'write', write)
+    save_workbook(pipeline.input_file, rows)
+    touched, _ = _poll_save(pipeline)
+    assert 'xfp-10g-lr' in touched
+    assert _output(pipeline) == full_run(pipeline.input_file, str(tmp_path / 'full.csv'))
@@ -0,0 +1,108 @@
+import json
+import os
+
+import openpyxl
+import pytest
+
+import workbook_index
+from workbook_index import SheetProfiler, detect_header_row, workbook_profile
+
+
+def _save(path, rows):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Prices'
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+@pytest.mark.parametrize('rows, expected', [
+    ([['Bom', 'Description', 'Prix']], 1),
+    ([['Liste de prix Vaonix'], [], [None, 'Référence', 'Désignation']], 3),
+    # One label, or labels without a keyword, are not a header
+    ([['BOM'], ['Name', 'Colour'], ['SFP-1G-SX', 'SFP 1000BASE-SX', 10.0]], None),
+    ([['SFP-10G-LR', 'Price list 2025', 20.0], ['Bom', 'Description']], 1),
+    ([], None),
+])
+def test_detect_header_row(rows, expected):
+    assert detect_header_row(rows) == expected
+
+
+def test_sheet_profiler_types_the_rows_after_the_header(monkeypatch):
+    monkeypatch.setattr(workbook_index, 'SAMPLE_ROWS', 3)
+    profiler = SheetProfiler('Prices')
+    for row in [('Vaonix',), ('Bom', 'Description', 'Prix'), ('SFP-1G-SX', 'SFP', 10), ('SFP-10G-LR', None, 20.5),
+                ('QSFP28', 'QSFP28', 'sur devis', None, None)]:
+        profiler.feed(row)
+    sheet = profiler.result()
+    assert (sheet['dimensions'], sheet['max_row'], sheet['max_column'], sheet['header_row']) == ('A1:E5', 5, 5, 2)
+    # The sample stops at SAMPLE_ROWS rows, trailing empty cells trimmed
+    assert sheet['sample'] == [['Vaonix'], ['Bom', 'Description', 'Prix'], ['SFP-1G-SX', 'SFP', 10]]
+    assert [(c['letter'], c['name'], c['type'], c['filled']) for c in sheet['columns']] == [
+        ('A', 'Bom', 'str', 3), ('B', 'Description', 'str', 2), ('C', 'Prix', 'mixed', 3),
+        ('D', None, 'empty', 0), ('E', None, 'empty', 0)]
+    assert sheet['columns'][2]['types'] == {'int': 1, 'float': 1, 'str': 1}
+
+
+def test_short_sheets_are_profiled_on_result():
+    profiler = SheetProfiler('Empty')
+    assert profiler.result()['dimensions'] == 'A1:A1'
+    profiler = SheetProfiler('Short')
+    for row in [('Bom', 'Prix'), ('SFP-1G-SX', 10), ('SFP-10G-LR', 20.5)]:
+        profiler.feed(row)
+    assert [c['type'] for c in profiler.result()['columns']] == ['str', 'float']
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    """Counts the profiling passes and hashes behind workbook_profile"""
+    calls = {'profile': 0, 'hash': 0}
+    profile_workbook, file_sha256 = workbook_index.profile_workbook, workbook_index.file_sha256
+
+    def counted(name, func):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return func(*args, **kwargs)
+        return wrapper
+    monkeypatch.setattr(workbook_index, 'profile_workbook', counted('profile', profile_workbook))
+    monkeypatch.setattr(workbook_index, 'file_sha256', counted('hash', file_sha256))
+    return str(tmp_path / 'index.json'), calls
+
+
+def test_index_stamp_hit_touch_and_change(tmp_path, index):
+    index_path, calls = index
+    path = str(tmp_path / 'prices.xlsx')
+    _save(path, [['Bom', 'Prix'], ['SFP-1G-SX', 10]])
+
+    first = workbook_profile(path, reader='xml', index_path=index_path)
+    assert workbook_profile(path, reader='xml', index_path=index_path) == first
+    assert calls == {'profile': 1, 'hash': 1}
+
+    # Touched only: re-hashed, the profile is reused
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert workbook_profile(path, reader='xml', index_path=index_path) == first
+    assert calls == {'profile': 1, 'hash': 2}
+
+    # Another reader has its own profile
+    workbook_profile(path, reader='openpyxl', index_path=index_path)
+    assert calls['profile'] == 2
+
+    _save(path, [['Bom', 'Prix'], ['SFP-1G-SX', 10], ['SFP-10G-LR', 20]])
+    assert workbook_profile(path, reader='xml', index_path=index_path)['sheets'][0]['max_row'] == 3
+    assert calls['profile'] == 3
+    # The old content's profiles are pruned, for every reader
+    with open(index_path, encoding='utf-8') as fh:
+        keys = list(json.load(fh)['workbooks'])
+    assert len(keys) == 1 and keys[0].endswith(f":xml:{workbook_index.INDEX_VERSION}")
+
+
+def test_index_from_another_version_is_ignored(tmp_path, index, monkeypatch):
+    index_path, calls = index
+    path = str(tmp_path / 'prices.xlsx')
+    _save(path, [['Bom', 'Prix'], ['SFP-1G-SX', 10]])
+    workbook_profile(path, reader='xml', index_path=index_path)
+    monkeypatch.setattr(workbook_index, 'INDEX_VERSION', workbook_index.INDEX_VERSION + 1)
+    workbook_profile(path, reader='xml', index_path=index_path)
+    assert calls['profile'] == 2
@@ -0,0 +1,60 @@
+import datetime
+import zipfile
+
+import openpyxl
+import pytest
+
+from workbook_readers import iter_rows_xml, iter_sheet_rows, iter_workbook
+
+DATES = [
+    ('Bom', 'Date', 'Time', 'Elapsed', 'Custom', 'Number'),
+    ('SFP-1G-SX', datetime.datetime(2025, 2, 27), datetime.time(9, 30), datetime.timedelta(hours=30, minutes=15),
+     datetime.datetime(2025, 2, 27, 14, 5), 1.5),
+    ('SFP-10G-LR', datetime.datetime(1900, 1, 15), None, None, None, 45000),
+]
+FORMATS = {'B': 'yyyy-mm-dd', 'C': 'h:mm', 'D': '[h]:mm:ss', 'E': '[$-40C]dd/mm/yyyy\\ hh:mm;@', 'F': '0.00'}
+
+
+def _save(path, rows, date1904=False):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Prices'
+    if date1904:
+        wb.epoch = openpyxl.utils.datetime.CALENDAR_MAC_1904
+    for row in rows:
+        ws.append(row)
+    for letter, fmt in FORMATS.items():
+        for cell in ws[letter][1:]:
+            cell.number_format = fmt
+    wb.save(path)
+
+
+@pytest.mark.parametrize('date1904', [False, True])
+def test_xml_reader_converts_date_cells_like_openpyxl(tmp_path, date1904):
+    path = str(tmp_path / 'prices.xlsx')
+    _save(path, DATES, date1904)
+    rows = list(iter_sheet_rows(path, 'Prices', reader='xml'))
+    assert rows == list(iter_sheet_rows(path, 'Prices', reader='openpyxl'))
+    assert rows[1][1:5] == DATES[1][1:5]
+    # A number format without date parts keeps the number
+    assert rows[2][5] == 45000
+    assert [list(sheet_rows) for _, sheet_rows in iter_workbook(path, reader='xml')] == [rows]
+
+
+SHEET = ('<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+         '<row r="1"><c t="inlineStr"><is><t>Bom</t></is></c><c t="inlineStr"><is><t>Prix</t></is></c></row>'
+         '<row r="2"><c r="B2"><v>1</v></c><c><v>2</v></c><c r="E2"><v>3</v></c><c><v>4</v></c></row>'
+         '</sheetData></worksheet>')
+
+
+def test_cells_without_a_reference_follow_the_previous_cell(tmp_path):
+    path = str(tmp_path / 'prices.xlsx')
+    _save(path, [('placeholder',)])
+    # Rewrite the sheet part with cells some writers leave without r="..."
+    with zipfile.ZipFile(path) as src:
+        parts = {name: src.read(name) for name in src.namelist()}
+    parts['xl/worksheets/sheet1.xml'] = SHEET.encode('utf-8')
+    with zipfile.ZipFile(path, 'w') as dst:
+        for name, data in parts.items():
+            dst.writestr(name, data)
+    assert list(iter_rows_xml(path, 'Prices')) == [('Bom', 'Prix'), (None, 1, 2, None, 3, 4)]
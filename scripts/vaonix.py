@@ -0,0 +1,58 @@
+import argparse
+import importlib
+import os
+import sys
+import time
+
+# Single entry point for the Python tools: python scripts/vaonix.py COMMAND [options]
+# (npm run vaonix -- COMMAND [options]). A command's module is only imported when
+# that command runs, so `vaonix --help` costs argparse alone and each command only
+# pays for its own dependencies: pandas for the inspect preview and the pandas
+# engine, PIL for images / fix-logo, pyarrow once the catalog cache is read.
+# Every module exposes cli(argv, prog). bench_cli.py tracks the startup times.
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Command -> (module, summary)
+COMMANDS = {
+    'import': ('generate_shopify_import', "Generate the Shopify import CSV from the price list"),
+    'analyze': ('analyze_price_list', "Print the layout of the price-list sheet"),
+    'inspect': ('inspect_excel', "List the sheets of the workbooks and preview their first rows"),
+    'images': ('create_product_images', "Render the Vaonix label onto the product base images"),
+    'fix-logo': ('fix_logo', "Make the white background of logos transparent"),
+    'assets': ('image_assets', "Collapse duplicate images and pack the thumbnails into sprite sheets"),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='vaonix', description="Vaonix catalog and image tools",
+                                     epilog="Run 'vaonix COMMAND --help' for the options of a command.")
+    parser.add_argument('--timings', action='store_true',
+                        help="Print how long importing and running the command took (on stderr)")
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND', required=True)
+    for name, (_, summary) in COMMANDS.items():
+        # Options are parsed by the command's own cli()
+        commands.add_parser(name, help=summary, add_help=False)
+    return parser
+
+
+def main(argv=None):
+    args, rest = build_parser().parse_known_args(argv)
+    module_name = COMMANDS[args.command][0]
+    if ROOT_DIR not in sys.path:
+        # inspect_excel.py lives at the repository root
+        sys.path.append(ROOT_DIR)
+
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    imported = time.perf_counter()
+    try:
+        return module.cli(rest, prog=f"vaonix {args.command}")
+    finally:
+        if args.timings:
+            print(f"vaonix {args.command}: import {(imported - start) * 1000:.1f} ms, "
+                  f"run {(time.perf_counter() - imported) * 1000:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
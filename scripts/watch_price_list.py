@@ -0,0 +1,265 @@
+import argparse
+import os
+import time
+import traceback
+import xml.etree.ElementTree as ET
+import zipfile
+
+import generate_shopify_import as gen
+from bom_classifier import BomClassifier
+from catalog_dedup import DEFAULT_POLICY, POLICIES, CatalogCheck, CatalogCollisionError
+from csv_stream import ShopifyCsvWriter
+from multi_source import SELLING_PRICES_SOURCE, build_index, canonical_bom, load_source
+from search_index import INDEX_FILE as SEARCH_INDEX_FILE, SearchIndexBuilder
+
+# Watch mode for the price-list pipeline.
+# Keeps the parsed rows, the classifier cache and the generated products of every
+# family in memory. When the workbook is saved, only the sheet is re-read and checked
+# for duplicates like a full run (catalog_dedup.py): families whose rows changed are
+# regrouped, every other product is reused as is, and the CSV (and optionally the
+# search index) is rewritten atomically.
+# Saves are detected by polling the workbook's size / mtime. Excel saves by writing
+# a temporary file and renaming it over the workbook, and keeps a "~$" lock file
+# next to it while the workbook is open: lock files are ignored, and a change is
+# only processed once the workbook is back, stable for one poll and a readable zip.
+# Usage: python scripts/watch_price_list.py [--interval 0.1] [--search-index] [--pricing-rules JSON]
+
+DEFAULT_READER = 'xml'
+POLL_INTERVAL = 0.1
+READ_ERRORS = (OSError, zipfile.BadZipFile, KeyError, ET.ParseError, EOFError)
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        # Mid-save: the workbook is briefly renamed away
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class WarmPipeline:
+    """Generator state kept between saves"""
+    def __init__(self, input_file=None, output_file=None, reader=DEFAULT_READER,
+                 selling_prices_file=None, search_index_path=None, pricing=gen.DEFAULT_PRICING,
+                 collisions=DEFAULT_POLICY):
+        self.input_file = input_file or gen.INPUT_FILE
+        self.output_file = output_file or gen.OUTPUT_FILE
+        self.reader = reader
+        self.selling_prices_file = selling_prices_file
+        self.search_index_path = search_index_path
+        self.pricing = pricing
+        self.collisions = collisions
+        self.classifier = BomClassifier()
+        self.selling_prices = None
+        self.entries = []
+        # Findings of the last refresh and the injected products it kept
+        self.check = CatalogCheck(collisions)
+        self.missing_products = gen.MISSING_PRODUCTS
+        # Family handle -> the sheet rows it is built from, and the products they produce
+        self.family_entries = {}
+        self.family_products = {}
+        self.order = []
+        self.stamps = {}
+        self._pending = None
+
+    def _read_selling_prices(self):
+        source = SELLING_PRICES_SOURCE._replace(path=self.selling_prices_file)
+        _, records, _ = load_source(source, self.reader, use_cache=False)
+        return build_index(records)
+
+    def _families(self, entries):
+        """Sheet rows per family and the product order, from the (cached) classification"""
+        families = {}
+        group_keys = {}
+        standalone = []
+        for entry in entries:
+            info = self.classifier.classify(entry[0], entry[1])
+            if info.skip:
+                continue
+            key = gen.family_key(info)
+            families.setdefault(key, []).append(entry)
+            # Same order as emit_products: groups by first variant, then standalone rows
+            if info.group_type:
+                group_keys.setdefault(key, None)
+            else:
+                standalone.append(key)
+        order = list(group_keys) + [key for key in standalone if key not in group_keys]
+        return families, order
+
+    def _build_family(self, entries):
+        product_groups, standalone_products = gen.group_entries(entries, self.classifier, self.selling_prices,
+                                                                self.pricing)
+        final_standalone = gen.merge_standalone(product_groups, standalone_products)
+        return list(gen.emit_products(product_groups, final_standalone))
+
+    def refresh(self, changed=None):
+        """Re-read the changed workbooks and rebuild the families they touch; returns their handles.
+
+        Raises CatalogCollisionError, keeping the previous state, if the 'fail' policy finds collisions.
+        """
+        changed = set(self.watched_paths()) if changed is None else changed
+        entries = self.entries
+        if self.input_file in changed:
+            entries = list(gen.read_price_list(self.reader, self.input_file, use_cache=False))
+        check = CatalogCheck(self.collisions)
+        kept, missing_products = check.run(entries, self.classifier, gen.MISSING_PRODUCTS)
+        self.entries, self.check = entries, check
+        repriced = set()
+        if self.selling_prices_file in changed:
+            selling_prices = self._read_selling_prices()
+            old = self.selling_prices or {}
+            repriced = {bom for bom in old.keys() | selling_prices.keys() if old.get(bom) != selling_prices.get(bom)}
+            self.selling_prices = selling_prices
+
+        families, self.order = self._families(kept)
+        touched = {key for key, rows in families.items()
+                   if self.family_entries.get(key) != rows
+                   or (repriced and any(canonical_bom(entry[0]) in repriced for entry in rows))}
+        touched.update(key for key in self.family_entries if key not in families)
+        # Injected products dropped or brought back by the dedup
+        touched.update(gen.missing_product_row(missing)['Handle'] for missing in
+                       [m for m in missing_products if m not in self.missing_products]
+                       + [m for m in self.missing_products if m not in missing_products])
+        self.missing_products = missing_products
+        for key in touched:
+            if key in families:
+                self.family_products[key] = self._build_family(families[key])
+            else:
+                self.family_products.pop(key, None)
+        self.family_entries = families
+        return touched
+
+    def products(self):
+        # Products of a standalone family with duplicate rows are consumed in sheet order
+        remaining = {key: iter(products) for key, products in self.family_products.items()}
+        for key in self.order:
+            yield next(remaining[key])
+        for missing in self.missing_products:
+            yield [gen.missing_product_row(missing, self.pricing)]
+
+    def write(self):
+        products = self.products()
+        search_index = None
+        if self.search_index_path:
+            search_index = SearchIndexBuilder()
+            products = search_index.wrap(products)
+        # Written to a temporary file and renamed into place by the writer
+        with ShopifyCsvWriter(self.output_file, gen.COLUMNS) as writer:
+            for rows in products:
+                writer.write_product(rows)
+        if search_index:
+            search_index.write(self.search_index_path)
+        return writer.rows_written
+
+    def watched_paths(self):
+        return [path for path in (self.input_file, self.selling_prices_file) if path]
+
+    def poll(self):
+        """Process a finished save if there is one; returns (touched, rows) or None"""
+        stamps = {path: _stat(path) for path in self.watched_paths()}
+        if stamps == self.stamps or None in stamps.values():
+            return None
+        # Still being written: wait until a poll sees the same size / mtime twice
+        if stamps != self._pending:
+            self._pending = stamps
+            return None
+        if not all(zipfile.is_zipfile(path) for path in stamps):
+            return None
+        changed = {path for path, stamp in stamps.items() if stamp != self.stamps.get(path)}
+        self.stamps = stamps
+        self._pending = None
+        try:
+            touched = self.refresh(changed)
+        except READ_ERRORS as e:
+            # Caught between writes, or saved broken: wait for the next save
+            print(f"Could not read the workbook ({e.__class__.__name__}: {e}), waiting for the next save")
+            return None
+        except CatalogCollisionError as e:
+            print(f"{e}\nOutputs kept (--collisions fail), waiting for the next save")
+            return None
+        except Exception:
+            self._drop_warm_state("Rebuild")
+            return None
+        try:
+            rows = self.write() if touched else 0
+        except Exception:
+            self._drop_warm_state("Writing the outputs")
+            return None
+        return touched, rows
+
+    def _drop_warm_state(self, step):
+        # Anything else must not end the watch. The families may be half rebuilt or
+        # not written, so the next save rebuilds and writes every one of them.
+        traceback.print_exc()
+        print(f"{step} failed, outputs kept, waiting for the next save")
+        self.family_entries = {}
+        self.family_products = {}
+
+    def start(self):
+        self.stamps = {path: _stat(path) for path in self.watched_paths()}
+        self.refresh()
+        return self.write()
+
+
+def watch(pipeline, interval=POLL_INTERVAL):
+    start = time.perf_counter()
+    rows = pipeline.start()
+    print(f"Built {pipeline.output_file} ({rows} rows, {len(pipeline.family_products)} families) "
+          f"in {time.perf_counter() - start:.2f}s")
+    print(pipeline.check.summary())
+    counts = pipeline.check.counts()
+    print(f"Watching {', '.join(pipeline.watched_paths())} (Ctrl+C to stop)...")
+    try:
+        while True:
+            time.sleep(interval)
+            result = pipeline.poll()
+            if result is None:
+                continue
+            touched, rows = result
+            saved_at = max(stamp[1] for stamp in pipeline.stamps.values())
+            latency = (time.time_ns() - saved_at) / 1e9
+            if pipeline.check.counts() != counts:
+                print(pipeline.check.summary())
+                counts = pipeline.check.counts()
+            if touched:
+                sample = ', '.join(sorted(touched)[:5]) + (', ...' if len(touched) > 5 else '')
+                print(f"{time.strftime('%H:%M:%S')} {len(touched)} products rebuilt ({sample}), "
+                      f"{rows} rows written, {latency * 1000:.0f} ms after save")
+            else:
+                print(f"{time.strftime('%H:%M:%S')} saved without row changes, outputs kept")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate the Shopify import CSV on every save of the price list")
+    parser.add_argument('--input', default=gen.INPUT_FILE, help="Price-list workbook (default: %(default)s)")
+    parser.add_argument('--output', default=gen.OUTPUT_FILE, help="Shopify CSV (default: %(default)s)")
+    parser.add_argument('--reader', choices=sorted(gen.READERS), default=DEFAULT_READER,
+                        help="Workbook reader backend (default: %(default)s)")
+    parser.add_argument('--selling-prices', nargs='?', const=SELLING_PRICES_SOURCE.path, metavar='XLSX',
+                        help="Also watch and join the BOM selling-prices export (default: %(const)s)")
+    parser.add_argument('--search-index', nargs='?', const=SEARCH_INDEX_FILE, metavar='JSON',
+                        help="Also rewrite the storefront search index (default: %(const)s)")
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL,
+                        help="Seconds between polls (default: %(default)s)")
+    parser.add_argument('--collisions', choices=POLICIES, default=DEFAULT_POLICY,
+                        help="Duplicate rows and handle collisions: only list them, drop the later rows (resolve) "
+                             "or keep the last outputs until they are fixed (fail) (default: %(default)s)")
+    parser.add_argument('--pricing-rules', metavar='JSON',
+                        help="Margin rules per product type, form factor and speed (see pricing.py; "
+                             "default: the 1.15 multiplier on everything)")
+    args = parser.parse_args()
+    pricing = gen.DEFAULT_PRICING
+    if args.pricing_rules:
+        try:
+            pricing = gen.PriceTable(gen.load_rules(args.pricing_rules))
+        except (OSError, ValueError) as e:
+            parser.error(f"--pricing-rules: {e}")
+    pipeline = WarmPipeline(args.input, args.output, args.reader, args.selling_prices, args.search_index, pricing,
+                            args.collisions)
+    try:
+        watch(pipeline, args.interval)
+    except CatalogCollisionError as e:
+        parser.exit(1, f"{e}\nNothing written (--collisions fail).\n")
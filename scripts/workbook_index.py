@@ -0,0 +1,231 @@
+import argparse
+import datetime
+import json
+import os
+import time
+
+from catalog_cache import CACHE_DIR, file_sha256
+from workbook_readers import DEFAULT_READER, WORKBOOK_READERS, iter_workbook
+
+# Metadata index of the price-list workbooks, used by inspect_excel.py and
+# analyze_price_list.py.
+# One streaming pass over a workbook profiles every sheet: dimensions, detected
+# header row, inferred column types and the first SAMPLE_ROWS rows. Profiles are
+# stored in INDEX_FILE keyed by the workbook's sha256, the reader that produced them
+# and INDEX_VERSION; each path also keeps its size / mtime stamp so an untouched
+# workbook is not even re-hashed.
+
+INDEX_FILE = os.path.join(CACHE_DIR, 'workbook_index.json')
+# Bump when the profile contents change, or the values a reader returns
+INDEX_VERSION = 3
+SAMPLE_ROWS = 50
+HEADER_KEYWORDS = ('BOM', 'PRIX', 'PRICE', 'DESCRIPTION', 'REFERENCE', 'RÉFÉRENCE', 'DÉSIGNATION')
+
+
+def _column_letter(idx):
+    # 1 -> "A", 28 -> "AB"
+    letters = ''
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _trim(row):
+    end = len(row)
+    while end and row[end - 1] is None:
+        end -= 1
+    return list(row[:end])
+
+
+def detect_header_row(rows):
+    """1-based number of the first row that looks like column headers, or None"""
+    for row_num, row in enumerate(rows, start=1):
+        labels = [str(v).upper() for v in row if isinstance(v, str) and v.strip()]
+        if len(labels) >= 2 and any(keyword in label for label in labels for keyword in HEADER_KEYWORDS):
+            return row_num
+    return None
+
+
+def _column_type(counts):
+    kinds = set(counts)
+    if not kinds:
+        return 'empty'
+    if len(kinds) == 1:
+        return next(iter(kinds))
+    if kinds <= {'int', 'float'}:
+        return 'float'
+    return 'mixed'
+
+
+class SheetProfiler:
+    """Accumulates a sheet profile from rows fed in order"""
+    def __init__(self, name):
+        self.name = name
+        self.max_row = 0
+        self.max_column = 0
+        self.sample = []
+        self.header_row = None
+        self.type_counts = []
+
+    def _count(self, row):
+        counts = self.type_counts
+        while len(counts) < len(row):
+            counts.append({})
+        for idx, value in enumerate(row):
+            if value is not None:
+                kind = type(value).__name__
+                counts[idx][kind] = counts[idx].get(kind, 0) + 1
+
+    def _close_sample(self):
+        self.header_row = detect_header_row(self.sample)
+        for row in self.sample[self.header_row or 0:]:
+            self._count(row)
+
+    def feed(self, row):
+        self.max_row += 1
+        if len(row) > self.max_column:
+            self.max_column = len(row)
+        if self.max_row <= SAMPLE_ROWS:
+            self.sample.append(_trim(row))
+            if self.max_row == SAMPLE_ROWS:
+                self._close_sample()
+        else:
+            self._count(row)
+
+    def result(self):
+        if self.max_row < SAMPLE_ROWS:
+            self._close_sample()
+        header = self.sample[self.header_row - 1] if self.header_row else []
+        columns = []
+        for idx, counts in enumerate(self.type_counts):
+            name = header[idx] if idx < len(header) else None
+            columns.append({'letter': _column_letter(idx + 1), 'name': name, 'type': _column_type(counts),
+                            'filled': sum(counts.values()), 'types': counts})
+        dimensions = f"A1:{_column_letter(max(self.max_column, 1))}{max(self.max_row, 1)}"
+        return {'name': self.name, 'dimensions': dimensions, 'max_row': self.max_row,
+                'max_column': self.max_column, 'header_row': self.header_row, 'columns': columns,
+                'sample': self.sample}
+
+
+def profile_workbook(path, reader=DEFAULT_READER):
+    """Profile every sheet of a workbook in a single pass"""
+    sheets = []
+    for name, rows in iter_workbook(path, reader=reader):
+        profiler = SheetProfiler(name)
+        for row in rows:
+            profiler.feed(row)
+        sheets.append(profiler.result())
+    return {'sheets': sheets}
+
+
+def _load_index(index_path):
+    try:
+        with open(index_path, encoding='utf-8') as fh:
+            index = json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return None
+    return index if index.get('version') == INDEX_VERSION else None
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat(sep=' ') if isinstance(value, datetime.datetime) else value.isoformat()
+    return str(value)
+
+
+def _profile_key(sha256, reader):
+    # The readers differ on some cell values (e.g. dates), their profiles are kept apart
+    return f"{sha256}:{reader}:{INDEX_VERSION}"
+
+
+def _save_index(index, index_path):
+    # Drop profiles of contents no path points at any more
+    live = {stamp['sha256'] for stamp in index['paths'].values()}
+    index['workbooks'] = {key: profile for key, profile in index['workbooks'].items()
+                          if key.split(':', 1)[0] in live}
+    os.makedirs(os.path.dirname(index_path) or '.', exist_ok=True)
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump(index, fh, ensure_ascii=False, default=_json_default)
+    os.replace(tmp_path, index_path)
+
+
+def workbook_profile(path, reader=DEFAULT_READER, use_cache=True, index_path=INDEX_FILE):
+    """Profile of a workbook, from the index when the file is unchanged"""
+    if not use_cache:
+        return profile_workbook(path, reader=reader)
+
+    index = _load_index(index_path) or {'version': INDEX_VERSION, 'paths': {}, 'workbooks': {}}
+    key = os.path.abspath(path)
+    st = os.stat(path)
+    stamp = index['paths'].get(key)
+    if stamp and stamp['size'] == st.st_size and stamp['mtime_ns'] == st.st_mtime_ns \
+            and _profile_key(stamp['sha256'], reader) in index['workbooks']:
+        return index['workbooks'][_profile_key(stamp['sha256'], reader)]
+
+    # Touched, renamed or copied: the content hash may still be known
+    sha256 = file_sha256(path)
+    profile = index['workbooks'].get(_profile_key(sha256, reader))
+    if profile is None:
+        profile = profile_workbook(path, reader=reader)
+        # Store what a later load will return (datetimes as text)
+        profile = json.loads(json.dumps(profile, ensure_ascii=False, default=_json_default))
+        index['workbooks'][_profile_key(sha256, reader)] = profile
+    index['paths'][key] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': sha256}
+    _save_index(index, index_path)
+    return profile
+
+
+def sheet_profile(profile, sheet_name):
+    for sheet in profile['sheets']:
+        if sheet['name'] == sheet_name:
+            return sheet
+    raise KeyError(f"Worksheet {sheet_name} does not exist.")
+
+
+def format_column(column):
+    name = '' if column['name'] is None else str(column['name'])[:40]
+    kind = column['type']
+    if kind == 'mixed':
+        kind += ' (' + ', '.join(f"{k} {n}" for k, n in sorted(column['types'].items(), key=lambda kv: -kv[1])) + ')'
+    return f"{column['letter']:<4}{name:<42}{column['filled']:>6} filled  {kind}"
+
+
+def print_profile(path, profile):
+    print(f"--- {path} ---")
+    for sheet in profile['sheets']:
+        header = f"header row {sheet['header_row']}" if sheet['header_row'] else "no header row"
+        print(f"\n{sheet['name']}: {sheet['dimensions']} ({sheet['max_row']} rows, {header})")
+        for column in sheet['columns']:
+            print(f"  {format_column(column)}")
+
+
+def main(paths, reader=DEFAULT_READER, use_cache=True, timings=False):
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"File {path} not found")
+            continue
+        start = time.perf_counter()
+        profile = workbook_profile(path, reader=reader, use_cache=use_cache)
+        elapsed = time.perf_counter() - start
+        print_profile(path, profile)
+        if timings:
+            start = time.perf_counter()
+            workbook_profile(path, reader=reader, use_cache=use_cache)
+            print(f"\nfirst lookup {elapsed * 1000:.1f} ms, repeat {(time.perf_counter() - start) * 1000:.1f} ms")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile workbooks: sheets, dimensions, header rows, column types")
+    parser.add_argument('files', nargs='*', default=[
+        'Liste de prix Vaonix 27022025.xlsm',
+        'boms-selling-prices-20260115-163935.xlsx',
+    ])
+    parser.add_argument('--reader', choices=sorted(WORKBOOK_READERS), default=DEFAULT_READER,
+                        help="Workbook reader backend (default: %(default)s)")
+    parser.add_argument('--no-cache', action='store_true', help="Profile from Excel without touching the index")
+    parser.add_argument('--timings', action='store_true', help="Also time a repeat lookup")
+    args = parser.parse_args()
+    main(args.files, reader=args.reader, use_cache=not args.no_cache, timings=args.timings)
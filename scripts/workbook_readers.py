@@ -0,0 +1,274 @@
+import datetime
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+# Streaming readers for the supplier price lists.
+# Each backend yields one tuple of cell values per sheet row (cached values,
+# like openpyxl's data_only=True), so memory stays flat whatever the sheet size.
+# The xml reader resolves number formats from xl/styles.xml the way openpyxl does:
+# date cells come back as datetime (time for a bare time, timedelta for [h]:mm).
+
+NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+DEFAULT_READER = 'openpyxl'
+
+# Built-in numFmtIds of dates and times (ECMA-376 18.8.30); 46 is [h]:mm:ss
+BUILTIN_DATE_FORMATS = frozenset(range(14, 23)) | {45, 46, 47}
+BUILTIN_TIMEDELTA_FORMATS = frozenset({46})
+# Same tests as openpyxl.styles.numbers: quoted text and [colour] / [$-locale] sections are ignored
+DATE_FORMAT_STRIP_RE = re.compile(r'".*?"|\[(?!hh?\]|mm?\]|ss?\])[^\]]*\]')
+DATE_FORMAT_RE = re.compile(r'(?<![_\\])[dmhysDMHYS]')
+TIMEDELTA_FORMAT_RE = re.compile(r'\[hh?\](:mm(:ss(\.0*)?)?)?|\[mm?\](:ss(\.0*)?)?|\[ss?\](\.0*)?')
+WINDOWS_EPOCH = datetime.datetime(1899, 12, 30)
+MAC_EPOCH = datetime.datetime(1904, 1, 1)
+
+
+def iter_rows_openpyxl(path, sheet_name, min_row=1):
+    """Stream rows with openpyxl in read-only mode"""
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name]
+        for row in ws.iter_rows(min_row=min_row, values_only=True):
+            yield row
+    finally:
+        wb.close()
+
+
+def sheet_names(path):
+    """Sheet names in workbook order, without loading any sheet"""
+    with zipfile.ZipFile(path) as zf:
+        workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+    return [sheet.get('name') for sheet in workbook.iter(f'{NS_MAIN}sheet')]
+
+
+def _sheet_member(zf, sheet_name):
+    # workbook.xml maps sheet names to relationship ids, the rels file maps ids to parts
+    workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+    rel_id = None
+    for sheet in workbook.iter(f'{NS_MAIN}sheet'):
+        if sheet.get('name') == sheet_name:
+            rel_id = sheet.get(f'{NS_REL}id')
+            break
+    if rel_id is None:
+        raise KeyError(f"Worksheet {sheet_name} does not exist.")
+
+    rels = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    for rel in rels.iter(f'{NS_PKG_REL}Relationship'):
+        if rel.get('Id') == rel_id:
+            target = rel.get('Target')
+            if target.startswith('/'):
+                return target.lstrip('/')
+            return posixpath.normpath(posixpath.join('xl', target))
+    raise KeyError(f"Worksheet {sheet_name} has no part in the archive.")
+
+
+def _text(elem):
+    # <si> / <is> may hold a plain <t> or several rich-text runs <r><t>
+    return ''.join(t.text or '' for t in elem.iter(f'{NS_MAIN}t'))
+
+
+def _load_shared_strings(zf):
+    if 'xl/sharedStrings.xml' not in zf.namelist():
+        return []
+    strings = []
+    root = None
+    with zf.open('xl/sharedStrings.xml') as fh:
+        for event, elem in ET.iterparse(fh, events=('start', 'end')):
+            if root is None:
+                root = elem
+            elif event == 'end' and elem.tag == f'{NS_MAIN}si':
+                strings.append(_text(elem))
+                # Drop parsed entries so the tree never grows
+                root.clear()
+    return strings
+
+
+def _load_date_styles(zf):
+    """({cell style index: True for elapsed times, False for dates}, workbook epoch)"""
+    workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+    pr = workbook.find(f'{NS_MAIN}workbookPr')
+    epoch = MAC_EPOCH if pr is not None and pr.get('date1904') in ('1', 'true') else WINDOWS_EPOCH
+    if 'xl/styles.xml' not in zf.namelist():
+        return {}, epoch
+
+    styles = ET.fromstring(zf.read('xl/styles.xml'))
+    custom = {int(fmt.get('numFmtId')): fmt.get('formatCode') for fmt in styles.iter(f'{NS_MAIN}numFmt')}
+    date_styles = {}
+    cell_xfs = styles.find(f'{NS_MAIN}cellXfs')
+    for idx, xf in enumerate(cell_xfs if cell_xfs is not None else ()):
+        fmt_id = int(xf.get('numFmtId', 0))
+        code = custom.get(fmt_id)
+        if code is not None:
+            code = code.split(';')[0]
+            if DATE_FORMAT_RE.search(DATE_FORMAT_STRIP_RE.sub('', code)):
+                date_styles[str(idx)] = TIMEDELTA_FORMAT_RE.search(code) is not None
+        elif fmt_id in BUILTIN_DATE_FORMATS:
+            date_styles[str(idx)] = fmt_id in BUILTIN_TIMEDELTA_FORMATS
+    return date_styles, epoch
+
+
+def _from_serial(value, epoch, elapsed=False):
+    """Excel serial to datetime (time below one day, timedelta for elapsed times), like openpyxl"""
+    if elapsed:
+        delta = datetime.timedelta(days=value)
+        if delta.microseconds:
+            delta = datetime.timedelta(seconds=delta.total_seconds() // 1, microseconds=round(delta.microseconds, -3))
+        return delta
+    day, fraction = divmod(value, 1)
+    diff = datetime.timedelta(milliseconds=round(fraction * 86400 * 1000))
+    if 0 <= value < 1 and diff.days == 0:
+        mins, seconds = divmod(diff.seconds, 60)
+        hours, mins = divmod(mins, 60)
+        return datetime.time(hours, mins, seconds, diff.microseconds)
+    # Serials before 1900-03-01 count the 1900-02-29 Lotus bug
+    if 0 < value < 60 and epoch == WINDOWS_EPOCH:
+        day += 1
+    return epoch + datetime.timedelta(days=day) + diff
+
+
+def _column_index(ref):
+    # "AB12" -> 28 (1-based)
+    idx = 0
+    for ch in ref:
+        if 'A' <= ch <= 'Z':
+            idx = idx * 26 + (ord(ch) - 64)
+        else:
+            break
+    return idx
+
+
+def _number(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _cell_value(cell, shared_strings, date_styles=None, epoch=WINDOWS_EPOCH):
+    cell_type = cell.get('t', 'n')
+    if cell_type == 'inlineStr':
+        inline = cell.find(f'{NS_MAIN}is')
+        return _text(inline) if inline is not None else None
+
+    v = cell.find(f'{NS_MAIN}v')
+    if v is None or v.text is None:
+        return None
+    if cell_type == 's':
+        return shared_strings[int(v.text)]
+    if cell_type == 'n':
+        value = _number(v.text)
+        elapsed = date_styles.get(cell.get('s', '0')) if date_styles else None
+        return value if elapsed is None else _from_serial(value, epoch, elapsed)
+    if cell_type == 'd':
+        return datetime.datetime.fromisoformat(v.text)
+    if cell_type == 'b':
+        return v.text == '1'
+    # 'str' (formula result), 'e' (error) and anything else stay as text
+    return v.text
+
+
+def _iter_part_rows(zf, member, shared_strings, min_row=1, date_styles=None, epoch=WINDOWS_EPOCH):
+    next_row = 1
+    sheet_data = None
+    with zf.open(member) as fh:
+        for event, elem in ET.iterparse(fh, events=('start', 'end')):
+            if event == 'start':
+                if elem.tag == f'{NS_MAIN}sheetData':
+                    sheet_data = elem
+                continue
+            if elem.tag != f'{NS_MAIN}row':
+                continue
+
+            row_num = int(elem.get('r', next_row))
+            # Emit empty tuples for skipped rows, like openpyxl does
+            while next_row < row_num:
+                if next_row >= min_row:
+                    yield ()
+                next_row += 1
+            next_row = row_num + 1
+
+            if row_num >= min_row:
+                values = []
+                col = 0
+                for cell in elem.iter(f'{NS_MAIN}c'):
+                    # Without a reference a cell follows the previous one
+                    ref = cell.get('r')
+                    col = _column_index(ref) if ref else col + 1
+                    while len(values) < col - 1:
+                        values.append(None)
+                    values.append(_cell_value(cell, shared_strings, date_styles, epoch))
+                yield tuple(values)
+            # Drop parsed rows so the tree never grows
+            if sheet_data is not None:
+                sheet_data.clear()
+
+
+def iter_rows_xml(path, sheet_name, min_row=1):
+    """Stream rows by parsing the sheet XML straight out of the zip"""
+    with zipfile.ZipFile(path) as zf:
+        member = _sheet_member(zf, sheet_name)
+        shared_strings = _load_shared_strings(zf)
+        date_styles, epoch = _load_date_styles(zf)
+        yield from _iter_part_rows(zf, member, shared_strings, min_row, date_styles, epoch)
+
+
+def iter_workbook_openpyxl(path):
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            yield ws.title, ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def iter_workbook_xml(path):
+    with zipfile.ZipFile(path) as zf:
+        shared_strings = _load_shared_strings(zf)
+        date_styles, epoch = _load_date_styles(zf)
+        workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+        for name in [sheet.get('name') for sheet in workbook.iter(f'{NS_MAIN}sheet')]:
+            yield name, _iter_part_rows(zf, _sheet_member(zf, name), shared_strings, date_styles=date_styles,
+                                        epoch=epoch)
+
+
+READERS = {
+    'openpyxl': iter_rows_openpyxl,
+    'xml': iter_rows_xml,
+}
+
+WORKBOOK_READERS = {
+    'openpyxl': iter_workbook_openpyxl,
+    'xml': iter_workbook_xml,
+}
+
+
+def iter_sheet_rows(path, sheet_name, min_row=1, reader=DEFAULT_READER):
+    """Yield value tuples for every row of a sheet using the chosen backend"""
+    if reader not in READERS:
+        raise ValueError(f"Unknown reader '{reader}', expected one of {sorted(READERS)}")
+    return READERS[reader](path, sheet_name, min_row=min_row)
+
+
+def iter_workbook(path, reader=DEFAULT_READER):
+    """Yield (sheet name, row iterator) for every sheet, opening the workbook once.
+
+    Each row iterator must be consumed before moving on to the next sheet.
+    """
+    if reader not in WORKBOOK_READERS:
+        raise ValueError(f"Unknown reader '{reader}', expected one of {sorted(WORKBOOK_READERS)}")
+    return WORKBOOK_READERS[reader](path)
+
+
+def cell(row, column):
+    """1-based column lookup that tolerates short rows"""
+    if column <= len(row):
+        return row[column - 1]
+    return None
@@ -1,11 +1,15 @@
 import React, { useMemo, useRef, useState, useEffect } from 'react';
 import { cn } from '@/lib/utils';
+import { assetSrc, responsiveSources } from '@/lib/images';
 import { getPerspectiveTransform, Point } from '@/utils/matrix3d';
 
 
 
 
 
+// Rendered width: full width on mobile, product card grid above
+const IMAGE_SIZES = '(max-width: 640px) 100vw, (max-width: 1024px) 50vw, 33vw';
+
 interface DynamicProductImageProps {
     product: {
         title: string;
@@ -303,14 +307,19 @@ export function DynamicProductImage({ product, className, showLabel = true, prio
             className={cn("relative w-full aspect-square bg-white rounded-xl overflow-hidden group", className)}
         >
             {/* Base Image */}
-            <img
-                src={config.image}
-                alt={product.title}
-                loading={priority ? "eager" : "lazy"}
-                decoding={priority ? "sync" : "async"}
-                fetchPriority={priority ? "high" : "auto"}
-                className="w-full h-full object-contain relative z-10"
-            />
+            <picture className="contents">
+                {responsiveSources(config.image).map((source) => (
+                    <source key={source.type} type={source.type} srcSet={source.srcSet} sizes={IMAGE_SIZES} />
+                ))}
+                <img
+                    src={assetSrc(config.image)}
+                    alt={product.title}
+                    loading={priority ? "eager" : "lazy"}
+                    decoding={priority ? "sync" : "async"}
+                    fetchPriority={priority ? "high" : "auto"}
+                    className="w-full h-full object-contain relative z-10"
+                />
+            </picture>
             {/* Label Overlays */}
             {showLabel && activeLabels.map((label: any, idx: number) => (
                 <div
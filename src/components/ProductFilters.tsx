@@ -8,6 +8,23 @@ import { Checkbox } from '@/components/ui/checkbox';
 import { Search, Filter, X, ChevronDown } from 'lucide-react';
 import { motion, AnimatePresence } from 'framer-motion';
 import productsData from '@/config/products.example.json';
+import { facetCounts, type SearchFacet } from '@/lib/search-index';
+
+interface FacetItem {
+  value: string;
+  count?: number;
+}
+
+// Valeurs et nombre de produits de l'index prégénéré, sinon la liste statique
+const facetItems = (facet: SearchFacet, fallback: string[]): FacetItem[] => {
+  const counts = facetCounts(facet);
+  return counts.length > 0 ? counts : fallback.map((value) => ({ value }));
+};
+
+const SPEED_ITEMS = facetItems('speed', productsData.filters.speeds);
+const FORM_FACTOR_ITEMS = facetItems('formFactor', productsData.filters.form_factors);
+const APPLICATION_ITEMS = facetItems('technology', productsData.filters.applications);
+const FIBER_TYPE_ITEMS = facetItems('media', productsData.filters.fiber_types);
 
 export interface ProductFilters {
   search: string;
@@ -59,7 +76,7 @@ const ProductFiltersComponent = ({ filters, onFiltersChange, resultCount }: Prod
 
   const FilterCheckboxGroup = ({ title, items, filterKey, icon }: {
     title: string;
-    items: string[];
+    items: FacetItem[];
     filterKey: 'speeds' | 'formFactors' | 'applications' | 'fiberTypes';
     icon?: React.ReactNode;
   }) => (
@@ -93,20 +110,23 @@ const ProductFiltersComponent = ({ filters, onFiltersChange, resultCount }: Prod
               </Button>
             )}
           </div>
-          {items.map((item) => (
-            <div key={item} className="flex items-center space-x-2">
+          {items.map(({ value, count }) => (
+            <div key={value} className="flex items-center space-x-2">
               <Checkbox
-                id={`${filterKey}-${item}`}
-                checked={filters[filterKey].includes(item)}
-                onCheckedChange={() => toggleArrayFilter(filterKey, item)}
+                id={`${filterKey}-${value}`}
+                checked={filters[filterKey].includes(value)}
+                onCheckedChange={() => toggleArrayFilter(filterKey, value)}
                 className="data-[state=checked]:bg-brand data-[state=checked]:border-brand"
               />
               <label
-                htmlFor={`${filterKey}-${item}`}
+                htmlFor={`${filterKey}-${value}`}
                 className="text-sm font-medium leading-none peer-disabled:cursor-not-allowed peer-disabled:opacity-70 cursor-pointer"
               >
-                {item}
+                {value}
               </label>
+              {count !== undefined && (
+                <span className="ml-auto text-xs text-muted-foreground">{count}</span>
+              )}
             </div>
           ))}
         </div>
@@ -152,28 +172,28 @@ const ProductFiltersComponent = ({ filters, onFiltersChange, resultCount }: Prod
         <div className="hidden lg:flex items-center gap-3 flex-wrap">
           <FilterCheckboxGroup
             title="Débit"
-            items={productsData.filters.speeds}
+            items={SPEED_ITEMS}
             filterKey="speeds"
             icon={<span className="mr-2 text-xs">⚡</span>}
           />
           
           <FilterCheckboxGroup
             title="Form Factor"
-            items={productsData.filters.form_factors}
+            items={FORM_FACTOR_ITEMS}
             filterKey="formFactors"
             icon={<span className="mr-2 text-xs">🔌</span>}
           />
           
           <FilterCheckboxGroup
             title="Application"
-            items={productsData.filters.applications}
+            items={APPLICATION_ITEMS}
             filterKey="applications"
             icon={<span className="mr-2 text-xs">📡</span>}
           />
           
           <FilterCheckboxGroup
             title="Type de fibre"
-            items={productsData.filters.fiber_types}
+            items={FIBER_TYPE_ITEMS}
             filterKey="fiberTypes"
             icon={<span className="mr-2 text-xs">🔗</span>}
           />
@@ -236,21 +256,21 @@ const ProductFiltersComponent = ({ filters, onFiltersChange, resultCount }: Prod
                 <div className="space-y-3">
                   <FilterCheckboxGroup
                     title="Débit"
-                    items={productsData.filters.speeds}
+                    items={SPEED_ITEMS}
                     filterKey="speeds"
                     icon={<span className="mr-2 text-xs">⚡</span>}
                   />
                   
                   <FilterCheckboxGroup
                     title="Form Factor"
-                    items={productsData.filters.form_factors}
+                    items={FORM_FACTOR_ITEMS}
                     filterKey="formFactors"
                     icon={<span className="mr-2 text-xs">🔌</span>}
                   />
                   
                   <FilterCheckboxGroup
                     title="Application"
-                    items={productsData.filters.applications}
+                    items={APPLICATION_ITEMS}
                     filterKey="applications"
                     icon={<span className="mr-2 text-xs">📡</span>}
                   />
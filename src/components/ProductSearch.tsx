@@ -1,10 +1,12 @@
-import { useState, useEffect, useRef } from 'react';
+import { useState, useEffect, useMemo, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Search, X, Loader2 } from 'lucide-react';
 import { Input } from '@/components/ui/input';
 import { Button } from '@/components/ui/button';
 import { useShopifyProducts } from '@/hooks/useShopifyProducts';
 import { mapShopifyToUnified } from '@/lib/productMapper';
+import { hasSearchIndex, searchProducts } from '@/lib/search-index';
+import { DynamicProductImage } from '@/components/DynamicProductImage';
 import { formatPrice } from '@/lib/utils';
 import { useDebounce } from '@/hooks/useDebounce'; // Assuming this exists or I'll implement it inside
 
@@ -22,12 +24,34 @@ export function ProductSearch() {
         return () => clearTimeout(timer);
     }, [query]);
 
-    const { products: shopifyProducts, loading } = useShopifyProducts({
+    // Index prégénéré : résultats locaux à chaque frappe, sans requête Shopify
+    const localResults = useMemo(() => hasSearchIndex() ? searchProducts(query) : null, [query]);
+
+    const { products: shopifyProducts, loading: shopifyLoading } = useShopifyProducts({
         first: 5,
-        query: debouncedQuery ? `title:*${debouncedQuery}* OR sku:*${debouncedQuery}*` : ''
+        query: !localResults && debouncedQuery ? `title:*${debouncedQuery}* OR sku:*${debouncedQuery}*` : ''
     });
 
-    const products = shopifyProducts?.map(mapShopifyToUnified) || [];
+    const loading = !localResults && shopifyLoading;
+    const products = localResults
+        ? localResults.map((doc) => ({
+            id: doc.handle,
+            handle: doc.handle,
+            title: doc.title,
+            pn: doc.handle.toUpperCase(),
+            price: doc.price,
+            image: null as string | null,
+            specs: doc.specs,
+        }))
+        : (shopifyProducts?.map(mapShopifyToUnified) || []).map((product) => ({
+            id: product.id,
+            handle: product.handle,
+            title: product.title,
+            pn: product.pn,
+            price: product.price,
+            image: product.images[0] as string | null,
+            specs: undefined,
+        }));
 
     // Close when clicking outside
     useEffect(() => {
@@ -98,11 +122,19 @@ export function ProductSearch() {
                                     className="flex items-center gap-3 w-full p-2 hover:bg-muted rounded-md text-left transition-colors group"
                                 >
                                     <div className="w-10 h-10 rounded bg-secondary/20 overflow-hidden flex-shrink-0">
-                                        <img
-                                            src={product.images[0]}
-                                            alt={product.title}
-                                            className="w-full h-full object-cover"
-                                        />
+                                        {product.image ? (
+                                            <img
+                                                src={product.image}
+                                                alt={product.title}
+                                                className="w-full h-full object-cover"
+                                            />
+                                        ) : (
+                                            <DynamicProductImage
+                                                product={{ title: product.title, handle: product.handle, specs: product.specs }}
+                                                showLabel={false}
+                                                className="w-full h-full"
+                                            />
+                                        )}
                                     </div>
                                     <div className="flex-1 min-w-0">
                                         <p className="text-sm font-medium truncate group-hover:text-primary transition-colors">
@@ -6,6 +6,31 @@ import { useCart } from "@/context/CartContext";
 import { siteConfig } from "@/config/site";
 import { useLanguage } from "@/context/LanguageContext";
 import { DynamicProductImage } from "@/components/DynamicProductImage";
+import { assetSrc, spriteStyle } from "@/lib/images";
+
+// Miniature depuis la planche de sprites (scripts/image_assets.py), sinon l'image hashée
+const CategoryImage = ({ src, alt }: { src: string; alt: string }) => {
+  const sprite = spriteStyle(src);
+  if (!sprite) {
+    return (
+      <img
+        src={assetSrc(src)}
+        alt={alt}
+        className="w-full h-full object-contain p-4 group-hover:scale-110 transition-transform duration-500"
+      />
+    );
+  }
+  return (
+    <div className="w-full h-full p-4 flex items-center justify-center">
+      <div
+        role="img"
+        aria-label={alt}
+        className="h-full max-w-full group-hover:scale-110 transition-transform duration-500"
+        style={sprite}
+      />
+    </div>
+  );
+};
 
 const ProductsSection = () => {
   const { t } = useLanguage();
@@ -123,11 +148,7 @@ const ProductsSection = () => {
                     className="h-full w-auto aspect-square bg-transparent rounded-none"
                   />
                 ) : (
-                  <img
-                    src={category.image}
-                    alt={category.title}
-                    className="w-full h-full object-contain p-4 group-hover:scale-110 transition-transform duration-500"
-                  />
+                  <CategoryImage src={category.image} alt={category.title} />
                 )}
 
                 {/* Brand tech overlay (violet touch) */}
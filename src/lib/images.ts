@@ -1,3 +1,5 @@
+import type { CSSProperties } from 'react';
+
 /**
  * Helper pour récupérer les URLs d'assets
  */
@@ -18,4 +20,89 @@ export const preloadImage = (src: string) => {
     link.href = src;
     document.head.appendChild(link);
   }
-};
\ No newline at end of file
+};
+
+export interface ImageVariant {
+  src: string;
+  width: number;
+  height: number;
+}
+
+interface ImageManifestEntry {
+  width: number;
+  height: number;
+  formats: Record<string, ImageVariant[]>;
+}
+
+// Généré par scripts/image_derivatives.py (absent tant que le script n'a pas tourné)
+const manifestModules = import.meta.glob('/src/config/image-manifest.json', { eager: true, import: 'default' }) as Record<string, Record<string, ImageManifestEntry>>;
+const imageManifest: Record<string, ImageManifestEntry> = Object.values(manifestModules)[0] ?? {};
+
+const MIME_TYPES: Record<string, string> = {
+  avif: 'image/avif',
+  webp: 'image/webp',
+  png: 'image/png',
+};
+
+/**
+ * Sources <picture> (AVIF, WebP, PNG) d'une image de public/, par ordre de préférence.
+ * Tableau vide si l'image n'a pas de dérivés : on garde alors l'image d'origine.
+ */
+export const responsiveSources = (src: string) => {
+  const entry = imageManifest[src];
+  if (!entry) return [];
+  return Object.entries(entry.formats).map(([format, variants]) => ({
+    type: MIME_TYPES[format] ?? `image/${format}`,
+    srcSet: variants.map((variant) => `${variant.src} ${variant.width}w`).join(', '),
+  }));
+};
+
+interface SpriteSheet {
+  src: string;
+  width: number;
+  height: number;
+}
+
+interface SpriteCell {
+  sheet: string;
+  x: number;
+  y: number;
+  width: number;
+  height: number;
+}
+
+interface AssetManifest {
+  files: Record<string, string>;
+  sheets: Record<string, SpriteSheet>;
+  sprites: Record<string, SpriteCell>;
+}
+
+// Généré par scripts/image_assets.py (absent tant que le script n'a pas tourné)
+const assetModules = import.meta.glob('/src/config/asset-manifest.json', { eager: true, import: 'default' }) as Record<string, AssetManifest>;
+const assetManifest: AssetManifest = Object.values(assetModules)[0] ?? { files: {}, sheets: {}, sprites: {} };
+
+/**
+ * Copie hashée (et dédoublonnée) d'une image de public/, servie avec un cache immutable.
+ * Sans manifeste, l'URL d'origine est renvoyée telle quelle.
+ */
+export const assetSrc = (src: string) => assetManifest.files[src] ?? src;
+
+/**
+ * Style CSS affichant la miniature d'une image depuis sa planche de sprites :
+ * l'élément prend le ratio de la miniature, le fond est mis à l'échelle en pourcentages.
+ * null si l'image n'est dans aucune planche : on garde alors un <img>.
+ */
+export const spriteStyle = (src: string): CSSProperties | null => {
+  const cell = assetManifest.sprites[src];
+  const sheet = cell && assetManifest.sheets[cell.sheet];
+  if (!cell || !sheet) return null;
+  const position = (offset: number, size: number, sheetSize: number) =>
+    sheetSize > size ? `${(offset / (sheetSize - size)) * 100}%` : '0%';
+  return {
+    aspectRatio: `${cell.width} / ${cell.height}`,
+    backgroundImage: `url(${sheet.src})`,
+    backgroundRepeat: 'no-repeat',
+    backgroundSize: `${(sheet.width / cell.width) * 100}% ${(sheet.height / cell.height) * 100}%`,
+    backgroundPosition: `${position(cell.x, cell.width, sheet.width)} ${position(cell.y, cell.height, sheet.height)}`,
+  };
+};
@@ -1,5 +1,6 @@
 import { ShopifyProduct } from '@/lib/shopify';
 import { parseProductSpecs } from '@/lib/product-parser';
+import { indexedSpecs } from '@/lib/search-index';
 import productsData from '@/config/products.example.json';
 
 // Type unifié pour les produits (mock + Shopify)
@@ -104,8 +105,8 @@ export function mapShopifyToUnified(shopifyProduct: ShopifyProduct): UnifiedProd
     .map(s => s.trim())
     .filter(Boolean);
 
-  // Fallback parsing (toujours faire avant le nettoyage du titre !)
-  const parsedSpecs = parseProductSpecs(shopifyProduct.title);
+  // Specs de l'index prégénéré, sinon parsing du titre (toujours faire avant le nettoyage du titre !)
+  const parsedSpecs = indexedSpecs(shopifyProduct.handle) ?? parseProductSpecs(shopifyProduct.title);
 
   // Règles métier : 1G -> SX, 40/100G -> SR4
   const isMultimode = parsedSpecs.media === 'Multimode';
@@ -181,7 +182,7 @@ export function isShopifyProduct(product: any): product is UnifiedProduct & { is
 
 // Convertir un produit mock vers le format unifié
 export function mapMockToUnified(mockProduct: typeof productsData.products[0]): UnifiedProduct {
-  const parsedSpecs = parseProductSpecs(mockProduct.title);
+  const parsedSpecs = indexedSpecs(mockProduct.handle) ?? parseProductSpecs(mockProduct.title);
   const isMultimode = parsedSpecs.media === 'Multimode';
   let srReplacement = undefined;
   if (isMultimode) {
@@ -0,0 +1,86 @@
+import type { ProductSpecs } from '@/lib/product-parser';
+
+export interface SearchDoc {
+  handle: string;
+  title: string;
+  type: string;
+  price: number;
+  variants: number;
+  specs: ProductSpecs;
+}
+
+export type SearchFacet = 'type' | 'formFactor' | 'speed' | 'technology' | 'media';
+
+interface FacetPosting {
+  count: number;
+  docs: number[];
+}
+
+interface SearchIndex {
+  version: number;
+  docs: SearchDoc[];
+  tokens: Record<string, number[]>;
+  facets: Record<SearchFacet, Record<string, FacetPosting>>;
+}
+
+// Généré par scripts/generate_shopify_import.py --search-index (absent tant que le script n'a pas tourné)
+const indexModules = import.meta.glob('/src/config/search-index.json', { eager: true, import: 'default' }) as Record<string, SearchIndex>;
+const searchIndex: SearchIndex | undefined = Object.values(indexModules)[0];
+
+const docsByHandle = new Map((searchIndex?.docs ?? []).map((doc) => [doc.handle, doc]));
+// Tokens triés (le générateur les écrit dans l'ordre) pour la recherche par préfixe
+const sortedTokens = Object.keys(searchIndex?.tokens ?? {});
+
+const TOKEN_RE = /[0-9a-zà-ÿ]+(?:[./][0-9a-zà-ÿ]+)*\+?/g;
+
+export const hasSearchIndex = () => searchIndex !== undefined;
+
+/**
+ * Spécifications précalculées d'un produit, null si le handle n'est pas indexé.
+ */
+export const indexedSpecs = (handle: string): ProductSpecs | null => docsByHandle.get(handle)?.specs ?? null;
+
+const prefixPostings = (prefix: string): Set<number> => {
+  const docs = new Set<number>();
+  let lo = 0;
+  let hi = sortedTokens.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (sortedTokens[mid] < prefix) lo = mid + 1;
+    else hi = mid;
+  }
+  for (let i = lo; i < sortedTokens.length && sortedTokens[i].startsWith(prefix); i++) {
+    for (const id of searchIndex!.tokens[sortedTokens[i]]) docs.add(id);
+  }
+  return docs;
+};
+
+/**
+ * Produits dont chaque mot de la requête préfixe un token indexé (handle, titre, description, tags, variantes).
+ */
+export const searchProducts = (query: string, limit = 5): SearchDoc[] => {
+  if (!searchIndex) return [];
+  const terms = query.toLowerCase().match(TOKEN_RE) ?? [];
+  if (terms.length === 0) return [];
+
+  let matches: Set<number> | null = null;
+  for (const term of terms) {
+    const docs = prefixPostings(term);
+    matches = matches ? new Set([...matches].filter((id) => docs.has(id))) : docs;
+    if (matches.size === 0) return [];
+  }
+
+  // Correspondance exacte sur le handle d'abord, puis les titres courts
+  const handleQuery = query.trim().toLowerCase().replace(/\s+/g, '-');
+  return [...matches!]
+    .map((id) => searchIndex.docs[id])
+    .sort((a, b) => Number(b.handle.startsWith(handleQuery)) - Number(a.handle.startsWith(handleQuery))
+      || a.title.length - b.title.length)
+    .slice(0, limit);
+};
+
+/**
+ * Valeurs d'une facette avec leur nombre de produits, les plus fréquentes d'abord.
+ */
+export const facetCounts = (facet: SearchFacet): { value: string; count: number }[] =>
+  Object.entries(searchIndex?.facets[facet] ?? {}).map(([value, posting]) => ({ value, count: posting.count }));
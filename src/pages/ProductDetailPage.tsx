@@ -21,6 +21,7 @@ import { mapShopifyToUnified, mapMockToUnified, type UnifiedProduct } from '@/li
 import { formatPrice } from '@/lib/utils';
 import { COMPATIBILITY_OPTIONS, DWDM_CHANNELS, CWDM_WAVELENGTHS } from '@/config/categories';
 import { parseProductSpecs } from '@/lib/product-parser';
+import { indexedSpecs } from '@/lib/search-index';
 import { DynamicProductImage } from '@/components/DynamicProductImage';
 import { siteConfig } from '@/config/site';
 
@@ -52,7 +53,7 @@ export default function ProductDetailPage() {
     }
   }, [handle, shopifyProduct]);
 
-  const specs = useMemo(() => product ? parseProductSpecs(product.title) : null, [product]);
+  const specs = useMemo(() => product ? indexedSpecs(product.handle) ?? parseProductSpecs(product.title) : null, [product]);
 
   if (shopifyLoading && !product) {
     return (